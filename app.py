@@ -1,19 +1,17 @@
-import argparse
 import os
 
 import streamlit as st
-from roboscope.database import Database
 
+from components.dev_panel import finish_rerun, show_dev_panel, show_pool_panel, start_rerun
 from components.filters import apply_test_run_filters
-from data.db import load_initial_data
+from components.memory import reset_session_memory, show_session_memory
+from data.db import get_engine, load_missing_indexes, load_missing_run_stats_tables, load_run_meta_options, load_run_summary
+from data.instrumentation import configure_timing_log, timed
+from data.settings import get_setting, parse_bool
 
 st.set_page_config(page_title="RoboScope UI", layout="wide", initial_sidebar_state="expanded")
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--db_url", type=str, help="Database URL")
-args, _ = parser.parse_known_args()
-
-db_url = args.db_url or st.secrets.get("db_url")
+db_url = get_setting("db_url")
 
 if not db_url:
     st.error("Database URL not provided. Please set the `--db_url=...` argument or use `st.secrets`.")
@@ -25,22 +23,25 @@ if db_url.startswith("sqlite:///"):
         st.error(f"SQLite database file not found at: `{db_path}`. Please check the path.")
         st.stop()
 
-if "db" not in st.session_state:
-    st.session_state["db"] = Database(db_url=db_url)
-
 dashboard_page = st.Page("dashboards/test_run_dashboard.py", title="Test Run", icon=":material/dashboard:", default=True)
+flaky_tests_page = st.Page("dashboards/flaky_tests.py", title="Flaky Tests", icon=":material/shuffle:")
+failure_search_page = st.Page("dashboards/failure_search.py", title="Failure Search", icon=":material/search:")
 numeric_measurements_page = st.Page("measurements/numeric_measurements.py", title="Numeric Measurements", icon=":material/query_stats:")
 string_measurements_page = st.Page("measurements/string_measurements.py", title="String Measurements", icon=":material/query_stats:")
 boolean_measurements_page = st.Page("measurements/boolean_measurements.py", title="Boolean Measurements", icon=":material/query_stats:")
+process_capability_page = st.Page("measurements/process_capability.py", title="Process Capability", icon=":material/monitoring:")
 series_measurements_page = st.Page("measurements/series_measurements.py", title="Series Measurements", icon=":material/query_stats:")
 
 pg = st.navigation(
     {
         "Dashboards": [
             dashboard_page,
+            flaky_tests_page,
+            failure_search_page,
         ],
         "Measurements": [
             numeric_measurements_page,
+            process_capability_page,
             string_measurements_page,
             boolean_measurements_page,
             series_measurements_page,
@@ -48,7 +49,56 @@ pg = st.navigation(
     }
 )
 
-min_start_time, max_start_time, initial_runs = load_initial_data(st.session_state["db"])
-apply_test_run_filters(min_start_time, max_start_time, initial_runs)
+# Optional timing breakdowns: a developer sidebar panel and/or JSON lines appended to a log file.
+# Collection starts before any resource is created, so the startup steps of the first rerun are timed too.
+dev_panel = get_setting("dev_panel", False, parse_bool)
+timing_log = get_setting("timing_log")
+if timing_log:
+    configure_timing_log(timing_log)
+if dev_panel or timing_log:
+    start_rerun(pg.title)
+
+# Process-wide resources: every session shares the same engine and connection pool
+with timed("app.resources"):
+    st.session_state["engine"] = get_engine(db_url)
+
+if dev_panel:
+    dev_panel_placeholder = st.sidebar.empty()
+    show_dev_panel(dev_panel_placeholder)
+    show_pool_panel(st.session_state["engine"])
+
+with timed("app.missing_indexes"):
+    missing_indexes = load_missing_indexes(st.session_state["engine"])
+if missing_indexes:
+    with st.sidebar.expander(f"{len(missing_indexes)} recommended database indexes missing", icon=":material/warning:"):
+        st.markdown("\n".join(f"- `{table}` ({', '.join(columns)})" for table, columns in missing_indexes.values()))
+        st.caption("Create them (with a before/after timing report) by running:")
+        st.code("python -m data.indexes --db_url=<db_url> --apply", language="bash")
+
+with timed("app.missing_run_stats"):
+    missing_run_stats = load_missing_run_stats_tables(st.session_state["engine"])
+if missing_run_stats:
+    with st.sidebar.expander("Run statistics rollup missing", icon=":material/warning:"):
+        st.markdown("\n".join(f"- `{table}`" for table in missing_run_stats))
+        st.caption("The dashboard counts the test cases of the selected runs instead and has no trend. Build and refresh the rollup with:")
+        st.code("python -m data.run_stats --db_url=<db_url>", language="bash")
+
+# The sidebar renders from small cached summaries: the start time range and the run meta options
+with timed("app.run_summary"):
+    min_start_time, max_start_time = load_run_summary(st.session_state["engine"])
+    meta_options = load_run_meta_options(st.session_state["engine"])
+apply_test_run_filters(st.session_state["engine"], min_start_time, max_start_time, meta_options)
+
+# Frames held by the session and their savings from compaction: the previous rerun's until this page has loaded its own
+memory_placeholder = st.sidebar.empty()
+show_session_memory(memory_placeholder)
+reset_session_memory()
 
 pg.run()
+
+show_session_memory(memory_placeholder)
+
+if dev_panel or timing_log:
+    finish_rerun()
+if dev_panel:
+    show_dev_panel(dev_panel_placeholder)
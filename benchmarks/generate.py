@@ -0,0 +1,204 @@
+import argparse
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Engine, create_engine, insert
+
+from roboscope.models import BooleanMeasurement, Failure, NumericMeasurement, SeriesMeasurement, StringMeasurement, TestCase, TestRun, TestSuite
+
+# Meta keys of runs and measurements; each key takes `meta_cardinality` distinct values
+META_KEYS = ["dut", "station", "firmware"]
+STATUSES = np.array(["PASS", "FAIL", "SKIP"])
+STATUS_WEIGHTS = [0.9, 0.07, 0.03]
+STRING_MODES = np.array(["equal", "not_equal", "regex", "log"])
+START_TIME = datetime(2025, 1, 1)
+
+
+def meta_value(rng: np.random.Generator, meta_cardinality: int) -> dict:
+    return {key: f"{key.upper()}-{rng.integers(meta_cardinality)}" for key in META_KEYS}
+
+
+def generate_run(
+    rng: np.random.Generator,
+    run_id: int,
+    suites: int,
+    tests: int,
+    measurements: dict[str, int],
+    series_length: int,
+    meta_cardinality: int,
+) -> dict[type, list[dict]]:
+    """Rows of every table for one run: `suites` suites of `tests` test cases, each with `measurements[type]` measurements per type."""
+    start_time = START_TIME + timedelta(hours=run_id)
+    rows = {
+        model: [] for model in [TestRun, TestSuite, TestCase, Failure, NumericMeasurement, StringMeasurement, BooleanMeasurement, SeriesMeasurement]
+    }
+    run_meta = meta_value(rng, meta_cardinality)
+    statuses = rng.choice(STATUSES, size=suites * tests, p=STATUS_WEIGHTS)
+    elapsed = rng.exponential(0.5, size=suites * tests)
+
+    for suite_index in range(suites):
+        suite_id = suite_index + 1
+        rows[TestSuite].append(
+            dict(
+                run_id=run_id,
+                suite_id=suite_id,
+                parent_suite_id=None,
+                name=f"Suite {suite_index}",
+                start_time=start_time,
+                end_time=start_time,
+                elapsed_time=float(elapsed[suite_index * tests : (suite_index + 1) * tests].sum()),
+                status="PASS",
+                meta=run_meta,
+            )
+        )
+        for test_index in range(tests):
+            test_id = suite_index * tests + test_index + 1
+            status = str(statuses[test_id - 1])
+            timestamp = start_time + timedelta(seconds=test_id)
+            common = dict(run_id=run_id, suite_id=suite_id, test_id=test_id, timestamp=timestamp)
+            rows[TestCase].append(
+                dict(
+                    run_id=run_id,
+                    suite_id=suite_id,
+                    test_id=test_id,
+                    name=f"Test {suite_index}.{test_index}",
+                    start_time=timestamp,
+                    end_time=timestamp,
+                    elapsed_time=float(elapsed[test_id - 1]),
+                    status=status,
+                    tags=[],
+                )
+            )
+            if status == "FAIL":
+                rows[Failure].append(dict(common, source="test", details=f"Check failed in test {test_id}"))
+
+            for k in range(measurements["numeric"]):
+                rows[NumericMeasurement].append(
+                    dict(
+                        common,
+                        name=f"numeric_{test_index}_{k}",
+                        meta=meta_value(rng, meta_cardinality),
+                        value=float(rng.normal(5, 1)),
+                        lower_limit=2.0,
+                        upper_limit=8.0,
+                        unit="V",
+                    )
+                )
+            for k in range(measurements["string"]):
+                expected = f"STATE_{rng.integers(3)}"
+                rows[StringMeasurement].append(
+                    dict(
+                        common,
+                        name=f"string_{test_index}_{k}",
+                        meta=meta_value(rng, meta_cardinality),
+                        value=f"STATE_{rng.integers(3)}",
+                        expected_value=expected,
+                        mode=str(rng.choice(STRING_MODES)),
+                        ignore_case=bool(rng.integers(2)),
+                    )
+                )
+            for k in range(measurements["boolean"]):
+                rows[BooleanMeasurement].append(
+                    dict(
+                        common,
+                        name=f"boolean_{test_index}_{k}",
+                        meta=meta_value(rng, meta_cardinality),
+                        value=bool(rng.random() < 0.95),
+                        expected_value=True,
+                    )
+                )
+            for k in range(measurements["series"]):
+                x = np.arange(series_length, dtype=float)
+                y = np.sin(x / 50) + rng.normal(0, 0.1, series_length)
+                rows[SeriesMeasurement].append(
+                    dict(
+                        common,
+                        name=f"series_{test_index}_{k}",
+                        meta=meta_value(rng, meta_cardinality),
+                        x_data=x.tolist(),
+                        y_data=y.round(4).tolist(),
+                        lower_limits=np.full(series_length, -1.5).tolist(),
+                        upper_limits=np.full(series_length, 1.5).tolist(),
+                        x_label="Sample",
+                        y_label="Amplitude",
+                        x_unit="",
+                        y_unit="V",
+                    )
+                )
+
+    end_time = start_time + timedelta(seconds=suites * tests + 1)
+    run_status = "FAIL" if (statuses == "FAIL").any() else "PASS"
+    rows[TestRun].append(
+        dict(
+            run_id=run_id,
+            name="Synthetic Run",
+            start_time=start_time,
+            end_time=end_time,
+            elapsed_time=float(elapsed.sum()),
+            status=run_status,
+            meta=run_meta,
+        )
+    )
+    return rows
+
+
+def generate_database(
+    engine: Engine,
+    runs: int = 100,
+    suites: int = 10,
+    tests: int = 20,
+    measurements: dict[str, int] | None = None,
+    series_length: int = 1000,
+    meta_cardinality: int = 5,
+    seed: int = 0,
+) -> None:
+    """Create the RoboScope schema and fill it with synthetic runs, committing one run at a time."""
+    measurements = {"numeric": 2, "string": 1, "boolean": 1, "series": 0, **(measurements or {})}
+    rng = np.random.default_rng(seed)
+    TestRun.metadata.create_all(engine)
+    for run_id in range(1, runs + 1):
+        rows = generate_run(rng, run_id, suites, tests, measurements, series_length, meta_cardinality)
+        with engine.begin() as conn:
+            for model, records in rows.items():
+                if records:
+                    conn.execute(insert(model.__table__), records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic RoboScope SQLite database for benchmarks.")
+    parser.add_argument("--db_path", type=str, default="benchmark.db", help="SQLite file to create")
+    parser.add_argument("--runs", type=int, default=100, help="Number of test runs")
+    parser.add_argument("--suites", type=int, default=10, help="Test suites per run")
+    parser.add_argument("--tests", type=int, default=20, help="Test cases per suite")
+    parser.add_argument("--numeric", type=int, default=2, help="Numeric measurements per test case")
+    parser.add_argument("--string", type=int, default=1, help="String measurements per test case")
+    parser.add_argument("--boolean", type=int, default=1, help="Boolean measurements per test case")
+    parser.add_argument("--series", type=int, default=0, help="Series measurements per test case")
+    parser.add_argument("--series_length", type=int, default=1000, help="Samples per series measurement")
+    parser.add_argument("--meta_cardinality", type=int, default=5, help="Distinct values per meta key")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--overwrite", action="store_true", help="Replace an existing database file")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db_path):
+        if not args.overwrite:
+            parser.error(f"{args.db_path} already exists, use --overwrite to replace it")
+        os.remove(args.db_path)
+
+    measurements = {"numeric": args.numeric, "string": args.string, "boolean": args.boolean, "series": args.series}
+    generate_database(
+        create_engine(f"sqlite:///{args.db_path}"),
+        args.runs,
+        args.suites,
+        args.tests,
+        measurements,
+        args.series_length,
+        args.meta_cardinality,
+        args.seed,
+    )
+    print(f"Generated {args.runs} runs in {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+import pandas as pd
+from components.filters import apply_measurement_filters
+from components.plots import build_numeric_figure, build_series_figure, build_status_heatmap
+from data.db import get_engine, load_run_meta_options, load_run_summary, load_selected_data
+from data.evaluation import evaluate_boolean_results, evaluate_string_results
+from data.indexes import sample_run_ids
+from data.measurement_cache import get_measurement_cache, load_measurements
+from data.overview import StatusMatrix
+from data.series import decode_series
+from sqlalchemy import Engine, func, select
+
+from roboscope.models import BooleanMeasurement, NumericMeasurement, SeriesMeasurement, StringMeasurement, TestCase, TestRun
+
+MEASUREMENT_MODELS = {
+    "numeric": NumericMeasurement,
+    "string": StringMeasurement,
+    "boolean": BooleanMeasurement,
+    "series": SeriesMeasurement,
+}
+
+
+def time_call(func: Callable[[], Any], repeat: int, setup: Callable[[], None] | None = None) -> tuple[dict[str, float], Any]:
+    """Time `func` `repeat` times, calling `setup` (e.g. to clear caches) untimed before each call. Returns (timings, last result)."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return {"best_s": min(timings), "median_s": statistics.median(timings)}, result
+
+
+def label_measurements(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the plot label the measurement pages group by."""
+    df = df.copy()
+    df["label"] = df["name"] + " / " + df["dut"].fillna("Unknown") if "dut" in df.columns else df["name"]
+    return df
+
+
+def run_benchmarks(engine: Engine, run_ids: list[int], repeat: int) -> dict[str, dict]:
+    """Time the data paths of the app headlessly, with caches cleared before every call."""
+    results = {}
+
+    def record(name: str, func: Callable[[], Any], setup: Callable[[], None] | None = None, rows: Callable[[Any], int] = len) -> Any:
+        timings, result = time_call(func, repeat, setup)
+        results[name] = {**timings, "rows": int(rows(result))}
+        return result
+
+    record("load_run_summary", lambda: load_run_summary(engine), load_run_summary.clear, rows=lambda _: 1)
+    record("load_run_meta_options", lambda: load_run_meta_options(engine), load_run_meta_options.clear)
+    _, test_df, suite_df, failure_df = record(
+        "load_selected_data", lambda: load_selected_data(engine, run_ids), load_selected_data.clear, rows=lambda result: sum(len(df) for df in result)
+    )
+
+    frames = {}
+    for measurement_type, model in MEASUREMENT_MODELS.items():
+        prepare = decode_series if model is SeriesMeasurement else None
+        frames[measurement_type] = record(
+            f"load_measurements.{measurement_type}", lambda: load_measurements(engine, model, run_ids, prepare), get_measurement_cache().clear
+        )
+        if not frames[measurement_type].empty:
+            record(f"apply_measurement_filters.{measurement_type}", lambda: apply_measurement_filters(frames[measurement_type]))
+
+    if not frames["string"].empty:
+        record("evaluate_string_results", lambda: evaluate_string_results(frames["string"]))
+    if not frames["boolean"].empty:
+        record("evaluate_boolean_results", lambda: evaluate_boolean_results(frames["boolean"]))
+
+    # Figures are serialized as well, like st.plotly_chart does
+    if not frames["numeric"].empty:
+        numeric_df = label_measurements(frames["numeric"])
+        record(
+            "build_numeric_figure",
+            lambda: build_numeric_figure(numeric_df, "run_id", "lines+markers", "linear").to_json(),
+            rows=lambda _: len(numeric_df),
+        )
+    if not frames["series"].empty:
+        series_df = label_measurements(frames["series"])
+        record("build_series_figure", lambda: build_series_figure(series_df, "lines", "linear", 2000).to_json(), rows=lambda _: len(series_df))
+
+    if not test_df.empty:
+        matrix = record("status_matrix", lambda: StatusMatrix(test_df, suite_df, run_ids))
+        record("status_matrix_page", lambda: matrix.labels(0, 200, failure_df))
+        record("build_status_heatmap", lambda: build_status_heatmap(matrix).to_json(), rows=lambda _: matrix.codes.size)
+    return results
+
+
+def database_summary(engine: Engine) -> dict[str, int]:
+    with engine.connect() as conn:
+        return {
+            model.__tablename__: conn.execute(select(func.count()).select_from(model)).scalar()
+            for model in [TestRun, TestCase, *MEASUREMENT_MODELS.values()]
+        }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_comparison(baseline: dict, current: dict) -> str:
+    lines = [f"{'Benchmark':<40}{'Baseline (ms)':>15}{'Current (ms)':>15}{'Change':>10}"]
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        before_ms = "-" if before is None else f"{before['best_s'] * 1000:.2f}"
+        line = f"{name:<40}{before_ms:>15}{result['best_s'] * 1000:>15.2f}"
+        if before is not None and before["best_s"]:
+            line += f"{(result['best_s'] / before['best_s'] - 1) * 100:>+9.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the RoboScope UI data paths on a database, e.g. one created by benchmarks.generate.")
+    parser.add_argument("--db_url", type=str, default="sqlite:///benchmark.db", help="Database URL")
+    parser.add_argument("--runs", type=int, default=20, help="Number of latest runs selected")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per benchmark")
+    parser.add_argument("--output", type=str, help="JSON file to write (default: stdout)")
+    parser.add_argument("--compare", type=str, help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+
+    # Streamlit warns about the missing script run context on every cached call when run headlessly
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+
+    engine = get_engine(args.db_url)
+    run_ids = sorted(sample_run_ids(engine, args.runs))
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "database": database_summary(engine),
+        "selected_runs": len(run_ids),
+        "repeat": args.repeat,
+        "results": run_benchmarks(engine, run_ids, args.repeat),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            print(format_comparison(json.load(file), report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
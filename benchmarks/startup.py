@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+from benchmarks.run import git_commit
+
+# Modules imported by app.py before the first page renders
+APP_IMPORTS = ["streamlit", "components.dev_panel", "components.filters", "data.db", "data.instrumentation", "data.settings"]
+
+# Runs app.py once headlessly in a fresh interpreter, printing the seconds of the import of Streamlit's test harness and of the first run
+FIRST_RUN_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file("app.py", default_timeout=120)
+app.secrets["db_url"] = sys.argv[1]
+app.secrets["timing_log"] = sys.argv[2]
+app.run()
+print(imported - start, time.perf_counter() - imported, len(app.exception))
+"""
+
+
+def import_profile(modules: list[str]) -> pd.DataFrame:
+    """Import `modules` in a fresh interpreter with `-X importtime`. Returns the self and cumulative milliseconds of every module imported."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"], capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        rows.append({"module": module.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return pd.DataFrame(rows, columns=["module", "self_ms", "cumulative_ms"])
+
+
+def package_totals(profile: pd.DataFrame) -> pd.DataFrame:
+    """Import time per top-level package, summing the self time of its modules, slowest first."""
+    packages = profile.assign(package=profile["module"].str.split(".").str[0])
+    totals = packages.groupby("package").agg(modules=("module", "size"), ms=("self_ms", "sum"))
+    return totals.sort_values("ms", ascending=False).reset_index()
+
+
+def first_run_profile(db_url: str) -> dict:
+    """Time a cold first run of app.py (default page included) in a fresh interpreter, with the timings of its top-level steps."""
+    with tempfile.TemporaryDirectory() as directory:
+        timing_log = os.path.join(directory, "timings.jsonl")
+        result = subprocess.run([sys.executable, "-c", FIRST_RUN_SCRIPT, db_url, timing_log], capture_output=True, text=True, check=True)
+        harness_s, first_run_s, exceptions = result.stdout.split()[-3:]
+        with open(timing_log) as file:
+            events = [json.loads(line) for line in file]
+
+    steps: dict[str, float] = {}
+    for event in events:
+        if event["event"] == "timing" and event["depth"] == 0:
+            steps[event["name"]] = steps.get(event["name"], 0) + event["seconds"]
+    return {
+        "harness_import_s": float(harness_s),
+        "first_run_s": float(first_run_s),
+        "exceptions": int(exceptions),
+        "steps_ms": {name: round(seconds * 1000, 2) for name, seconds in sorted(steps.items(), key=lambda item: -item[1])},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Profile the cold start of the app: import times of app.py's imports and the timed steps of a first run."
+    )
+    parser.add_argument("--db_url", type=str, default="sqlite:///benchmark.db", help="Database URL")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest packages and modules listed")
+    parser.add_argument("--output", type=str, help="JSON file to write the profile to")
+    args = parser.parse_args()
+
+    profile = import_profile(APP_IMPORTS)
+    packages = package_totals(profile)
+    modules = profile.sort_values("self_ms", ascending=False).head(args.top)
+    first_run = first_run_profile(args.db_url)
+
+    print(f"Imports of app.py: {profile['self_ms'].sum():.0f} ms over {len(profile)} modules")
+    print(packages.head(args.top).to_string(index=False, float_format="%.1f"))
+    print(f"\nSlowest modules (self time):\n{modules.to_string(index=False, float_format='%.1f')}")
+    print(f"\nFirst run: {first_run['first_run_s'] * 1000:.0f} ms ({first_run['exceptions']} exceptions)")
+    for name, ms in list(first_run["steps_ms"].items())[: args.top]:
+        print(f"  {name:<45}{ms:>10.1f} ms")
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "imports_ms": round(profile["self_ms"].sum(), 2),
+            "packages_ms": dict(zip(packages["package"], packages["ms"].round(2))),
+            "first_run": first_run,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+from data.instrumentation import log_rerun, start_collecting
+from data.pool import check_health, pool_status
+from sqlalchemy import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+# Number of past reruns kept per session
+TIMING_HISTORY_SIZE = 10
+
+
+def finish_rerun() -> None:
+    """Archive the timings of the rerun being collected, if any."""
+    rerun = st.session_state.pop("rerun_timings", None)
+    if rerun is not None:
+        log_rerun(rerun["page"], rerun["records"])
+        st.session_state.setdefault("timing_history", deque(maxlen=TIMING_HISTORY_SIZE)).appendleft(rerun)
+
+
+def start_rerun(page: str) -> None:
+    """Start collecting the timings of this rerun. The previous rerun is archived first when it ended with `st.stop()`."""
+    finish_rerun()
+    st.session_state["rerun_timings"] = {"page": page, "started": datetime.now(), "records": start_collecting()}
+
+
+def timing_table(records: list[dict]) -> pd.DataFrame:
+    # Nested steps finish, and are recorded, before their parents: list them by start time instead
+    table = pd.DataFrame(records, columns=["name", "seconds", "rows", "bytes", "depth", "start"]).sort_values("start", kind="stable")
+    return pd.DataFrame(
+        {
+            "Step": ["\u2003" * depth + ("↳ " if depth else "") + name for name, depth in zip(table["name"], table["depth"])],
+            "ms": table["seconds"] * 1000,
+            "Rows": table["rows"].astype("Int64"),
+            "KB": table["bytes"] / 1024,
+        }
+    )
+
+
+def show_dev_panel(placeholder) -> None:
+    """Render the per-rerun timing breakdowns of this session into a sidebar placeholder."""
+    history = list(st.session_state.get("timing_history", []))
+    with placeholder.container():
+        with st.expander("Developer: Timings", icon=":material/timer:"):
+            if not history:
+                st.caption("No rerun recorded yet.")
+                return
+            latest = history[0]
+            total = sum(entry["seconds"] for entry in latest["records"] if entry["depth"] == 0)
+            st.caption(f"Last rerun: {latest['page']} at {latest['started']:%H:%M:%S}, {total * 1000:.0f} ms")
+            st.dataframe(
+                timing_table(latest["records"]),
+                column_config={
+                    "ms": st.column_config.NumberColumn("ms", format="%.1f"),
+                    "KB": st.column_config.NumberColumn("KB", format="%.1f"),
+                },
+                hide_index=True,
+            )
+            st.caption("Recent reruns")
+            st.dataframe(
+                pd.DataFrame(
+                    {
+                        "Page": [rerun["page"] for rerun in history],
+                        "Started": [rerun["started"] for rerun in history],
+                        "ms": [sum(entry["seconds"] for entry in rerun["records"] if entry["depth"] == 0) * 1000 for rerun in history],
+                    }
+                ),
+                column_config={"ms": st.column_config.NumberColumn("ms", format="%.0f")},
+                hide_index=True,
+            )
+
+
+def show_pool_panel(engine: Engine) -> None:
+    """Render the health and utilization of the shared connection pool in the sidebar."""
+    with st.sidebar.expander("Developer: Database Pool", icon=":material/database:"):
+        try:
+            st.caption(f"Healthy, `SELECT 1` round trip {check_health(engine) * 1000:.1f} ms")
+        except SQLAlchemyError as error:
+            st.error(f"Database unreachable: {error}")
+        status = pool_status(engine)
+        if "size" not in status:
+            st.caption(f"{status['pool']}: no utilization metrics")
+            return
+        in_use_col, idle_col = st.columns(2)
+        in_use_col.metric("In Use", status["checked_out"], help="Connections checked out by running queries")
+        idle_col.metric("Idle", status["checked_in"], help="Open connections waiting in the pool")
+        size_col, overflow_col = st.columns(2)
+        size_col.metric("Pool Size", status["size"])
+        overflow_col.metric("Overflow", status["overflow"], help="Connections opened beyond the pool size")
@@ -1,8 +1,18 @@
 from datetime import datetime, timedelta
-from functools import reduce
 
 import pandas as pd
 import streamlit as st
+from components.memory import track_frames
+from components.progress import load_measurements_progressively
+from data.catalog import RUN_PAGE_SIZE
+from data.db import load_filtered_measurements, load_measurement_options, load_run_page
+from data.instrumentation import instrument
+from data.meta_index import MetaIndex
+from data.settings import get_setting, parse_bool
+from sqlalchemy import Engine
+
+# Number of measurement datasets per session whose meta index is kept
+META_INDEX_CACHE_SIZE = 4
 
 
 def setup_filter_defaults(defaults: dict) -> None:
@@ -10,43 +20,51 @@ def setup_filter_defaults(defaults: dict) -> None:
         st.session_state.setdefault(key, val)
 
 
-def extract_meta_info(initial_runs: list) -> tuple[list[dict], set]:
-    meta_dicts = [meta for _, _, meta in initial_runs if isinstance(meta, dict)]
-    meta_keys = set().union(*(meta.keys() for meta in meta_dicts if meta))
-    return meta_dicts, meta_keys
-
-
-def build_meta_filters(meta_keys: set, meta_dicts: list[dict]) -> dict:
+def build_meta_filters(meta_options: dict[str, list]) -> dict:
     meta_filters = {}
-    if meta_keys:
+    if meta_options:
         st.sidebar.header("Meta Filters")
-        for key in sorted(meta_keys):
+        for key in sorted(meta_options):
             # Generate a user-friendly name
             display_name = " ".join(word.capitalize() for word in key.split("_"))
-            unique_values = sorted({meta[key] for meta in meta_dicts if key in meta})
             # Use a distinct session_state key for meta filters (e.g. meta_key)
-            meta_filters[key] = st.sidebar.multiselect(display_name, options=unique_values, key=f"meta_{key}")
+            meta_filters[key] = st.sidebar.multiselect(display_name, options=meta_options[key], key=f"meta_{key}")
     return meta_filters
 
 
-def filter_runs(initial_runs, start_dt, end_dt, meta_filters):
-    # Filter by date and time range.
-    filtered_runs = [(run_id, start_time, meta) for run_id, start_time, meta in initial_runs if start_dt <= start_time <= end_dt]
-    # Further filter by meta selections (only if a selection is made for the key).
-    if meta_filters:
-        filtered_runs = [
-            (run_id, start_time, meta)
-            for run_id, start_time, meta in filtered_runs
-            if all(meta.get(key) in selected for key, selected in meta_filters.items() if selected)
-        ]
-    return filtered_runs
+def load_run_catalog(engine: Engine, start_dt: datetime, end_dt: datetime, meta_filters: dict) -> dict:
+    """Return the runs loaded so far for the current filters, fetching the first page on filter change."""
+    filter_key = (start_dt, end_dt, tuple(sorted((key, tuple(selected)) for key, selected in meta_filters.items())))
+    catalog = st.session_state.get("run_catalog")
+    if catalog is None or catalog["filter_key"] != filter_key:
+        runs = load_run_page(engine, start_dt, end_dt, meta_filters)
+        catalog = {
+            "filter_key": filter_key,
+            "filters": (start_dt, end_dt, meta_filters),
+            "runs": runs,
+            "exhausted": len(runs) < RUN_PAGE_SIZE,
+        }
+        st.session_state["run_catalog"] = catalog
+    return catalog
+
+
+def load_more_runs(engine: Engine) -> None:
+    catalog = st.session_state["run_catalog"]
+    if catalog["exhausted"]:
+        return
+    start_dt, end_dt, meta_filters = catalog["filters"]
+    after = catalog["runs"][-1] if catalog["runs"] else None
+    runs = load_run_page(engine, start_dt, end_dt, meta_filters, after=after)
+    catalog["runs"] = catalog["runs"] + runs
+    catalog["exhausted"] = len(runs) < RUN_PAGE_SIZE
 
 
 def get_run_options(run_data) -> list[str]:
-    return [f"{run_id} - {start_time.strftime('%Y-%m-%d %H:%M:%S')}" for run_id, start_time, _ in run_data]
+    return [f"{run_id} - {start_time.strftime('%Y-%m-%d %H:%M:%S')}" for run_id, start_time in run_data]
 
 
-def apply_test_run_filters(min_start_time: datetime, max_start_time: datetime, initial_runs: list[tuple]) -> list[int]:
+@instrument
+def apply_test_run_filters(engine: Engine, min_start_time: datetime, max_start_time: datetime, meta_options: dict[str, list]) -> list[int]:
     # Determine default values for date/time filters.
     min_date = min_start_time.date()
     max_date = max_start_time.date()
@@ -64,29 +82,33 @@ def apply_test_run_filters(min_start_time: datetime, max_start_time: datetime, i
     }
     setup_filter_defaults(defaults)
 
-    # Extract meta information and build meta filter UI.
-    meta_dicts, meta_keys = extract_meta_info(initial_runs)
-    meta_filters = build_meta_filters(meta_keys, meta_dicts)
+    # Build meta filter UI from the distinct values collected in the database.
+    meta_filters = build_meta_filters(meta_options)
 
     # Combine current session state date and time into datetime objects.
     start_dt = datetime.combine(st.session_state["from_date"], st.session_state["from_time"])
     end_dt = datetime.combine(st.session_state["to_date"], st.session_state["to_time"])
 
-    # Filter runs based on current settings.
-    filtered_runs = filter_runs(initial_runs, start_dt, end_dt, meta_filters)
+    # Filter runs in the database, one keyset page at a time.
+    catalog = load_run_catalog(engine, start_dt, end_dt, meta_filters)
 
-    # Build run options from the filtered runs.
-    run_options = get_run_options(filtered_runs)
+    # Build run options from the loaded runs, keeping runs that are already selected.
+    run_options = get_run_options(catalog["runs"])
+    loaded_options = set(run_options)
+    run_options += [label for label in st.session_state["selected_runs"] if label not in loaded_options]
 
     # Callback functions for buttons.
     def reset_filters_callback():
         for key, value in defaults.items():
             st.session_state[key] = value
-        for key in meta_keys:
+        for key in meta_options:
             st.session_state[f"meta_{key}"] = []
 
     def select_all_runs_callback():
-        st.session_state["selected_runs"] = get_run_options(filtered_runs)
+        # Every run matching the filters, not only the pages loaded so far
+        while not catalog["exhausted"]:
+            load_more_runs(engine)
+        st.session_state["selected_runs"] = get_run_options(catalog["runs"])
 
     # Build the sidebar UI.
     with st.sidebar:
@@ -101,37 +123,83 @@ def apply_test_run_filters(min_start_time: datetime, max_start_time: datetime, i
 
         button_col1, button_col2 = st.columns(2)
         button_col1.button("Reset Filters", on_click=reset_filters_callback)
-        button_col2.button("All Runs", on_click=select_all_runs_callback)
+        button_col2.button("All Runs", on_click=select_all_runs_callback, help="Select all runs matching the filters")
 
     # Allow the user to select runs from the generated run options.
     selected_labels = st.sidebar.multiselect("Select Test Runs", options=run_options, key="selected_runs")
     selected_run_ids = [int(label.split(" ")[0]) for label in selected_labels] if selected_labels else []
     st.session_state["selected_run_ids"] = selected_run_ids
 
+    with st.sidebar:
+        loaded_col, more_col = st.columns(2)
+        loaded_col.caption(f"{len(catalog['runs'])} runs loaded" + ("" if catalog["exhausted"] else ", more available"))
+        more_col.button("Load More Runs", on_click=load_more_runs, args=(engine,), disabled=catalog["exhausted"])
+
     return selected_run_ids
 
 
-def apply_measurement_filters(df: pd.DataFrame):
-    filters = []
+def get_meta_index(df: pd.DataFrame, cache_key: tuple | None = None) -> MetaIndex:
+    """Return the meta index of `df`, built once per loaded dataset (`cache_key`) and session."""
+    if cache_key is None:
+        return MetaIndex(df)
+    indexes = st.session_state.setdefault("meta_indexes", {})
+    index = indexes.pop(cache_key, None)
+    if index is None or index.size != len(df):
+        index = MetaIndex(df)
+    indexes[cache_key] = index
+    while len(indexes) > META_INDEX_CACHE_SIZE:
+        indexes.pop(next(iter(indexes)))
+    return index
+
+
+@instrument
+def apply_measurement_filters(df: pd.DataFrame, cache_key: tuple | None = None):
+    index = get_meta_index(df, cache_key)
 
     # Name filter
-    name_options = sorted(df["name"].dropna().unique())
-    selected_names = st.multiselect("Measurement Name", options=name_options, default=[])
-    if selected_names:
-        filters.append(df["name"].isin(selected_names))
+    selected_names = st.multiselect("Measurement Name", options=index.name_options, default=[])
 
     # Meta filters
-    meta_df = pd.json_normalize(df["meta"])
-    if not meta_df.empty:
-        for col in meta_df.columns:
-            options = sorted(meta_df[col].dropna().unique())
-            selected = st.multiselect(col.replace("_", " ").title(), options=options, default=[])
-            if selected:
-                filters.append(meta_df[col].isin(selected))
+    meta_selections = {
+        column: st.multiselect(column.replace("_", " ").title(), options=index.options(column), default=[]) for column in index.columns
+    }
 
     # Apply all filters
-    if filters:
-        combined_filter = reduce(lambda a, b: a & b, filters)  # Combine all filters with AND
-        df = df[combined_filter]
+    mask = index.mask(selected_names, meta_selections)
+    if mask is not None:
+        df = df[mask]
+
+    return df
+
+
+def database_filter_toggle() -> bool:
+    return st.toggle(
+        "Filter in Database",
+        value=get_setting("filter_in_database", False, parse_bool),
+        help="Fetch only the rows matching the filters from the database instead of loading all rows of the selected runs.",
+    )
+
+
+def database_filter_selections(engine: Engine, model, run_ids: list[int]) -> tuple[list[str], dict[str, list]]:
+    """Build the name and meta filters from distinct values in the database, returning the selections."""
+    name_options, meta_options = load_measurement_options(engine, model, run_ids)
+
+    selected_names = st.multiselect("Measurement Name", options=name_options, default=[])
+    meta_selections = {
+        key: st.multiselect(key.replace("_", " ").title(), options=options, default=[]) for key, options in meta_options.items()
+    }
+    return selected_names, meta_selections
+
+
+@instrument
+def apply_database_filters(engine: Engine, model, run_ids: list[int], prepare=None) -> pd.DataFrame:
+    """Build the measurement filters from distinct values in the database and fetch only matching rows.
 
+    Without any selection, all rows of the selected runs are loaded through the shared measurement cache.
+    """
+    selected_names, meta_selections = database_filter_selections(engine, model, run_ids)
+    if not selected_names and not any(meta_selections.values()):
+        return load_measurements_progressively(engine, model, run_ids, prepare=prepare)
+    df = load_filtered_measurements(engine, model, run_ids, selected_names, meta_selections, _prepare=prepare)
+    track_frames({model.__tablename__: df})
     return df
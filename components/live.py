@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import streamlit as st
+from data.live import fetch_live_signature
+from data.loader import fetch_run_end_times
+from data.settings import get_setting
+from sqlalchemy import Engine
+
+DEFAULT_LIVE_REFRESH_S = 5.0
+
+
+def live_run_ids(engine: Engine, run_ids: list[int]) -> list[int]:
+    """The runs of the selection still in progress."""
+    return [run_id for run_id, end_time in fetch_run_end_times(engine, run_ids).items() if end_time is None] if run_ids else []
+
+
+def show_live_toggle(engine: Engine, run_ids: list[int], models: list, key: str) -> bool:
+    """Offer a live mode when runs of the selection are in progress, returning whether it is on.
+
+    While on, the page reruns whenever new rows arrive: a fragment polls a cheap signature of the live runs
+    every `live_refresh_s` seconds, and the rerun only fetches the rows inserted since the previous one.
+    """
+    live_ids = live_run_ids(engine, run_ids)
+    if not live_ids:
+        return False
+    if not st.toggle("Live", key=key, help=f"{len(live_ids)} selected run(s) in progress. Refresh the page as their rows arrive."):
+        return False
+    interval = get_setting("live_refresh_s", DEFAULT_LIVE_REFRESH_S, float)
+    st.fragment(watch_live_runs, run_every=interval)(engine, live_ids, models, f"{key}_signature")
+    return True
+
+
+def watch_live_runs(engine: Engine, run_ids: list[int], models: list, signature_key: str) -> None:
+    signature = fetch_live_signature(engine, models, run_ids)
+    previous = st.session_state.get(signature_key)
+    st.session_state[signature_key] = signature
+    if previous is not None and previous != signature:
+        st.rerun()
+    st.caption(f"Live: {len(run_ids)} run(s) in progress, checked at {datetime.now():%H:%M:%S}")
@@ -0,0 +1,75 @@
+import pandas as pd
+import streamlit as st
+from components.tables import format_size
+from data.compact import frame_memory
+from data.settings import get_setting
+
+MB = 1024 * 1024
+
+
+def session_memory_limit() -> int | None:
+    """The per-session ceiling on loaded frames in bytes (`session_memory_mb` setting), None when unset."""
+    limit_mb = get_setting("session_memory_mb", 0, float)
+    return int(limit_mb * MB) if limit_mb > 0 else None
+
+
+def check_session_memory(loaded_bytes: int, placeholder) -> None:
+    """Stop the page once the frames it is loading exceed the session ceiling. Runs loaded so far stay in the shared cache."""
+    limit = session_memory_limit()
+    if limit is None or loaded_bytes <= limit:
+        return
+    placeholder.empty()
+    st.error(
+        f"This selection needs more than the {format_size(limit)} of memory a session may use (`session_memory_mb`). "
+        "Select fewer runs, or turn on **Filter in Database** to load only the rows matching the filters."
+    )
+    st.stop()
+
+
+def track_frames(frames: dict[str, pd.DataFrame]) -> None:
+    """Record the rows, size and uncompacted size of the frames the page holds, for the session memory report."""
+    st.session_state.setdefault("session_memory", {}).update({label: (len(df), *frame_memory(df)) for label, df in frames.items()})
+
+
+def reset_session_memory() -> None:
+    st.session_state["session_memory"] = {}
+
+
+def session_memory_table() -> pd.DataFrame:
+    """Frames held by this session: those loaded by the page, the tails of live runs and the filter indexes."""
+    rows = [(label, *usage) for label, usage in st.session_state.get("session_memory", {}).items()]
+    live_tables = st.session_state.get("live_run_tables")
+    if live_tables is not None:
+        rows += [(f"live {tail.model.__tablename__}", len(tail.frame), *frame_memory(tail.frame)) for tail in live_tables.tails]
+    meta_indexes = st.session_state.get("meta_indexes", {})
+    if meta_indexes:
+        size = sum(index.nbytes for index in meta_indexes.values())
+        rows.append(("filter indexes", sum(index.size for index in meta_indexes.values()), size, size))
+    return pd.DataFrame(
+        [(label, count, size / MB, uncompacted / MB) for label, count, size, uncompacted in rows], columns=["Frame", "Rows", "MB", "Uncompacted MB"]
+    )
+
+
+def show_session_memory(placeholder) -> None:
+    """Render the memory used by the frames of this session, and the savings of compaction, into a sidebar placeholder."""
+    table = session_memory_table()
+    with placeholder.container():
+        with st.expander("Session Memory", icon=":material/memory:"):
+            if table.empty:
+                st.caption("No data loaded yet.")
+                return
+            size, uncompacted = table["MB"].sum() * MB, table["Uncompacted MB"].sum() * MB
+            saved = 1 - size / uncompacted if uncompacted else 0.0
+            limit = session_memory_limit()
+            st.caption(
+                f"{format_size(size)} in memory, {format_size(uncompacted - size)} ({saved:.0%}) saved by compaction"
+                + (f", limit {format_size(limit)}" if limit is not None else "")
+            )
+            st.dataframe(
+                table,
+                column_config={
+                    "MB": st.column_config.NumberColumn("MB", format="%.2f"),
+                    "Uncompacted MB": st.column_config.NumberColumn("Uncompacted MB", format="%.2f"),
+                },
+                hide_index=True,
+            )
@@ -1,34 +1,362 @@
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
+from data.instrumentation import instrument
+from data.series import downsample_indices, viewport
+from plotly.colors import qualitative
+from plotly.subplots import make_subplots
 
+LIMIT_COLOR = "red"
+LIMIT_BAND_COLOR = "rgba(255, 75, 75, 0.12)"
+# Above this many points per figure, traces are rendered with WebGL instead of SVG
+WEBGL_POINT_THRESHOLD = 5000
+AGGREGATE_COLORS = qualitative.Plotly
+# (low, high, opacity) columns of the distribution bands of the aggregate view, outermost first
+AGGREGATE_BANDS = [("min", "max", 0.08), ("p05", "p95", 0.15), ("p25", "p75", 0.25)]
+CPK_TARGET = 1.33
+STATUS_COLORS = {"FAIL": "#FF4B4B", "SKIP": "#FFD166", "PASS": "#74CF80"}
+# Test case status -> count column of the run statistics, in stacking order
+STATUS_COUNT_COLUMNS = {"FAIL": "failed", "SKIP": "skipped", "PASS": "passed"}
 
-def plot_run_statistics(test_df, selected_run_ids, run_df):
-    """Render stacked bar plot of test run statistics."""
+
+@instrument
+def plot_run_statistics(stats_df, selected_run_ids):
+    """Render stacked bar plot of test run statistics from the per-run status counts."""
     st.subheader("Test Run Statistics")
 
-    test_data = test_df[test_df["run_id"].isin(selected_run_ids)]
-    if test_data.empty:
+    stats_df = stats_df[stats_df["run_id"].isin(selected_run_ids)].sort_values(["start_time", "run_id"])
+    if stats_df.empty:
         st.info("No test data available for the selected runs.")
         return
 
-    run_labels = {row["run_id"]: f"{row['run_id']} - {row['start_time'].strftime('%Y-%m-%d %H:%M:%S')}" for _, row in run_df.iterrows()}
+    labels = stats_df["run_id"].astype(str) + " - " + pd.to_datetime(stats_df["start_time"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    fig = go.Figure()
+    for status, column in STATUS_COUNT_COLUMNS.items():
+        if stats_df[column].any():
+            fig.add_trace(go.Bar(x=labels, y=stats_df[column], name=status, marker_color=STATUS_COLORS[status]))
+
+    fig.update_layout(xaxis_title="Run", yaxis_title="Number of Tests", barmode="stack", legend_title="Test Status")
+    st.plotly_chart(fig, use_container_width=True)
 
-    status_counts = test_data.groupby(["run_id", "status"]).size().unstack(fill_value=0)
-    status_counts["label"] = status_counts.index.map(run_labels)
+
+@instrument
+def plot_run_trend(trend_df):
+    """Render status counts and pass rate of all filtered runs over time."""
+    st.subheader("Test Run Trend")
+
+    if trend_df.empty:
+        st.info("No rolled-up run statistics available for the current filters.")
+        return
 
     fig = go.Figure()
-    color_map = {"FAIL": "#FF4B4B", "SKIP": "#FFD166", "PASS": "#74CF80"}
+    for status, column in STATUS_COUNT_COLUMNS.items():
+        fig.add_trace(
+            go.Scatter(
+                x=trend_df["start_time"],
+                y=trend_df[column],
+                name=status,
+                mode="lines",
+                stackgroup="status",
+                line=dict(color=STATUS_COLORS[status], width=0.5),
+                customdata=trend_df["run_id"],
+                hovertemplate="Run %{customdata}<br>%{y}",
+            )
+        )
+    pass_rate = 100 * trend_df["passed"] / trend_df["total"].where(trend_df["total"] > 0)
+    fig.add_trace(
+        go.Scatter(x=trend_df["start_time"], y=pass_rate, name="Pass Rate (%)", mode="lines", line=dict(color="black", dash="dot"), yaxis="y2")
+    )
 
-    for status in ["FAIL", "SKIP", "PASS"]:
-        if status in status_counts.columns:
-            fig.add_trace(
-                go.Bar(
-                    x=status_counts["label"],
-                    y=status_counts[status],
-                    name=status,
-                    marker_color=color_map[status],
+    fig.update_layout(
+        xaxis_title="Start Time",
+        yaxis_title="Number of Tests",
+        yaxis2=dict(title="Pass Rate (%)", overlaying="y", side="right", range=[0, 100]),
+        legend_title="Test Status",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@instrument
+def build_status_heatmap(matrix):
+    """Build a (test case x run) heatmap of the status codes of a `StatusMatrix`."""
+    # Discrete colorscale: one band per status code
+    colors = ["#F0F2F6", STATUS_COLORS["PASS"], STATUS_COLORS["FAIL"], STATUS_COLORS["SKIP"], "#A3A8B8"]
+    colorscale = [[position, color] for i, color in enumerate(colors) for position in (i / len(colors), (i + 1) / len(colors))]
+    row_labels = [f"{suite} / {name}" for suite, name in matrix.rows]
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=matrix.codes,
+            x=matrix.run_labels,
+            y=row_labels,
+            zmin=-0.5,
+            zmax=len(colors) - 0.5,
+            colorscale=colorscale,
+            colorbar=dict(tickvals=list(range(len(colors))), ticktext=["Not Run", "PASS", "FAIL", "SKIP", "Unknown"]),
+            hovertemplate="%{y}<br>%{x}<extra></extra>",
+            xgap=1,
+        )
+    )
+    fig.update_layout(yaxis=dict(autorange="reversed", showticklabels=len(row_labels) <= 100), height=min(max(300, 15 * len(row_labels)), 1500))
+    return fig
+
+
+def scatter_type(n_points: int) -> tuple[type, bool]:
+    """Pick the WebGL scatter above `WEBGL_POINT_THRESHOLD` points. Returns (trace class, uses WebGL)."""
+    if n_points > WEBGL_POINT_THRESHOLD:
+        return go.Scattergl, True
+    return go.Scatter, False
+
+
+def pack_segments(segments: list[np.ndarray]) -> np.ndarray:
+    """Concatenate arrays into one, separated by NaN so that each segment is drawn as its own line."""
+    if not segments:
+        return np.empty(0)
+    separator = np.array([np.nan])
+    return np.concatenate([part for segment in segments for part in (segment, separator)][:-1])
+
+
+@instrument
+def build_numeric_figure(numeric_df, x_column, mode, line_shape):
+    """Build the numeric figure with one trace per label and limits drawn as horizontal lines."""
+    scatter, use_webgl = scatter_type(len(numeric_df))
+    if use_webgl and line_shape == "spline":
+        line_shape = "linear"  # WebGL traces do not support spline interpolation
+
+    fig = go.Figure()
+    for label, group in numeric_df.groupby("label", observed=True):
+        fig.add_trace(
+            scatter(
+                x=group[x_column],
+                y=group["value"],
+                mode=mode,
+                name=label,
+                line=dict(shape=line_shape) if line_shape else None,
+            )
+        )
+
+    for limit_name, column in [("Lower Limit", "lower_limit"), ("Upper Limit", "upper_limit")]:
+        limits = numeric_df[column].dropna().unique()
+        if len(limits):
+            fig.add_hline(y=limits[0], line_dash="dash", line_color=LIMIT_COLOR, annotation_text=limit_name, annotation_position="top left")
+    return fig
+
+
+@instrument
+def build_aggregate_figure(agg_df, bands):
+    """Build the aggregate trend figure: the median of every bucket per name, with optional min/max, p5/p95 and p25/p75 bands."""
+    fig = go.Figure()
+    for i, (name, group) in enumerate(agg_df.groupby("name", sort=True)):
+        color = AGGREGATE_COLORS[i % len(AGGREGATE_COLORS)]
+        if bands:
+            for low, high, opacity in AGGREGATE_BANDS:
+                fig.add_trace(
+                    go.Scatter(
+                        x=group["bucket"], y=group[high], mode="lines", line=dict(width=0), legendgroup=name, showlegend=False, hoverinfo="skip"
+                    )
+                )
+                fig.add_trace(
+                    go.Scatter(
+                        x=group["bucket"],
+                        y=group[low],
+                        mode="lines",
+                        line=dict(width=0),
+                        fill="tonexty",
+                        fillcolor=with_opacity(color, opacity),
+                        legendgroup=name,
+                        showlegend=False,
+                        hoverinfo="skip",
+                    )
                 )
+        fig.add_trace(
+            go.Scatter(
+                x=group["bucket"],
+                y=group["p50"],
+                mode="lines+markers",
+                name=name,
+                legendgroup=name,
+                line=dict(color=color),
+                customdata=group[["mean", "count", "yield"]],
+                hovertemplate="Median %{y:.4g}<br>Mean %{customdata[0]:.4g}<br>%{customdata[1]} values<br>Yield %{customdata[2]:.1f}%",
             )
+        )
+    return fig
 
-    fig.update_layout(xaxis_title="Run", yaxis_title="Number of Tests", barmode="stack", legend_title="Test Status")
-    st.plotly_chart(fig, use_container_width=True)
+
+@instrument
+def build_envelope_figure(envelope, outliers, label):
+    """Build the envelope figure of one measurement: the min/max, p5/p95 and p25/p75 bands, the reference and the outlier series.
+
+    Bands and reference are one trace each, so the figure size grows with the outliers drawn, not with the number of series.
+    """
+    color = AGGREGATE_COLORS[0]
+    fig = go.Figure()
+    for low, high, opacity in AGGREGATE_BANDS:
+        fig.add_trace(go.Scatter(x=envelope.grid, y=envelope.envelope[high], mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fig.add_trace(
+            go.Scatter(
+                x=envelope.grid,
+                y=envelope.envelope[low],
+                mode="lines",
+                line=dict(width=0),
+                fill="tonexty",
+                fillcolor=with_opacity(color, opacity),
+                name=f"{low}-{high}",
+                hoverinfo="skip",
+            )
+        )
+    fig.add_trace(go.Scatter(x=envelope.grid, y=envelope.envelope["reference"], mode="lines", name=f"Reference - {label}", line=dict(color=color)))
+    for i, (row, run_id, rms_z) in enumerate(zip(outliers["row"], outliers["run_id"], outliers["rms_z"]), start=1):
+        fig.add_trace(
+            go.Scatter(
+                x=envelope.grid,
+                y=envelope.values[row],
+                mode="lines",
+                name=f"Run {run_id}",
+                line=dict(color=AGGREGATE_COLORS[i % len(AGGREGATE_COLORS)], width=1),
+                hovertemplate=f"Run {run_id} (RMS z {rms_z:.2f})<br>x=%{{x}}<br>y=%{{y}}<extra></extra>",
+            )
+        )
+    return fig
+
+
+@instrument
+def build_control_chart(chart_df, x_column, panels, violations):
+    """Build a two-panel control chart (e.g. X̄ over R) from the (title, value, center, ucl, lcl) columns of each panel.
+
+    Points of the first panel violating any of the `violations` rule columns are circled.
+    """
+    scatter, _ = scatter_type(len(chart_df))
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08, row_heights=[0.6, 0.4])
+    for row, (title, value, center, ucl, lcl) in enumerate(panels, start=1):
+        fig.add_trace(scatter(x=chart_df[x_column], y=chart_df[value], mode="lines+markers", name=title, line=dict(color="#636EFA")), row=row, col=1)
+        for column, dash in [(center, "solid"), (ucl, "dash"), (lcl, "dash")]:
+            if column is not None:
+                fig.add_trace(
+                    scatter(
+                        x=chart_df[x_column],
+                        y=chart_df[column],
+                        mode="lines",
+                        line=dict(color=LIMIT_COLOR if dash == "dash" else "gray", dash=dash, width=1),
+                        showlegend=False,
+                        hoverinfo="skip",
+                    ),
+                    row=row,
+                    col=1,
+                )
+        fig.update_yaxes(title_text=title, row=row, col=1)
+
+    flagged = chart_df[chart_df[violations].any(axis=1)]
+    if not flagged.empty:
+        rules = flagged[violations].apply(lambda row: ", ".join(rule for rule, violated in row.items() if violated), axis=1)
+        fig.add_trace(
+            scatter(
+                x=flagged[x_column],
+                y=flagged[panels[0][1]],
+                mode="markers",
+                name="Rule Violation",
+                marker=dict(color=LIMIT_COLOR, size=10, symbol="circle-open", line=dict(width=2)),
+                text=rules,
+                hovertemplate="%{y:.4g}<br>%{text}",
+            ),
+            row=1,
+            col=1,
+        )
+    return fig
+
+
+@instrument
+def build_rolling_capability_figure(rolling_df, x_column, window):
+    """Build the rolling Cpk figure, with the usual 1.33 capability target."""
+    fig = go.Figure(go.Scatter(x=rolling_df[x_column], y=rolling_df["cpk"], mode="lines+markers", name=f"Cpk ({window} runs)"))
+    fig.add_hline(y=CPK_TARGET, line_dash="dash", line_color=LIMIT_COLOR, annotation_text=f"Cpk {CPK_TARGET}", annotation_position="top left")
+    return fig
+
+
+def with_opacity(color: str, opacity: float) -> str:
+    red, green, blue = (int(color[i : i + 2], 16) for i in (1, 3, 5))
+    return f"rgba({red}, {green}, {blue}, {opacity})"
+
+
+@instrument
+def build_series_figure(series_df, mode, line_shape, max_points, x_range=None, method="minmax"):
+    """Build the series figure from decoded arrays, downsampling each series to `max_points` inside `x_range`.
+
+    All series of a label are packed into a single NaN-separated trace, and their limits into one band trace,
+    so the figure size grows with the number of labels rather than the number of rows.
+    """
+    labels = []
+    for label, group in series_df.groupby("label", observed=True):
+        packed = {"x": [], "y": [], "run_id": [], "band_x": [], "band_y": [], "lower_x": [], "lower": [], "upper_x": [], "upper": []}
+        columns = [group[column] for column in ["run_id", "x_data", "y_data", "lower_limits", "upper_limits"]]
+        for run_id, x, y, lower, upper in zip(*columns):
+            # Limits are only drawn when they have one value per sample
+            lower = lower if lower.size == y.size else lower[:0]
+            upper = upper if upper.size == y.size else upper[:0]
+            window = viewport(x, x_range)
+            indices = downsample_indices(x[window], y[window], max_points, method)
+            x, y = x[window][indices], y[window][indices]
+            lower = lower[window][indices] if lower.size else lower
+            upper = upper[window][indices] if upper.size else upper
+
+            packed["x"].append(x)
+            packed["y"].append(y)
+            packed["run_id"].append(np.full(x.size, run_id, dtype=float))
+            if lower.size and upper.size:
+                # Closed polygon along the upper limit and back along the lower limit
+                packed["band_x"].append(np.concatenate([x, x[::-1]]))
+                packed["band_y"].append(np.concatenate([upper, lower[::-1]]))
+            elif lower.size:
+                packed["lower_x"].append(x)
+                packed["lower"].append(lower)
+            elif upper.size:
+                packed["upper_x"].append(x)
+                packed["upper"].append(upper)
+        labels.append((label, {key: pack_segments(segments) for key, segments in packed.items()}))
+
+    scatter, use_webgl = scatter_type(sum(packed["x"].size for _, packed in labels))
+    if use_webgl and line_shape == "spline":
+        line_shape = "linear"  # WebGL traces do not support spline interpolation
+
+    fig = go.Figure()
+    for label, packed in labels:
+        fig.add_trace(
+            scatter(
+                x=packed["x"],
+                y=packed["y"],
+                customdata=packed["run_id"],
+                hovertemplate="Run %{customdata:.0f}<br>x=%{x}<br>y=%{y}",
+                mode=mode,
+                name=label,
+                line=dict(shape=line_shape) if line_shape else None,
+            )
+        )
+        if packed["band_x"].size:
+            fig.add_trace(
+                scatter(
+                    x=packed["band_x"],
+                    y=packed["band_y"],
+                    mode="lines",
+                    name=f"Limits - {label}",
+                    line=dict(width=0),
+                    fill="toself",
+                    fillcolor=LIMIT_BAND_COLOR,
+                    hoverinfo="skip",
+                    showlegend=False,
+                )
+            )
+        for limit_name, x_key, y_key in [("Lower Limit", "lower_x", "lower"), ("Upper Limit", "upper_x", "upper")]:
+            if packed[y_key].size:
+                fig.add_trace(
+                    scatter(
+                        x=packed[x_key],
+                        y=packed[y_key],
+                        mode="lines",
+                        name=f"{limit_name} - {label}",
+                        line=dict(dash="dash", color=LIMIT_COLOR),
+                        showlegend=False,
+                    )
+                )
+    return fig
@@ -0,0 +1,120 @@
+from typing import Iterator
+
+import pandas as pd
+import streamlit as st
+from components.live import live_run_ids
+from components.memory import check_session_memory, track_frames
+from data.compact import concat_frames
+from data.db import load_selected_data
+from data.instrumentation import instrument
+from data.live import LIVE_MODELS, LiveRunTables
+from data.loader import DEFAULT_CHUNK_SIZE, DEFAULT_RUN_BATCH_SIZE, batched
+from data.measurement_cache import concat_run_frames, get_disk_cache, get_measurement_cache, iter_measurements
+from data.prefetch import get_prefetcher
+from data.settings import get_setting, parse_bool
+from sqlalchemy import Engine
+
+
+def cancel_loading(cancel_key: str, run_ids: list[int]) -> None:
+    st.session_state[cancel_key] = run_ids
+
+
+def resume_loading(cancel_key: str) -> None:
+    st.session_state.pop(cancel_key, None)
+
+
+def show_cancelled(cancel_key: str, run_ids: list[int]) -> None:
+    """Stop the page if loading of this run selection was cancelled, offering to resume."""
+    if st.session_state.get(cancel_key) == run_ids:
+        st.info("Loading was cancelled. Runs loaded so far are cached, resuming only fetches the rest.")
+        st.button("Resume Loading", on_click=resume_loading, args=(cancel_key,))
+        st.stop()
+
+
+@instrument
+def load_measurements_progressively(engine, model, run_ids: list[int], prepare=None, tail_live: bool = False) -> pd.DataFrame:
+    """Load measurements run by run, showing progress and a Cancel button. With `tail_live`, runs in progress only fetch their new rows.
+
+    Loading stops once the frames exceed the `session_memory_mb` ceiling, and the loaded frame is recorded for the session memory report.
+    """
+    run_ids = sorted(set(run_ids))
+    cancel_key = f"{model.__tablename__}_loading_cancelled"
+    show_cancelled(cancel_key, run_ids)
+
+    # Let a running background prefetch of this selection finish instead of fetching the same rows twice
+    prefetch = get_prefetcher().running(model.__tablename__, run_ids)
+    if prefetch is not None:
+        with st.spinner("Finishing background prefetch..."):
+            prefetch.exception()
+
+    placeholder = st.empty()
+    with placeholder.container():
+        progress = st.progress(0.0, text="Loading measurements...")
+        st.button("Cancel", on_click=cancel_loading, args=(cancel_key, run_ids))
+
+    cache = get_measurement_cache()
+    frames = {}
+    rows = loaded_bytes = 0
+    for run_id, frame in iter_measurements(engine, model, run_ids, prepare, cache=cache, tail_live=tail_live):
+        frames[run_id] = frame
+        rows += len(frame)
+        loaded_bytes += cache.nbytes((model.__tablename__, run_id)) or int(frame.memory_usage(deep=True).sum())
+        check_session_memory(loaded_bytes, placeholder)
+        progress.progress(len(frames) / len(run_ids), text=f"Loaded {len(frames)}/{len(run_ids)} runs ({rows:,} rows)")
+    placeholder.empty()
+    df = concat_run_frames(frames)
+    track_frames({model.__tablename__: df})
+    return df
+
+
+def start_prefetch(engine: Engine, run_ids: list[int]) -> None:
+    """Load the measurement tables of `run_ids` into the shared cache in the background (`prefetch_measurements` setting)."""
+    if get_setting("prefetch_measurements", True, parse_bool):
+        chunk_size = get_setting("chunk_size", DEFAULT_CHUNK_SIZE, int)
+        get_prefetcher().submit(engine, get_measurement_cache(), get_disk_cache(), run_ids, chunk_size)
+
+
+def iter_selected_data_progressively(engine: Engine, run_ids: list[int]) -> Iterator[tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
+    """Load the Test Run data in batches of runs, yielding the accumulated frames after each batch.
+
+    Finished runs are cached per batch. Runs in progress are tailed per session, each rerun only reading their new and unfinished rows.
+    Loading stops once the frames exceed the `session_memory_mb` ceiling.
+    """
+    run_ids = sorted(set(run_ids))
+    live_ids = live_run_ids(engine, run_ids)
+    finished_ids = [run_id for run_id in run_ids if run_id not in set(live_ids)]
+    cancel_key = "test_run_loading_cancelled"
+    show_cancelled(cancel_key, run_ids)
+
+    placeholder = st.empty()
+    with placeholder.container():
+        progress = st.progress(0.0, text="Loading test runs...")
+        st.button("Cancel", on_click=cancel_loading, args=(cancel_key, run_ids))
+
+    loaded_frames = [[], [], [], []]
+    empty_frames = [pd.DataFrame()] * 4
+    loaded = loaded_bytes = 0
+    run_batches = list(batched(finished_ids, get_setting("run_batch_size", DEFAULT_RUN_BATCH_SIZE, int)))
+    for run_batch in run_batches + ([live_ids] if live_ids else []):
+        frames = get_live_run_tables(live_ids).poll(engine) if run_batch is live_ids else load_selected_data(engine, run_batch)
+        for i, frame in enumerate(frames):
+            if frame.empty:
+                empty_frames[i] = frame  # keeps the columns for selections without rows
+            else:
+                loaded_frames[i].append(frame)
+                loaded_bytes += int(frame.memory_usage(deep=True).sum())
+        check_session_memory(loaded_bytes, placeholder)
+        loaded += len(run_batch)
+        progress.progress(loaded / len(run_ids), text=f"Loaded {loaded}/{len(run_ids)} runs")
+        tables = tuple(concat_frames(frames) if frames else empty for frames, empty in zip(loaded_frames, empty_frames))
+        yield tables
+    placeholder.empty()
+    track_frames({model.__tablename__: frame for model, frame in zip(LIVE_MODELS, tables)})
+
+
+def get_live_run_tables(run_ids: list[int]) -> LiveRunTables:
+    """The session's tail of the runs in progress, started over when they change."""
+    tables = st.session_state.get("live_run_tables")
+    if tables is None or tables.run_ids != sorted(set(run_ids)):
+        tables = st.session_state["live_run_tables"] = LiveRunTables(run_ids)
+    return tables
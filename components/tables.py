@@ -1,4 +1,12 @@
+import pandas as pd
 import streamlit as st
+from components.plots import build_status_heatmap
+from data.compact import frame_memory
+from data.instrumentation import instrument
+from data.overview import StatusMatrix
+
+# Number of test cases per page of the overview table
+OVERVIEW_PAGE_SIZE = 200
 
 STATUS_EMOJI_MAP = {
     "PASS": "✅",
@@ -9,12 +17,13 @@ STATUS_EMOJI_MAP = {
 }
 
 
+@instrument
 def show_summary(run_df, selected_run_ids):
     """Show summary table of test runs."""
     st.subheader("Summary")
 
     summary_df = run_df[run_df["run_id"].isin(selected_run_ids)].copy()
-    summary_df["status"] = summary_df["status"].map(STATUS_EMOJI_MAP)
+    summary_df["status"] = summary_df["status"].astype(object).map(STATUS_EMOJI_MAP)
 
     st.dataframe(
         summary_df,
@@ -32,55 +41,65 @@ def show_summary(run_df, selected_run_ids):
     )
 
 
+@instrument
 def show_test_overview(test_df, suite_df, failure_df, selected_run_ids):
-    """Show test overview table with optional failure details."""
+    """Show test overview table, one page of test cases at a time, with optional failure details, or a status heatmap."""
     st.subheader("Test Overview")
 
-    show_failures = st.toggle("Show Failures", value=False)
-
-    merged_df = test_df[test_df["run_id"].isin(selected_run_ids)].merge(
-        suite_df[["run_id", "suite_id", "name"]].rename(columns={"name": "Test Suite"}),
-        on=["run_id", "suite_id"],
-        how="left",
-    )
-
-    merged_df["Status Emoji"] = merged_df["status"].map(STATUS_EMOJI_MAP).fillna("❔")
+    if test_df.empty:
+        st.info("No test data available for the selected runs.")
+        return
 
-    failures_map = {}
-    if show_failures:
-        failures_map = failure_df.groupby(["run_id", "test_id"])["details"].apply(list).to_dict()
+    matrix = StatusMatrix(test_df, suite_df, selected_run_ids)
+    view = st.segmented_control("View", ["Table", "Heatmap"], default="Table", key="overview_view")
+    if view == "Heatmap":
+        st.plotly_chart(build_status_heatmap(matrix), use_container_width=True)
+        return
 
-    def get_cell_content(row):
-        failures = failures_map.get((row["run_id"], row["test_id"]))
-        if show_failures and failures:
-            return f"{row['Status Emoji']}\n" + "\n".join(failures)
-        return row["Status Emoji"]
+    control_col1, control_col2 = st.columns(2)
+    show_failures = control_col1.toggle("Show Failures", value=False)
+    page_count = -(-len(matrix) // OVERVIEW_PAGE_SIZE)
+    page = control_col2.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+    start, stop = (page - 1) * OVERVIEW_PAGE_SIZE, min(page * OVERVIEW_PAGE_SIZE, len(matrix))
+    if page_count > 1:
+        st.caption(f"Showing test cases {start + 1}-{stop} of {len(matrix)}")
 
-    merged_df["Cell Content"] = merged_df.apply(get_cell_content, axis=1)
+    table = matrix.labels(start, stop, failure_df if show_failures else None)
 
-    pivot = merged_df.pivot_table(
-        index=["Test Suite", "name"],
-        columns="run_id",
-        values="Cell Content",
-        aggfunc="first",
-        fill_value="",
-    )
-    pivot.columns = [f"Run {col}" for col in pivot.columns]
-    pivot.reset_index(inplace=True)
-    pivot.rename(columns={"name": "Test Case"}, inplace=True)
-    pivot.loc[pivot.duplicated(subset=["Test Suite"]), "Test Suite"] = ""
-
-    run_columns = [col for col in pivot.columns if col.startswith("Run")]
     column_config = {
         "Test Suite": st.column_config.TextColumn("Test Suite", width="medium"),
         "Test Case": st.column_config.TextColumn("Test Case", width="medium"),
     }
-    for col in run_columns:
+    for col in matrix.run_labels:
         column_config[col] = st.column_config.TextColumn(col, width="small")
 
     st.dataframe(
-        pivot,
+        table,
         column_config=column_config,
         use_container_width=True,
         hide_index=True,
     )
+
+
+def format_size(size_bytes: int) -> str:
+    size_kb = size_bytes / 1024
+    return f"{size_kb / 1024:,.1f} MB" if size_kb >= 1024 else f"{size_kb:,.0f} KB"
+
+
+def memory_caption(df: pd.DataFrame) -> str:
+    """Rows, columns and in-memory size of `df`, counting the Python objects of object columns, and its size without compaction."""
+    arrow_columns = sum(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    categorical_columns = sum(isinstance(dtype, pd.CategoricalDtype) for dtype in df.dtypes)
+    size, uncompacted = frame_memory(df)
+    return (
+        f"{len(df):,} rows × {len(df.columns)} columns, {format_size(size)} in memory ({format_size(uncompacted)} uncompacted), "
+        f"{arrow_columns} Arrow-backed and {categorical_columns} categorical columns"
+    )
+
+
+@instrument
+def show_data_table(df: pd.DataFrame) -> None:
+    """Show the measurement rows in a collapsed expander, with their memory footprint."""
+    with st.expander("Data Table", expanded=False):
+        st.caption(memory_caption(df))
+        st.dataframe(df)
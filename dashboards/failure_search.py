@@ -0,0 +1,92 @@
+import streamlit as st
+from data.db import load_failure_hits, load_failure_index_status
+from data.failure_search import FAILURE_PAGE_SIZE
+from data.instrumentation import timed
+from sqlalchemy.exc import SQLAlchemyError
+
+
+def reset_page() -> None:
+    st.session_state.pop("failure_search_page", None)
+
+
+st.title("Failure Search")
+
+engine = st.session_state.engine
+start_dt, end_dt, meta_filters = st.session_state.run_catalog["filters"]
+
+query_col, scope_col = st.columns([3, 1], vertical_alignment="bottom")
+query = query_col.text_input(
+    "Search Failure Details",
+    placeholder='"CAN timeout" -retry',
+    help='All words and "quoted phrases" must match. Use OR between terms to match either, -word to exclude a word.',
+)
+selected_only = scope_col.toggle(
+    "Selected Runs Only",
+    value=False,
+    help="Search the runs selected in the sidebar instead of all runs matching the sidebar filters.",
+)
+
+if not query.strip():
+    st.info("Enter words or phrases to search the failures of all runs matching the sidebar filters, best matches first.")
+    st.stop()
+
+run_ids = st.session_state.selected_run_ids if selected_only else None
+if run_ids is not None and not run_ids:
+    st.warning("Please select at least one Test Run, or turn off Selected Runs Only.")
+    st.stop()
+
+index_status = load_failure_index_status(engine)
+if index_status != "ready":
+    if index_status == "invalid":
+        st.error("The failure search index is invalid: its concurrent build failed or was interrupted. Rebuild it by running:")
+    else:
+        st.error("The failure search index is not built yet. Build it by running:")
+    st.code("python -m data.failure_search --db_url=<db_url>", language="bash")
+    st.stop()
+
+# Results start over at the first page whenever the query, the sidebar filters or the run selection change
+scope = (query, start_dt, end_dt, meta_filters, tuple(run_ids) if run_ids is not None else None)
+if st.session_state.get("failure_search_scope") != scope:
+    st.session_state["failure_search_scope"] = scope
+    reset_page()
+
+page = st.session_state.get("failure_search_page", 1)
+try:
+    with timed("failure_search"):
+        hits_df, total = load_failure_hits(engine, query, start_dt, end_dt, meta_filters, run_ids, page)
+        page_count = -(-total // FAILURE_PAGE_SIZE)
+        while total and page > page_count:  # fewer hits than when the page was chosen, e.g. new failures were indexed
+            page = st.session_state["failure_search_page"] = page_count
+            hits_df, total = load_failure_hits(engine, query, start_dt, end_dt, meta_filters, run_ids, page)
+            page_count = -(-total // FAILURE_PAGE_SIZE)
+except SQLAlchemyError:
+    st.error("The failure search index is not available. Build it by running:")
+    st.code("python -m data.failure_search --db_url=<db_url>", language="bash")
+    st.stop()
+
+if not total:
+    st.info("No failures match the search.")
+    st.stop()
+
+start = (page - 1) * FAILURE_PAGE_SIZE
+st.caption(f"{total:,} failures match, showing {start + 1}-{start + len(hits_df)}")
+
+st.dataframe(
+    hits_df,
+    column_config={
+        "score": st.column_config.NumberColumn("Score", format="%.2f", width="small"),
+        "run_id": st.column_config.NumberColumn("Run ID", width="small"),
+        "run": st.column_config.TextColumn("Run", width="medium"),
+        "start_time": st.column_config.DatetimeColumn("Start Time", width="medium"),
+        "suite": st.column_config.TextColumn("Test Suite", width="medium"),
+        "test": st.column_config.TextColumn("Test Case", width="medium"),
+        "source": st.column_config.TextColumn("Source", width="small"),
+        "details": st.column_config.TextColumn("Details", width="large"),
+        "timestamp": st.column_config.DatetimeColumn("Timestamp", width="medium"),
+    },
+    use_container_width=True,
+    hide_index=True,
+)
+if page_count > 1:
+    # The key alone drives the widget: its state is the page above, set back when out of range
+    st.number_input("Page", min_value=1, max_value=page_count, key="failure_search_page")
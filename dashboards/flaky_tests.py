@@ -0,0 +1,67 @@
+import streamlit as st
+from components.plots import build_status_heatmap
+from data.db import load_latest_run_ids
+from data.instrumentation import timed
+from data.status_history import get_status_history_store
+
+# Defaults of the history length and of the executions a test case needs to be ranked
+DEFAULT_HISTORY_RUNS = 1000
+DEFAULT_MIN_EXECUTIONS = 5
+HEATMAP_TESTS = 30
+
+st.title("Flaky Tests")
+
+engine = st.session_state.engine
+start_dt, end_dt, meta_filters = st.session_state.run_catalog["filters"]
+
+runs_col, executions_col = st.columns(2)
+history_runs = runs_col.number_input(
+    "History Length",
+    min_value=10,
+    value=DEFAULT_HISTORY_RUNS,
+    step=100,
+    help="Number of latest runs matching the sidebar filters. Runs still in progress are left out.",
+)
+min_executions = executions_col.number_input(
+    "Min Executions", min_value=2, value=DEFAULT_MIN_EXECUTIONS, help="Rank only test cases that passed or failed in at least this many runs"
+)
+
+run_ids = load_latest_run_ids(engine, start_dt, end_dt, meta_filters, history_runs)
+if not run_ids:
+    st.warning("No runs match the sidebar filters.")
+    st.stop()
+
+with st.spinner("Loading status history..."), timed("status_history"):
+    history = get_status_history_store().history(engine, run_ids)
+    summary = history.summary()
+st.caption(f"{len(history):,} test cases over {len(history.run_ids):,} finished runs")
+
+flaky = summary[(summary["executions"] >= min_executions) & (summary["flips"] > 0)]
+flaky = flaky.sort_values(["flip_rate", "failure_rate"], ascending=False)
+if flaky.empty:
+    st.info("No test case flipped between PASS and FAIL in these runs.")
+    st.stop()
+
+st.subheader("Flakiest Test Cases")
+st.dataframe(
+    flaky,
+    column_config={
+        "suite": st.column_config.TextColumn("Test Suite", width="medium"),
+        "test": st.column_config.TextColumn("Test Case", width="medium"),
+        "executions": st.column_config.NumberColumn("Executions"),
+        "failures": st.column_config.NumberColumn("Failures"),
+        "failure_rate": st.column_config.NumberColumn("Failure Rate", format="percent"),
+        "flips": st.column_config.NumberColumn("Flips", help="Changes between PASS and FAIL from one execution to the next"),
+        "flip_rate": st.column_config.ProgressColumn("Flip Rate", format="percent", min_value=0, max_value=1),
+        "longest_fail_streak": st.column_config.NumberColumn("Longest Fail Streak"),
+        "current_fail_streak": st.column_config.NumberColumn("Current Fail Streak"),
+        "first_failing_run": st.column_config.NumberColumn("First Failing Run", format="%d"),
+        "last_status": st.column_config.TextColumn("Last Status", width="small"),
+    },
+    use_container_width=True,
+    hide_index=True,
+)
+
+st.subheader("Status History")
+st.caption(f"The {min(HEATMAP_TESTS, len(flaky))} flakiest test cases, oldest run first")
+st.plotly_chart(build_status_heatmap(history.subset(flaky.index[:HEATMAP_TESTS].to_numpy())), use_container_width=True)
@@ -1,19 +1,48 @@
+import pandas as pd
 import streamlit as st
-from components.plots import plot_run_statistics
+from components.live import show_live_toggle
+from components.plots import plot_run_statistics, plot_run_trend
+from components.progress import iter_selected_data_progressively, start_prefetch
 from components.tables import show_summary, show_test_overview
-from data.db import load_selected_data
+from data.db import load_run_stats, load_run_trend
+from data.live import LIVE_MODELS
+from data.run_stats import summarize_test_cases
 
 st.title("RoboScope Dashboard")
 
-db = st.session_state.db
+engine = st.session_state.engine
 selected_run_ids = st.session_state.selected_run_ids
 
+with st.expander("Test Run Trend", expanded=not selected_run_ids):
+    plot_run_trend(load_run_trend(engine, *st.session_state.run_catalog["filters"]))
+
 if not selected_run_ids:
     st.warning("Please select at least one Test Run to display statistics.")
     st.stop()
 
-run_df, test_df, suite_df, failure_df = load_selected_data(db, selected_run_ids)
+# Runs in progress are tailed on every rerun, live mode reruns the page as their rows arrive
+show_live_toggle(engine, selected_run_ids, LIVE_MODELS, "test_run_live")
+
+# Measurement pages of this selection then load from the cache
+start_prefetch(engine, selected_run_ids)
+
+# Finished runs are read from the run_stats rollup, the others are counted from their test cases as they load
+stats_df = load_run_stats(engine, selected_run_ids)
+pending_run_ids = set(selected_run_ids) - set(stats_df["run_id"])
+
+statistics_placeholder = st.empty()
+with statistics_placeholder.container():
+    plot_run_statistics(stats_df, selected_run_ids)
+
+plotted_rows = 0
+for run_df, test_df, suite_df, failure_df in iter_selected_data_progressively(engine, selected_run_ids):
+    pending_test_df = test_df[test_df["run_id"].isin(pending_run_ids)] if not test_df.empty else test_df
+    if len(pending_test_df) != plotted_rows:
+        with statistics_placeholder.container():
+            pending_stats_df = summarize_test_cases(pending_test_df, failure_df, run_df)
+            # Without the rollup tables every run is pending, and concatenating the empty rollup frame is deprecated
+            plot_run_statistics(pd.concat([stats_df, pending_stats_df], ignore_index=True) if not stats_df.empty else pending_stats_df, selected_run_ids)
+        plotted_rows = len(pending_test_df)
 
-plot_run_statistics(test_df, selected_run_ids, run_df)
 show_summary(run_df, selected_run_ids)
 show_test_overview(test_df, suite_df, failure_df, selected_run_ids)
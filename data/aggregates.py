@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from data.query_builder import meta_condition
+from sqlalchemy import BigInteger, Engine, Integer, and_, case, cast, func, or_, select
+
+from roboscope.models import NumericMeasurement
+
+# Bucket units of the aggregate view: seconds per unit, None for buckets of consecutive run ids
+BUCKET_UNITS = {"Run": None, "Hour": 3600, "Day": 86400, "Week": 7 * 86400}
+PERCENTILES = {"p05": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95}
+
+
+def bucket_expression(unit: str, size: int, dialect: str):
+    """Integer bucket number of a numeric measurement: `size` consecutive run ids or `size` time units of its timestamp."""
+    model = NumericMeasurement
+    if BUCKET_UNITS[unit] is None:
+        return model.run_id // size
+    if dialect == "sqlite":
+        epoch = cast(func.strftime("%s", model.timestamp), Integer)
+    else:
+        epoch = cast(func.floor(func.extract("epoch", model.timestamp)), BigInteger)
+    return epoch // (BUCKET_UNITS[unit] * size)
+
+
+def aggregate_numeric(
+    engine: Engine, run_ids: list[int], unit: str, size: int, names: list[str] | None = None, meta_selections: dict[str, list] | None = None
+) -> pd.DataFrame:
+    """Per-bucket and name statistics of numeric measurements, computed in the database.
+
+    Returns one row per (bucket, name) with count, mean, std, min, max, the `PERCENTILES` (nearest rank)
+    and the yield against the row limits, so the result size scales with the buckets, not the measurements.
+    """
+    model = NumericMeasurement
+    conditions = [model.run_id.in_(run_ids), model.value.is_not(None)]
+    if names:
+        conditions.append(model.name.in_(names))
+    for key, selected in (meta_selections or {}).items():
+        if selected:
+            conditions.append(meta_condition(model, key, selected, engine.dialect.name))
+
+    bucket = bucket_expression(unit, size, engine.dialect.name)
+    within = and_(or_(model.lower_limit.is_(None), model.value >= model.lower_limit), or_(model.upper_limit.is_(None), model.value <= model.upper_limit))
+    ranked = (
+        select(
+            bucket.label("bucket"),
+            model.name,
+            model.value,
+            case((within, 1), else_=0).label("within"),
+            func.row_number().over(partition_by=[bucket, model.name], order_by=model.value).label("rank"),
+            func.count().over(partition_by=[bucket, model.name]).label("n"),
+            func.avg(model.value).over(partition_by=[bucket, model.name]).label("bucket_mean"),
+        )
+        .where(*conditions)
+        .subquery()
+    )
+    # Nearest-rank percentiles from the window ranks: portable, where `percentile_cont` is not.
+    # The rank is ceil(percent * n / 100), in 1..n for percents in 1..100, in integer arithmetic that every dialect truncates alike.
+    percentiles = [
+        func.max(case((ranked.c.rank == (ranked.c.n * round(fraction * 100) + 99) // 100, ranked.c.value))).label(name)
+        for name, fraction in PERCENTILES.items()
+    ]
+    # Squared deviations from the bucket mean (two passes via a window function), so the std keeps its precision on values far from zero
+    deviation = ranked.c.value - ranked.c.bucket_mean
+    stmt = (
+        select(
+            ranked.c.bucket,
+            ranked.c.name,
+            func.count().label("count"),
+            func.avg(ranked.c.value).label("mean"),
+            func.sum(deviation * deviation).label("m2"),
+            func.min(ranked.c.value).label("min"),
+            func.max(ranked.c.value).label("max"),
+            *percentiles,
+            func.sum(ranked.c.within).label("within"),
+        )
+        .group_by(ranked.c.bucket, ranked.c.name)
+        .order_by(ranked.c.name, ranked.c.bucket)
+    )
+    with engine.connect() as conn:
+        df = pd.read_sql(stmt, conn)
+
+    df["std"] = np.sqrt(df["m2"] / df["count"])
+    df["yield"] = 100 * df["within"] / df["count"]
+    seconds = BUCKET_UNITS[unit]
+    df["bucket"] = df["bucket"] * size if seconds is None else pd.to_datetime(df["bucket"] * seconds * size, unit="s")
+    return df.drop(columns=["m2", "within"])
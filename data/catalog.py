@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from data.query_builder import distinct_meta_values, meta_condition
+from sqlalchemy import Connection, Engine, and_, or_, select
+
+from roboscope.models import TestRun
+
+RUN_PAGE_SIZE = 200
+
+
+def load_meta_options(conn: Connection) -> dict[str, list]:
+    """Return the sorted distinct values of every run meta key."""
+    return distinct_meta_values(conn, TestRun)
+
+
+def build_run_filter(start_dt: datetime, end_dt: datetime, meta_filters: dict, dialect: str):
+    """Translate the sidebar date range and meta selections into a SQL predicate."""
+    conditions = [TestRun.start_time.between(start_dt, end_dt)]
+    for key, selected in meta_filters.items():
+        if selected:
+            conditions.append(meta_condition(TestRun, key, selected, dialect))
+    return and_(*conditions)
+
+
+def fetch_run_page(
+    engine: Engine,
+    start_dt: datetime,
+    end_dt: datetime,
+    meta_filters: dict,
+    after: tuple[int, datetime] | None = None,
+    page_size: int = RUN_PAGE_SIZE,
+) -> list[tuple[int, datetime]]:
+    """Fetch the next page of matching runs, newest first.
+
+    Uses keyset pagination on (start_time, run_id): `after` is the last row of the
+    previous page, so each page costs an index range scan regardless of its depth.
+    """
+    stmt = select(TestRun.run_id, TestRun.start_time).where(build_run_filter(start_dt, end_dt, meta_filters, engine.dialect.name))
+    if after is not None:
+        after_run_id, after_time = after
+        stmt = stmt.where(
+            or_(
+                TestRun.start_time < after_time,
+                and_(TestRun.start_time == after_time, TestRun.run_id < after_run_id),
+            )
+        )
+    stmt = stmt.order_by(TestRun.start_time.desc(), TestRun.run_id.desc()).limit(page_size)
+
+    with engine.connect() as conn:
+        return [(run_id, start_time) for run_id, start_time in conn.execute(stmt)]
+
+
+def fetch_latest_run_ids(engine: Engine, start_dt: datetime, end_dt: datetime, meta_filters: dict, limit: int) -> list[int]:
+    """The `limit` latest runs matching the sidebar filters, oldest first."""
+    stmt = (
+        select(TestRun.run_id)
+        .where(build_run_filter(start_dt, end_dt, meta_filters, engine.dialect.name))
+        .order_by(TestRun.start_time.desc(), TestRun.run_id.desc())
+        .limit(limit)
+    )
+    with engine.connect() as conn:
+        return [run_id for (run_id,) in conn.execute(stmt)][::-1]
@@ -0,0 +1,101 @@
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+from data.disk_cache import JSON_COLUMNS
+from data.settings import get_setting, parse_bool
+from pandas.api.types import union_categoricals
+
+try:
+    import orjson
+except ImportError:  # optional, only speeds up encoding and decoding of JSON columns
+    orjson = None
+
+# Low-cardinality string columns of the run, test and measurement tables, stored as categoricals
+CATEGORY_COLUMNS = ["name", "status", "mode", "unit", "dut", "source", "x_label", "x_unit", "y_label", "y_unit"]
+# A string column only becomes categorical when it has at most this many distinct values per row
+MAX_CATEGORY_RATIO = 0.5
+
+
+def compact_frames_enabled() -> bool:
+    """Whether loaded frames are compacted (`compact_frames` setting)."""
+    return get_setting("compact_frames", True, parse_bool)
+
+
+def dumps_json(value) -> str:
+    """Compact JSON text of a value. Keys keep their order, so that meta filters and tables list them as stored."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads_json(text: str):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def json_categorical(values: pd.Series) -> pd.Categorical:
+    """A JSON column (dicts or lists) as a categorical of JSON text, each distinct value being stored once."""
+    return pd.Categorical([dumps_json(value) if isinstance(value, (dict, list)) else value if isinstance(value, str) else None for value in values])
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink a freshly loaded frame: low-cardinality strings and JSON columns become categoricals, int64 columns are downcast.
+
+    JSON columns (`meta`, `tags`) keep the JSON text of each distinct value once, and are flattened from
+    their categories by `MetaIndex`. Floats keep their precision and Arrow-backed columns are left as they are.
+    A no-op when the `compact_frames` setting is off.
+    """
+    if df.empty or not compact_frames_enabled():
+        return df
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype != object:
+            if values.dtype == np.int64:
+                columns[column] = pd.to_numeric(values, downcast="integer")
+        elif column in JSON_COLUMNS:
+            columns[column] = json_categorical(values)
+        elif column in CATEGORY_COLUMNS and values.nunique() <= MAX_CATEGORY_RATIO * len(values):
+            columns[column] = values.astype("category")
+    return df.assign(**columns) if columns else df
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames, keeping the columns that are categorical in all of them categorical.
+
+    `pd.concat` turns categoricals with different categories into object columns, so their categories are unified first.
+    """
+    if not frames:
+        return pd.DataFrame()
+    categorical = [
+        column
+        for column in frames[0].columns
+        if all(column in frame.columns and isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames)
+    ]
+    if len(frames) > 1 and categorical:
+        categories = {column: union_categoricals([frame[column] for frame in frames], ignore_order=True).categories for column in categorical}
+        frames = [frame.assign(**{column: frame[column].cat.set_categories(categories[column]) for column in categorical}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def frame_memory(df: pd.DataFrame) -> tuple[int, int]:
+    """Deep memory size of `df` in bytes, and an estimate of its size without compaction.
+
+    The estimate counts categorical columns as the object columns they replace (a pointer and a string, or dict, per row)
+    and downcast integers as int64, from the categories and their counts, without rebuilding the uncompacted columns.
+    """
+    usage = df.memory_usage(deep=True)
+    size = int(usage.sum())
+    uncompacted = size
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = [loads_json(value) for value in values.cat.categories] if column in JSON_COLUMNS else values.cat.categories
+            sizes = np.array([sys.getsizeof(value) for value in categories], dtype=np.int64)
+            codes = values.cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(sizes))
+            uncompacted += len(values) * 8 + int(counts @ sizes) - int(usage[column])
+        elif isinstance(values.dtype, np.dtype) and values.dtype.kind == "i":
+            uncompacted += len(values) * (8 - values.dtype.itemsize)
+    return size, uncompacted
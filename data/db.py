@@ -1,29 +1,161 @@
 from datetime import datetime
+from typing import Callable
 
 import pandas as pd
-from streamlit import cache_data
+from data.aggregates import aggregate_numeric
+from data.catalog import fetch_latest_run_ids, fetch_run_page, load_meta_options
+from data.compact import compact_frame
+from data.failure_search import failure_index_status, refresh_failure_index, search_failures
+from data.indexes import find_missing_indexes
+from data.instrumentation import instrument_engine
+from data.loader import arrow_dtypes, fetch_run_tables
+from data.pool import engine_options
+from data.query_builder import fetch_filtered_measurements, measurement_options
+from data.run_stats import DEFAULT_STALE_RUN_HOURS, fetch_run_stats, fetch_run_trend, missing_run_stats_tables, refresh_run_stats, run_stats
+from data.settings import get_setting, parse_bool
+from sqlalchemy import Engine, create_engine, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from streamlit import cache_data, cache_resource
 
-from roboscope.database import Database
 from roboscope.models import Failure, TestCase, TestRun, TestSuite
 
 
-@cache_data
-def load_initial_data(_db: Database) -> tuple[datetime, datetime, list[tuple]]:
-    min_start_time = _db.query(TestRun).min("start_time")
-    max_start_time = _db.query(TestRun).max("start_time")
-    count = _db.query(TestRun).count()
-    initial_runs = _db.query(TestRun).limit(min(5, count)).values("run_id", "start_time", "meta")
-    return min_start_time, max_start_time, initial_runs
+@cache_resource
+def get_engine(db_url: str) -> Engine:
+    """Engine and connection pool shared by all sessions of the process, configured by the pool settings."""
+    return instrument_engine(create_engine(db_url, **engine_options(db_url)))
+
+
+@cache_data(ttl=60)
+def load_run_summary(_engine: Engine) -> tuple[datetime, datetime]:
+    """Start time range of all runs: two lookups on the `start_time` index, refreshed every minute so new runs show up."""
+    with _engine.connect() as conn:
+        return tuple(conn.execute(select(func.min(TestRun.start_time), func.max(TestRun.start_time))).one())
+
+
+@cache_data(ttl=600)
+def load_run_meta_options(_engine: Engine) -> dict[str, list]:
+    """Distinct run meta values for the sidebar filters. Scans all runs, so it is shared by all sessions for 10 minutes."""
+    with _engine.connect() as conn:
+        return load_meta_options(conn)
+
+
+@cache_data(ttl=60)
+def load_run_page(
+    _engine: Engine, start_dt: datetime, end_dt: datetime, meta_filters: dict, after: tuple[int, datetime] | None = None
+) -> list[tuple[int, datetime]]:
+    """Page of the run catalog, shared by all sessions, so a new session renders the sidebar without querying."""
+    return fetch_run_page(_engine, start_dt, end_dt, meta_filters, after)
+
+
+@cache_data(ttl=60)
+def load_latest_run_ids(_engine: Engine, start_dt: datetime, end_dt: datetime, meta_filters: dict, limit: int) -> list[int]:
+    return fetch_latest_run_ids(_engine, start_dt, end_dt, meta_filters, limit)
+
+
+@cache_data(ttl=600)
+def load_missing_indexes(_engine: Engine) -> dict[str, tuple[str, tuple[str, ...]]]:
+    return find_missing_indexes(_engine)
 
 
 @cache_data
-def load_selected_data(_db: Database, run_ids: list[int]) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def load_selected_data(_engine: Engine, run_ids: list[int]) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Fetch the runs, test cases, suites and failures of `run_ids`, the four queries running concurrently, as compacted frames."""
     if not run_ids:
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-    return (
-        _db.query(TestRun).where_in("run_id", run_ids).as_dataframe(),
-        _db.query(TestCase).where_in("run_id", run_ids).as_dataframe(),
-        _db.query(TestSuite).where_in("run_id", run_ids).as_dataframe(),
-        _db.query(Failure).where_in("run_id", run_ids).as_dataframe(),
-    )
+    run_df, test_df, suite_df, failure_df = fetch_run_tables(_engine, [TestRun, TestCase, TestSuite, Failure], run_ids)
+    return compact_frame(run_df), compact_frame(test_df), compact_frame(suite_df), compact_frame(failure_df)
+
+
+@cache_data(ttl=60)
+def load_measurement_options(_engine: Engine, model, run_ids: list[int]) -> tuple[list[str], dict[str, list]]:
+    return measurement_options(_engine, model, run_ids)
+
+
+@cache_data(ttl=60)
+def load_filtered_measurements(
+    _engine: Engine,
+    model,
+    run_ids: list[int],
+    names: list[str],
+    meta_selections: dict[str, list],
+    _prepare: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+) -> pd.DataFrame:
+    df = fetch_filtered_measurements(_engine, model, run_ids, names, meta_selections, arrow_dtypes())
+    return compact_frame(_prepare(df) if _prepare is not None and not df.empty else df)
+
+
+@cache_data(ttl=60)
+def load_numeric_aggregates(
+    _engine: Engine, run_ids: list[int], unit: str, size: int, names: list[str], meta_selections: dict[str, list]
+) -> pd.DataFrame:
+    return aggregate_numeric(_engine, run_ids, unit, size, names, meta_selections)
+
+
+@cache_data(ttl=600)
+def load_missing_run_stats_tables(_engine: Engine) -> list[str]:
+    return missing_run_stats_tables(_engine)
+
+
+@cache_data(ttl=60)
+def refresh_run_stats_periodically(_engine: Engine) -> int:
+    """Roll up newly finished runs at most once a minute (opt-in `refresh_run_stats` setting).
+
+    The app never creates the rollup tables, `python -m data.run_stats` does; it only tops up existing ones.
+    """
+    if not get_setting("refresh_run_stats", False, parse_bool):
+        return 0
+    try:
+        return refresh_run_stats(_engine, stale_hours=get_setting("stale_run_hours", DEFAULT_STALE_RUN_HOURS, float), create=False)
+    except SQLAlchemyError:
+        return 0
+
+
+@cache_data(ttl=60)
+def load_run_stats(_engine: Engine, run_ids: list[int]) -> pd.DataFrame:
+    """Rolled-up statistics of the selected runs. Runs not rolled up yet are missing from the result."""
+    refresh_run_stats_periodically(_engine)
+    try:
+        return fetch_run_stats(_engine, run_ids)
+    except SQLAlchemyError:  # rollup tables not created
+        return pd.DataFrame(columns=[column.name for column in run_stats.columns])
+
+
+@cache_data(ttl=60)
+def load_run_trend(_engine: Engine, start_dt: datetime, end_dt: datetime, meta_filters: dict) -> pd.DataFrame:
+    refresh_run_stats_periodically(_engine)
+    try:
+        return fetch_run_trend(_engine, start_dt, end_dt, meta_filters)
+    except SQLAlchemyError:
+        return pd.DataFrame(columns=[column.name for column in run_stats.columns])
+
+
+@cache_data(ttl=60)
+def load_failure_index_status(_engine: Engine) -> str:
+    try:
+        return failure_index_status(_engine)
+    except SQLAlchemyError:
+        return "missing"
+
+
+@cache_data(ttl=60)
+def refresh_failure_index_periodically(_engine: Engine) -> int:
+    """Index newly inserted failures at most once a minute (opt-in `refresh_failure_index` setting, SQLite only).
+
+    The app never creates the index, `python -m data.failure_search` does; it only tops up an existing one.
+    """
+    if not get_setting("refresh_failure_index", False, parse_bool):
+        return 0
+    try:
+        return refresh_failure_index(_engine, create=False)
+    except SQLAlchemyError:
+        return 0
+
+
+@cache_data(ttl=60)
+def load_failure_hits(
+    _engine: Engine, query: str, start_dt: datetime, end_dt: datetime, meta_filters: dict, run_ids: list[int] | None, page: int
+) -> tuple[pd.DataFrame, int]:
+    refresh_failure_index_periodically(_engine)
+    return search_failures(_engine, query, start_dt, end_dt, meta_filters, run_ids, page)
@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Bumped whenever the layout of the cached frames changes, invalidating older files
+CACHE_VERSION = "1"
+VERSION_KEY = b"roboscope_ui.cache_version"
+END_TIME_KEY = b"roboscope_ui.end_time"
+# Free-form JSON columns, stored as JSON text since their keys and value types vary between rows
+JSON_COLUMNS = ["meta", "tags"]
+
+
+def encode_end_time(end_time: datetime) -> bytes:
+    return pd.Timestamp(end_time).isoformat().encode()
+
+
+class DiskCache:
+    """Parquet files of finished runs, one per (measurement table, run), under `directory`.
+
+    Each file records the end time of its run, and is ignored once the run's end time in the database differs.
+    Decoded series arrays are stored as Arrow lists, so they are not decoded again. Files are memory-mapped on read.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def path(self, table: str, run_id: int) -> Path:
+        return self.directory / table / f"run_{run_id}.parquet"
+
+    def get(self, table: str, run_id: int, end_time: datetime, arrow: bool = False) -> pd.DataFrame | None:
+        """The cached frame of a finished run, or None if missing or stale. With `arrow`, columns have Arrow-backed dtypes."""
+        path = self.path(table, run_id)
+        try:
+            metadata = pq.read_schema(path, memory_map=True).metadata or {}
+        except (OSError, pa.ArrowInvalid):
+            return None
+        if metadata.get(VERSION_KEY) != CACHE_VERSION.encode() or metadata.get(END_TIME_KEY) != encode_end_time(end_time):
+            return None
+        return decode_frame(pq.read_table(path, memory_map=True).to_pandas(types_mapper=arrow_dtype if arrow else None))
+
+    def put(self, table: str, run_id: int, end_time: datetime, frame: pd.DataFrame) -> None:
+        """Write the frame of a finished run. The file is replaced atomically, so concurrent readers never see a partial file."""
+        path = self.path(table, run_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrow_table = pa.Table.from_pandas(encode_frame(frame), preserve_index=False)
+        arrow_table = arrow_table.replace_schema_metadata(
+            {**(arrow_table.schema.metadata or {}), VERSION_KEY: CACHE_VERSION.encode(), END_TIME_KEY: encode_end_time(end_time)}
+        )
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(arrow_table, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def arrow_dtype(data_type: pa.DataType) -> pd.ArrowDtype | None:
+    # Decoded series arrays stay NumPy arrays in object columns
+    return None if pa.types.is_list(data_type) else pd.ArrowDtype(data_type)
+
+
+def encode_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    # Compacted frames already hold JSON columns as categoricals of JSON text, written as Parquet dictionaries
+    columns = [column for column in JSON_COLUMNS if column in frame.columns and not isinstance(frame[column].dtype, pd.CategoricalDtype)]
+    return frame.assign(**{column: frame[column].map(lambda value: None if value is None else json.dumps(value)) for column in columns})
+
+
+def decode_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    for column in JSON_COLUMNS:
+        if column in frame.columns:
+            frame[column] = [json.loads(value) if isinstance(value, str) else None for value in frame[column]]
+    return frame
+
+
+def read_run_set(directory: str, table: str, run_ids: list[int] | None = None) -> pd.DataFrame:
+    """Read the cached or exported frames of `table` (all runs by default) for offline analysis, without a database."""
+    paths = sorted(Path(directory, table).glob("run_*.parquet"), key=lambda path: int(path.stem.removeprefix("run_")))
+    if run_ids is not None:
+        paths = [path for path in paths if int(path.stem.removeprefix("run_")) in set(run_ids)]
+    frames = [decode_frame(pq.read_table(path, memory_map=True).to_pandas()) for path in paths]
+    frames = [frame for frame in frames if not frame.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,108 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from data.series import x_bounds
+
+DEFAULT_GRID_SIZE = 500
+DEFAULT_OUTLIERS = 5
+ENVELOPE_PERCENTILES = {"p05": 5, "p25": 25, "p50": 50, "p75": 75, "p95": 95}
+# Interquartile range of a normal distribution in sigmas, to turn the p25-p75 spread into a robust sigma
+IQR_SIGMAS = 1.349
+
+
+def common_grid(xs: list[np.ndarray], size: int, x_range: tuple[float, float] | None = None) -> np.ndarray:
+    """`size` evenly spaced x values over `x_range`, by default the full x range of all series."""
+    if x_range is None:
+        x_range = x_bounds(xs)
+        if x_range is None:
+            return np.empty(0)
+    return np.linspace(x_range[0], x_range[1], size)
+
+
+def resample(xs: list[np.ndarray], ys: list[np.ndarray], grid: np.ndarray) -> np.ndarray:
+    """Linearly interpolate every series onto `grid` at once. Returns a (series x grid) array, NaN outside each series' x range.
+
+    All samples are concatenated with keys `series * 2 + normalized x`, sorted by series and x, so a single
+    `searchsorted` finds the neighbours of every grid point of every series. Samples with a non-finite x are dropped.
+    """
+    n_series = len(xs)
+    lengths = np.array([x.size for x in xs], dtype=int)
+    if grid.size == 0 or not lengths.sum():
+        return np.full((n_series, grid.size), np.nan)
+    series = np.repeat(np.arange(n_series), lengths)
+    x, y = np.concatenate(xs).astype(float), np.concatenate(ys)
+    finite = np.isfinite(x)
+    if not finite.any():
+        return np.full((n_series, grid.size), np.nan)
+    # Stable, so samples with equal x keep their order within a series
+    order = np.lexsort((x[finite], series[finite]))
+    series, x, y = series[finite][order], x[finite][order], y[finite][order]
+
+    low = min(x.min(), grid[0])
+    span = max(x.max(), grid[-1]) - low or 1.0
+    keys = series * 2 + (x - low) / span
+    grid_series = np.repeat(np.arange(n_series), grid.size)
+    grid_keys = grid_series * 2 + np.tile((grid - low) / span, n_series)
+
+    right = np.minimum(np.searchsorted(keys, grid_keys, side="left"), keys.size - 1)
+    left = np.maximum(right - 1, 0)
+    exact = (series[right] == grid_series) & (keys[right] == grid_keys)
+    inside = (series[left] == grid_series) & (series[right] == grid_series) & (keys[left] < grid_keys) & (grid_keys < keys[right])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = (grid_keys - keys[left]) / (keys[right] - keys[left])
+        values = np.where(inside, y[left] + weight * (y[right] - y[left]), np.nan)
+    values = np.where(exact, y[right], values)
+    return values.reshape(n_series, grid.size)
+
+
+class SeriesEnvelope:
+    """Percentile envelope of many series of one measurement on a common x grid, and the deviation of each series from a reference.
+
+    The reference is the per-point median, or the series of `reference_run`. Deviations are scaled by a robust per-point
+    sigma (the p25-p75 spread), so each series gets an RMS and a maximum z-score; the highest RMS are the outliers.
+    Every step works on the whole (series x grid) array, so the cost scales with series count times grid size.
+    """
+
+    def __init__(
+        self,
+        series_df: pd.DataFrame,
+        grid_size: int = DEFAULT_GRID_SIZE,
+        x_range: tuple[float, float] | None = None,
+        reference_run: int | None = None,
+    ):
+        xs, ys = list(series_df["x_data"]), list(series_df["y_data"])
+        self.run_ids = series_df["run_id"].to_numpy()
+        self.grid = common_grid(xs, grid_size, x_range)
+        self.values = resample(xs, ys, self.grid)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # grid points no series covers
+            percentiles = np.nanpercentile(self.values, list(ENVELOPE_PERCENTILES.values()), axis=0)
+            self.envelope = pd.DataFrame(
+                {"x": self.grid, "min": np.nanmin(self.values, axis=0), "max": np.nanmax(self.values, axis=0)}
+                | dict(zip(ENVELOPE_PERCENTILES, percentiles))
+            )
+
+            reference_rows = np.flatnonzero(self.run_ids == reference_run) if reference_run is not None else []
+            reference = self.values[reference_rows[0]] if len(reference_rows) else self.envelope["p50"].to_numpy()
+            self.envelope["reference"] = reference
+
+            sigma = (self.envelope["p75"] - self.envelope["p25"]).to_numpy() / IQR_SIGMAS
+            typical = np.nanmedian(sigma[sigma > 0]) if (sigma > 0).any() else 1.0
+            sigma = np.where(sigma > 0, sigma, typical)  # flat stretches of the envelope
+            z = np.abs(self.values - reference) / sigma
+            covered = ~np.isnan(z)
+            self.scores = pd.DataFrame(
+                {
+                    "row": np.arange(len(self.run_ids)),
+                    "run_id": self.run_ids,
+                    "rms_z": np.sqrt(np.nanmean(z**2, axis=1)),
+                    "max_z": np.nanmax(z, axis=1),
+                    "coverage": covered.mean(axis=1) if self.grid.size else 0.0,
+                }
+            ).sort_values("rms_z", ascending=False, na_position="last", ignore_index=True)
+
+    def outliers(self, count: int = DEFAULT_OUTLIERS) -> pd.DataFrame:
+        """Scores of the `count` series deviating most from the reference."""
+        return self.scores.dropna(subset=["rms_z"]).head(count)
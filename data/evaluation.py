@@ -0,0 +1,122 @@
+import argparse
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+from data.loader import batched, fetch_run_tables
+from sqlalchemy import Engine, create_engine, select
+
+from roboscope.models import BooleanMeasurement, StringMeasurement, TestRun
+
+PASS_EMOJI = "✅"
+FAIL_EMOJI = "❌"
+
+
+def truthy(values: pd.Series) -> pd.Series:
+    """`bool()` of every value, as the row-by-row checks applied it: None is false, NaN and other missing values are true."""
+    objects = values.to_numpy(dtype=object)
+    present = ~pd.isna(objects)
+    flags = np.ones(len(objects), dtype=bool)
+    flags[present] = objects[present].astype(bool)
+    flags[np.equal(objects, None)] = False
+    return pd.Series(flags, index=values.index)
+
+
+def evaluate_string_results(string_df: pd.DataFrame) -> pd.Series:
+    """Return a boolean pass/fail Series for string measurements.
+
+    Rows without an expected value and rows in `log` mode always pass, unknown modes fail.
+    Regex patterns are compiled once per distinct (pattern, ignore_case) pair.
+    """
+    expected = string_df["expected_value"].fillna("").astype(str)
+    value = string_df["value"].fillna("").astype(str)
+    ignore_case = truthy(string_df["ignore_case"])
+    mode = string_df["mode"]
+
+    value = value.where(~ignore_case, value.str.lower())
+    expected = expected.where(~ignore_case, expected.str.lower())
+    no_check = expected == ""
+
+    passed = pd.Series(
+        np.select(
+            [no_check, mode == "equal", mode == "not_equal", mode == "log"],
+            [True, value == expected, value != expected, True],
+            default=False,
+        ),
+        index=string_df.index,
+    )
+
+    regex_rows = (mode == "regex") & ~no_check
+    for (pattern, case_insensitive), rows in expected[regex_rows].groupby([expected[regex_rows], ignore_case[regex_rows]]).groups.items():
+        try:
+            compiled = re.compile(pattern, re.IGNORECASE if case_insensitive else 0)
+        except re.error:
+            continue  # invalid patterns fail
+        passed[rows] = value[rows].str.match(compiled).to_numpy(dtype=bool)
+    return passed
+
+
+def evaluate_boolean_results(boolean_df: pd.DataFrame) -> pd.Series:
+    """Return a boolean pass/fail Series for boolean measurements. Rows without an expected value pass."""
+    expected = boolean_df["expected_value"]
+    return expected.isna() | (boolean_df["value"] == expected).fillna(False)
+
+
+def result_labels(passed: pd.Series) -> np.ndarray:
+    return np.where(passed, PASS_EMOJI, FAIL_EMOJI)
+
+
+def bool_labels(values: pd.Series) -> np.ndarray:
+    """Render truthy values (see `truthy`) as "True" and everything else as "False"."""
+    return np.where(truthy(values), "True", "False")
+
+
+EVALUATORS = {
+    "string": (StringMeasurement, evaluate_string_results),
+    "boolean": (BooleanMeasurement, evaluate_boolean_results),
+}
+
+
+def summarize_results(engine: Engine, measurement_type: str, run_ids: list[int], batch_size: int) -> pd.DataFrame:
+    """Recompute pass/fail for all measurements of `run_ids`, `batch_size` runs at a time."""
+    model, evaluate = EVALUATORS[measurement_type]
+    summaries = []
+    for run_batch in batched(run_ids, batch_size):
+        (df,) = fetch_run_tables(engine, [model], run_batch)
+        if df.empty:
+            continue
+        df["passed"] = evaluate(df)
+        summary = df.groupby(["run_id", "name"])["passed"].agg(passed="sum", total="size").reset_index()
+        summary["failed"] = summary["total"] - summary["passed"]
+        summaries.append(summary)
+
+    if not summaries:
+        return pd.DataFrame(columns=["type", "run_id", "name", "passed", "failed", "total"])
+    summary = pd.concat(summaries, ignore_index=True)
+    summary.insert(0, "type", measurement_type)
+    return summary[["type", "run_id", "name", "passed", "failed", "total"]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute pass/fail results of string and boolean measurements.")
+    parser.add_argument("--db_url", type=str, required=True, help="Database URL")
+    parser.add_argument("--type", choices=[*EVALUATORS, "all"], default="all", help="Measurement type to evaluate")
+    parser.add_argument("--run_ids", type=int, nargs="*", help="Runs to evaluate (default: all runs)")
+    parser.add_argument("--batch_size", type=int, default=50, help="Number of runs loaded at a time")
+    parser.add_argument("--output", type=str, help="CSV file to write (default: stdout)")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    run_ids = args.run_ids
+    if not run_ids:
+        with engine.connect() as conn:
+            run_ids = list(conn.execute(select(TestRun.run_id).order_by(TestRun.run_id)).scalars())
+    types = list(EVALUATORS) if args.type == "all" else [args.type]
+
+    summary = pd.concat([summarize_results(engine, measurement_type, run_ids, args.batch_size) for measurement_type in types], ignore_index=True)
+    summary.to_csv(args.output or sys.stdout, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+
+from data.disk_cache import DiskCache
+from data.measurement_cache import MeasurementCache, iter_measurements
+from data.prefetch import PREFETCH_MODELS
+from sqlalchemy import create_engine, select
+
+from roboscope.models import TestRun
+
+TABLES = {model.__tablename__: (model, prepare) for model, prepare in PREFETCH_MODELS}
+
+
+def export_runs(
+    db_url: str, output_dir: str, run_ids: list[int] | None = None, tables: list[str] | None = None
+) -> tuple[dict[str, int], list[int]]:
+    """Write the measurements of finished runs to Parquet files, in the layout of the disk cache.
+
+    Returns the rows exported per table and the requested runs skipped because they are unfinished or do not exist.
+    """
+    engine = create_engine(db_url)
+    query = select(TestRun.run_id).where(TestRun.end_time.is_not(None)).order_by(TestRun.run_id)
+    if run_ids is not None:
+        query = query.where(TestRun.run_id.in_(run_ids))
+    with engine.connect() as conn:
+        finished = [run_id for (run_id,) in conn.execute(query)]
+    # Runs in progress are never written to the disk cache, their rows are not exported
+    skipped = sorted(set(run_ids or []) - set(finished))
+
+    disk_cache = DiskCache(output_dir)
+    exported = {}
+    for table in tables or list(TABLES):
+        model, prepare = TABLES[table]
+        # Without a memory budget, every run is read from the export directory or the database
+        frames = iter_measurements(engine, model, finished, prepare, cache=MeasurementCache(0, 0), disk_cache=disk_cache)
+        exported[table] = sum(len(frame) for _, frame in frames)
+    return exported, skipped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the measurements of finished runs to Parquet files, readable without database access.")
+    parser.add_argument("--db_url", type=str, required=True, help="Database URL")
+    parser.add_argument("--output_dir", type=str, required=True, help="Directory to write, in the layout of the `disk_cache_dir` cache")
+    parser.add_argument("--run_ids", type=int, nargs="*", help="Runs to export (default: all finished runs)")
+    parser.add_argument("--tables", nargs="*", choices=list(TABLES), help="Measurement tables to export (default: all)")
+    args = parser.parse_args()
+
+    exported, skipped = export_runs(args.db_url, args.output_dir, args.run_ids, args.tables)
+    for table, rows in exported.items():
+        print(f"Exported {rows} rows of {table}.")
+    if skipped:
+        print(f"Skipped {len(skipped)} unfinished or missing runs: {' '.join(map(str, skipped))}.")
+    print(f'Read them with data.disk_cache.read_run_set("{args.output_dir}", "<table>").')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import re
+from datetime import datetime
+
+import pandas as pd
+from data.catalog import build_run_filter
+from sqlalchemy import (
+    Column,
+    Engine,
+    Integer,
+    MetaData,
+    Table,
+    and_,
+    column,
+    create_engine,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal_column,
+    select,
+    table,
+    text,
+)
+
+from roboscope.models import Failure, TestCase, TestRun, TestSuite
+
+FAILURE_INDEX_BATCH_SIZE = 50000
+FAILURE_PAGE_SIZE = 50
+# Text search configuration of the PostgreSQL index: no stemming or stop words, error messages are matched as written
+TS_CONFIG = "'simple'::regconfig"
+FAILURE_FTS_INDEX = "ix_failure_details_fts"
+
+# SQLite: FTS5 index over `failure.details`, its rowids being the failure ids (external content, the text is not copied)
+metadata = MetaData()
+
+failure_fts_watermark = Table(
+    "failure_fts_watermark",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("failure_id", Integer),
+)
+failure_fts = table("failure_fts", column("rowid"), column("rank"))
+
+
+def failure_index_status(engine: Engine) -> str:
+    """Whether the index is "ready", "missing" or, on PostgreSQL, "invalid": left behind by a concurrent build that failed or was interrupted."""
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            valid = conn.execute(
+                text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"),
+                {"name": FAILURE_FTS_INDEX},
+            ).scalar()
+        return "missing" if valid is None else "ready" if valid else "invalid"
+    return "ready" if {"failure_fts", failure_fts_watermark.name} <= set(inspect(engine).get_table_names()) else "missing"
+
+
+def create_failure_index(engine: Engine) -> None:
+    """Create the index if missing. On PostgreSQL an invalid index left by a failed concurrent build is dropped and built again."""
+    if engine.dialect.name == "postgresql":
+        invalid = failure_index_status(engine) == "invalid"
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            if invalid:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {FAILURE_FTS_INDEX}"))
+            conn.execute(
+                text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {FAILURE_FTS_INDEX} ON failure USING gin (to_tsvector({TS_CONFIG}, details))")
+            )
+        return
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS failure_fts USING fts5(details, content='failure', content_rowid='id')"))
+
+
+def refresh_failure_index(engine: Engine, batch_size: int = FAILURE_INDEX_BATCH_SIZE, create: bool = True) -> int:
+    """Bring the full-text index of failure details up to date. Returns the number of failures added.
+
+    On SQLite, failures inserted since the watermark (the largest indexed id) are added to the FTS5 table,
+    `batch_size` rows per transaction, so an interrupted build resumes where it stopped. On PostgreSQL the
+    index is a GIN index over the `tsvector` of the details, created once and maintained by the database.
+    The index is created (or repaired) first unless `create` is off, in which case nothing is done while it is not ready.
+    """
+    if create:
+        create_failure_index(engine)
+    elif failure_index_status(engine) != "ready":
+        return 0
+    if engine.dialect.name == "postgresql":
+        return 0
+
+    added = 0
+    while True:
+        with engine.begin() as conn:
+            watermark = conn.execute(select(failure_fts_watermark.c.failure_id)).scalar() or 0
+            batch = select(Failure.id).where(Failure.id > watermark).order_by(Failure.id).limit(batch_size).subquery()
+            last_id = conn.execute(select(func.max(batch.c.id))).scalar()
+            if last_id is None:
+                return added
+            result = conn.execute(
+                text("INSERT INTO failure_fts (rowid, details) SELECT id, details FROM failure WHERE id > :first AND id <= :last"),
+                {"first": watermark, "last": last_id},
+            )
+            conn.execute(delete(failure_fts_watermark))
+            conn.execute(insert(failure_fts_watermark), [{"id": 1, "failure_id": last_id}])
+        added += result.rowcount
+
+
+def rebuild_failure_index(engine: Engine) -> None:
+    """Re-index all failures from scratch, e.g. after failures were deleted or edited."""
+    if engine.dialect.name == "postgresql":
+        if failure_index_status(engine) != "ready":
+            create_failure_index(engine)
+            return
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"REINDEX INDEX CONCURRENTLY {FAILURE_FTS_INDEX}"))
+        return
+    create_failure_index(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO failure_fts (failure_fts) VALUES ('rebuild')"))
+        conn.execute(delete(failure_fts_watermark))
+        conn.execute(insert(failure_fts_watermark), [{"id": 1, "failure_id": conn.execute(select(func.max(Failure.id))).scalar() or 0}])
+
+
+def fts5_query(query: str) -> str:
+    """Translate a web-search style query into FTS5 syntax, quoting every term so that no input is a syntax error.
+
+    Words and "quoted phrases" must all match, `OR` between terms matches either, a trailing `*` matches a prefix
+    and a leading `-` excludes a term.
+    """
+    included, excluded = [], []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        if word == "OR":
+            if included and included[-1] != "OR":
+                included.append("OR")
+            continue
+        terms = included
+        if word.startswith("-") and len(word) > 1:
+            terms, word = excluded, word[1:]
+        prefix = "*" if word.endswith("*") and len(word) > 1 else ""
+        term = (phrase or (word[:-1] if prefix else word)).strip()
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + prefix)
+    while included and included[-1] == "OR":
+        included.pop()
+    if not included:
+        return ""
+    return " ".join(included) + (f" NOT ({' OR '.join(excluded)})" if excluded else "")
+
+
+def match_condition(query: str, dialect: str):
+    """Predicate and relevance score (higher is better) of failures matching `query`."""
+    if dialect == "postgresql":
+        document = func.to_tsvector(literal_column(TS_CONFIG), Failure.details)
+        ts_query = func.websearch_to_tsquery(literal_column(TS_CONFIG), query)
+        return document.op("@@")(ts_query), func.ts_rank_cd(document, ts_query)
+    # bm25 ranks are negative, the best match having the lowest
+    return and_(text("failure_fts MATCH :fts_query").bindparams(fts_query=fts5_query(query)), failure_fts.c.rowid == Failure.id), -failure_fts.c.rank
+
+
+def search_failures(
+    engine: Engine,
+    query: str,
+    start_dt: datetime,
+    end_dt: datetime,
+    meta_filters: dict,
+    run_ids: list[int] | None = None,
+    page: int = 1,
+    page_size: int = FAILURE_PAGE_SIZE,
+) -> tuple[pd.DataFrame, int]:
+    """One page of the failures matching `query` in the runs of the sidebar filters (or only `run_ids`), best match first.
+
+    Returns the hits with their run, suite and test case, and the total number of matching failures.
+    """
+    dialect = engine.dialect.name
+    if dialect != "postgresql" and not fts5_query(query):
+        return pd.DataFrame(columns=["score", "run_id", "run", "start_time", "suite", "test", "source", "details", "timestamp"]), 0
+    matches, score = match_condition(query, dialect)
+    conditions = [matches, build_run_filter(start_dt, end_dt, meta_filters, dialect)]
+    if run_ids is not None:
+        conditions.append(Failure.run_id.in_(run_ids))
+
+    hits = select(Failure.id, Failure.run_id, score.label("score")).join(TestRun, TestRun.run_id == Failure.run_id).where(*conditions)
+    if dialect != "postgresql":
+        hits = hits.select_from(failure_fts)
+    page_hits = hits.order_by(score.desc(), Failure.id.desc()).limit(page_size).offset((page - 1) * page_size).subquery()
+    stmt = (
+        select(
+            page_hits.c.score,
+            Failure.run_id,
+            TestRun.name.label("run"),
+            TestRun.start_time,
+            TestSuite.name.label("suite"),
+            TestCase.name.label("test"),
+            Failure.source,
+            Failure.details,
+            Failure.timestamp,
+        )
+        .select_from(page_hits)
+        .join(Failure, Failure.id == page_hits.c.id)
+        .join(TestRun, TestRun.run_id == Failure.run_id)
+        .outerjoin(TestSuite, and_(TestSuite.run_id == Failure.run_id, TestSuite.suite_id == Failure.suite_id))
+        .outerjoin(TestCase, and_(TestCase.run_id == Failure.run_id, TestCase.test_id == Failure.test_id))
+        .order_by(page_hits.c.score.desc(), Failure.id.desc())
+    )
+    with engine.connect() as conn:
+        total = conn.execute(select(func.count()).select_from(hits.subquery())).scalar()
+        return pd.read_sql(stmt, conn), total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build, repair or incrementally update the full-text index of failure details.")
+    parser.add_argument("--db_url", type=str, required=True, help="Database URL")
+    parser.add_argument("--batch_size", type=int, default=FAILURE_INDEX_BATCH_SIZE, help="Number of failures indexed per transaction (SQLite)")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index all failures, e.g. after failures were deleted or edited")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    if args.rebuild:
+        rebuild_failure_index(engine)
+        print("Rebuilt the failure index.")
+        return
+    added = refresh_failure_index(engine, args.batch_size)
+    print(f"Indexed {added} failures.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import time
+
+from sqlalchemy import Engine, create_engine, inspect, text
+
+# Index name -> (table, columns)
+RECOMMENDED_INDEXES = {
+    "ix_test_run_start_time_run_id": ("test_run", ("start_time", "run_id")),
+    "ix_test_run_run_id": ("test_run", ("run_id",)),
+    "ix_test_suite_run_id_suite_id": ("test_suite", ("run_id", "suite_id")),
+    "ix_test_case_run_id_suite_id_test_id": ("test_case", ("run_id", "suite_id", "test_id")),
+    "ix_failure_run_id_suite_id_test_id": ("failure", ("run_id", "suite_id", "test_id")),
+    "ix_numeric_measurement_run_id_name": ("numeric_measurement", ("run_id", "name")),
+    "ix_string_measurement_run_id_name": ("string_measurement", ("run_id", "name")),
+    "ix_boolean_measurement_run_id_name": ("boolean_measurement", ("run_id", "name")),
+    "ix_series_measurement_run_id_name": ("series_measurement", ("run_id", "name")),
+}
+
+# PostgreSQL only: GIN indexes serving the `meta::jsonb @> ...` filters pushed down to the database
+GIN_INDEXES = {
+    "ix_test_run_meta_gin": ("test_run", ("meta",)),
+    "ix_numeric_measurement_meta_gin": ("numeric_measurement", ("meta",)),
+    "ix_string_measurement_meta_gin": ("string_measurement", ("meta",)),
+    "ix_boolean_measurement_meta_gin": ("boolean_measurement", ("meta",)),
+    "ix_series_measurement_meta_gin": ("series_measurement", ("meta",)),
+}
+
+
+def find_missing_indexes(engine: Engine) -> dict[str, tuple[str, tuple[str, ...]]]:
+    """Return the recommended indexes not already covered by an existing index.
+
+    An existing index covers a recommendation when its leading columns match it.
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    existing = {table: inspector.get_indexes(table) for table in {table for table, _ in RECOMMENDED_INDEXES.values()} if table in tables}
+    missing = {
+        name: (table, columns)
+        for name, (table, columns) in RECOMMENDED_INDEXES.items()
+        if table in existing and not any(tuple(index["column_names"][: len(columns)]) == columns for index in existing[table])
+    }
+    if engine.dialect.name == "postgresql":
+        missing.update(
+            (name, (table, columns))
+            for name, (table, columns) in GIN_INDEXES.items()
+            if table in existing and not any(index["name"] == name for index in existing[table])
+        )
+    return missing
+
+
+def create_indexes(engine: Engine, indexes: dict[str, tuple[str, tuple[str, ...]]], concurrently: bool = False) -> None:
+    """Create the given indexes. `concurrently` avoids write locks on PostgreSQL."""
+    concurrently = concurrently and engine.dialect.name == "postgresql"
+    options = {"isolation_level": "AUTOCOMMIT"} if concurrently else {}
+    with engine.connect().execution_options(**options) as conn:
+        for name, (table, columns) in indexes.items():
+            target = f"USING gin (({columns[0]}::jsonb))" if name in GIN_INDEXES else f"({', '.join(columns)})"
+            conn.execute(text(f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} ON {table} {target}"))
+        conn.commit()
+
+
+def sample_run_ids(engine: Engine, count: int) -> list[int]:
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT run_id FROM test_run ORDER BY start_time DESC LIMIT :count"), {"count": count})
+        return [run_id for (run_id,) in rows]
+
+
+def time_lookups(engine: Engine, run_ids: list[int], repeat: int = 3) -> dict[str, float]:
+    """Time the `run_id IN (...)` lookup of every indexed table, best of `repeat`, in seconds."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    placeholders = ", ".join(f":run_id_{i}" for i in range(len(run_ids)))
+    params = {f"run_id_{i}": run_id for i, run_id in enumerate(run_ids)}
+
+    timings = {}
+    with engine.connect() as conn:
+        for table in dict.fromkeys(table for table, _ in RECOMMENDED_INDEXES.values()):
+            if table not in tables or not run_ids:
+                continue
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(text(f"SELECT * FROM {table} WHERE run_id IN ({placeholders})"), params).fetchall()
+                best = min(best, time.perf_counter() - start)
+            timings[table] = best
+    return timings
+
+
+def format_timing_report(before: dict[str, float], after: dict[str, float] | None = None) -> str:
+    lines = [f"{'Table':<24}{'Before (ms)':>14}" + (f"{'After (ms)':>14}{'Speedup':>10}" if after else "")]
+    for table, before_time in before.items():
+        line = f"{table:<24}{before_time * 1000:>14.2f}"
+        if after:
+            after_time = after[table]
+            line += f"{after_time * 1000:>14.2f}{before_time / after_time if after_time else float('inf'):>9.1f}x"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report and create missing RoboScope indexes.")
+    parser.add_argument("--db_url", type=str, required=True, help="Database URL")
+    parser.add_argument("--apply", action="store_true", help="Create the missing indexes")
+    parser.add_argument("--concurrently", action="store_true", help="Use CREATE INDEX CONCURRENTLY (PostgreSQL)")
+    parser.add_argument("--sample_runs", type=int, default=20, help="Number of latest runs used for timing")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions per lookup")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    missing = find_missing_indexes(engine)
+    if not missing:
+        print("All recommended indexes are present.")
+    for name, (table, columns) in missing.items():
+        print(f"Missing index {name} on {table} ({', '.join(columns)})")
+
+    run_ids = sample_run_ids(engine, args.sample_runs)
+    before = time_lookups(engine, run_ids, args.repeat)
+    if not args.apply or not missing:
+        print(format_timing_report(before))
+        return
+
+    create_indexes(engine, missing, concurrently=args.concurrently)
+    after = time_lookups(engine, run_ids, args.repeat)
+    print(f"Created {len(missing)} indexes.")
+    print(format_timing_report(before, after))
+
+
+if __name__ == "__main__":
+    main()
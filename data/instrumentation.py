@@ -0,0 +1,124 @@
+import functools
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import pandas as pd
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger("roboscope_ui.timings")
+logger.propagate = False
+
+# Records of the rerun running on the current script thread, None when not collecting
+_local = threading.local()
+
+TABLE_PATTERN = re.compile(r"\bFROM\s+\"?(\w+)", re.IGNORECASE)
+
+
+def start_collecting() -> list[dict]:
+    """Collect the timings of the current script thread into the returned list."""
+    _local.records = []
+    _local.depth = 0
+    return _local.records
+
+
+def measure(result: Any) -> tuple[int | None, int | None]:
+    """Rows and (shallow) bytes of a DataFrame, a tuple of DataFrames or a list; (None, None) for anything else."""
+    if isinstance(result, pd.DataFrame):
+        frames = [result]
+    elif isinstance(result, tuple) and result and all(isinstance(item, pd.DataFrame) for item in result):
+        frames = list(result)
+    elif isinstance(result, list):
+        return len(result), None
+    else:
+        return None, None
+    return sum(len(frame) for frame in frames), sum(int(frame.memory_usage(index=False).sum()) for frame in frames)
+
+
+def record(name: str, seconds: float, result: Any = None, **fields) -> None:
+    """Add a timing to the current rerun and emit it as a JSON log line."""
+    records = getattr(_local, "records", None)
+    if records is None and not logger.handlers:
+        return
+    rows, size = measure(result)
+    entry = {"name": name, "seconds": round(seconds, 6), "rows": rows, "bytes": size, "depth": getattr(_local, "depth", 0), **fields}
+    if records is not None:
+        records.append({**entry, "start": time.perf_counter() - seconds})
+    if logger.handlers:
+        logger.info(json.dumps({"event": "timing", "time": time.time(), **entry}, default=str))
+
+
+@contextmanager
+def timed(name: str) -> Iterator[dict]:
+    """Time the body of a `with` block. Set `result` in the yielded dict to count its rows and bytes."""
+    context = {}
+    _local.depth = getattr(_local, "depth", 0) + 1
+    start = time.perf_counter()
+    try:
+        yield context
+    finally:
+        _local.depth -= 1
+        record(name, time.perf_counter() - start, context.get("result"))
+
+
+def instrument(func: Callable) -> Callable:
+    """Decorator timing every call of `func` and counting the rows and bytes it returns."""
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with timed(name) as context:
+            context["result"] = func(*args, **kwargs)
+        return context["result"]
+
+    return wrapper
+
+
+def bind_collector(func: Callable) -> Callable:
+    """Wrap `func` so that, run on a worker thread, its timings are collected into the calling thread's rerun."""
+    records, depth = getattr(_local, "records", None), getattr(_local, "depth", 0)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _local.records, _local.depth = records, depth
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.records = None
+
+    return wrapper
+
+
+def log_rerun(page: str, records: list[dict]) -> None:
+    if logger.handlers:
+        total = sum(entry["seconds"] for entry in records if entry["depth"] == 0)
+        logger.info(json.dumps({"event": "rerun", "time": time.time(), "page": page, "seconds": round(total, 6), "timings": len(records)}))
+
+
+def configure_timing_log(path: str) -> None:
+    """Append the timings as JSON lines to `path`."""
+    if not any(getattr(handler, "baseFilename", None) == path for handler in logger.handlers):
+        handler = logging.FileHandler(path)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Time every SQL statement executed by `engine`, named after its first table."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        table = TABLE_PATTERN.search(statement)
+        record(f"sql.{table.group(1) if table else statement.split(None, 1)[0].lower()}", seconds, statement=statement[:200])
+
+    return engine
@@ -0,0 +1,74 @@
+import threading
+
+import pandas as pd
+from data.compact import compact_frame
+from data.loader import fetch_parallel
+from sqlalchemy import Engine, func, or_, select
+
+from roboscope.models import Failure, TestCase, TestRun, TestSuite
+
+# Tables of the Test Run dashboard, in the order of `load_selected_data`
+LIVE_MODELS = [TestRun, TestCase, TestSuite, Failure]
+
+
+class RunTableTail:
+    """Rows of one table for a set of runs in progress, refreshed incrementally.
+
+    Each poll fetches the rows inserted since the last one (high-water mark on `id`, which only grows) and
+    re-reads the rows still missing an end time, whose status and end time are filled in when they finish.
+    """
+
+    def __init__(self, model, run_ids: list[int]):
+        self.model = model
+        self.run_ids = sorted(set(run_ids))
+        self.frame = pd.DataFrame()
+        self.high_water = 0
+
+    def statement(self):
+        model = self.model
+        condition = model.id > self.high_water
+        if hasattr(model, "end_time") and not self.frame.empty:
+            unfinished = self.frame.loc[self.frame["end_time"].isna(), "id"].tolist()
+            if unfinished:
+                condition = or_(condition, model.id.in_(unfinished))
+        return select(model.__table__).where(model.run_id.in_(self.run_ids), condition).order_by(model.run_id, model.id)
+
+    def update(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Merge freshly polled rows into the frame, replacing the rows that were read again, and compact it."""
+        if self.frame.empty:
+            self.frame = compact_frame(rows)
+        elif not rows.empty:
+            kept = self.frame[~self.frame["id"].isin(rows["id"])]
+            self.frame = compact_frame(pd.concat([kept, rows], ignore_index=True).sort_values(["run_id", "id"], ignore_index=True))
+        if not self.frame.empty:
+            self.high_water = int(self.frame["id"].max())
+        return self.frame
+
+
+class LiveRunTables:
+    """The Test Run dashboard tables of runs in progress, each poll only reading what changed since the previous one."""
+
+    def __init__(self, run_ids: list[int]):
+        self.run_ids = sorted(set(run_ids))
+        self.tails = [RunTableTail(model, self.run_ids) for model in LIVE_MODELS]
+        self._lock = threading.Lock()
+
+    def poll(self, engine: Engine) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        with self._lock:
+            rows = fetch_parallel(engine, [tail.statement() for tail in self.tails])
+            return tuple(tail.update(frame) for tail, frame in zip(self.tails, rows))
+
+
+def fetch_live_signature(engine: Engine, models: list, run_ids: list[int]) -> tuple:
+    """Cheap fingerprint of the rows of `run_ids`: per table the largest id and the number of rows without an end time.
+
+    It changes whenever rows are inserted or finish, telling a live page when to refresh.
+    """
+    columns = []
+    for model in models:
+        condition = model.run_id.in_(run_ids)
+        columns.append(select(func.max(model.id)).where(condition).scalar_subquery())
+        if hasattr(model, "end_time"):
+            columns.append(select(func.count()).where(condition, model.end_time.is_(None)).scalar_subquery())
+    with engine.connect() as conn:
+        return tuple(conn.execute(select(*columns)).one())
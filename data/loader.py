@@ -0,0 +1,105 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator
+
+import pandas as pd
+from data.instrumentation import bind_collector
+from data.settings import get_setting, parse_bool
+from sqlalchemy import JSON, Connection, Engine, Select, Text, and_, cast, or_, select
+
+from roboscope.models import TestRun
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_RUN_BATCH_SIZE = 10
+
+
+def arrow_dtypes() -> bool:
+    """Whether measurement rows are fetched into Arrow-backed dtypes (`arrow_dtypes` setting)."""
+    return get_setting("arrow_dtypes", False, parse_bool)
+
+
+def read_sql(stmt: Select, conn: Connection, arrow: bool = False, chunksize: int | None = None) -> pd.DataFrame | Iterator[pd.DataFrame]:
+    """`pd.read_sql`, optionally straight into Arrow-backed dtypes instead of NumPy and object columns.
+
+    With `arrow`, JSON columns are fetched as text and decoded afterwards: pandas would otherwise store the text of their Python repr.
+    """
+    if not arrow:
+        return pd.read_sql(stmt, conn, chunksize=chunksize)
+    json_columns = [column.name for column in stmt.selected_columns if isinstance(column.type, JSON)]
+    stmt = stmt.with_only_columns(
+        *(cast(column, Text).label(column.name) if column.name in json_columns else column for column in stmt.selected_columns)
+    )
+    if chunksize is None:
+        return decode_json_columns(pd.read_sql(stmt, conn, dtype_backend="pyarrow"), json_columns)
+    return (decode_json_columns(chunk, json_columns) for chunk in pd.read_sql(stmt, conn, chunksize=chunksize, dtype_backend="pyarrow"))
+
+
+def decode_json_columns(frame: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    for column in columns:
+        frame[column] = [json.loads(value) if isinstance(value, str) else None for value in frame[column]]
+    return frame
+
+
+def iter_table_chunks(
+    engine: Engine, model, run_ids: list[int], chunk_size: int = DEFAULT_CHUNK_SIZE, arrow: bool = False
+) -> Iterator[pd.DataFrame]:
+    """Stream the rows of `model` for `run_ids`, ordered by run, in frames of at most `chunk_size` rows.
+
+    Uses a server-side cursor where the driver supports it, so only one chunk is held in memory at a time.
+    """
+    stmt = select(model.__table__).where(model.run_id.in_(run_ids)).order_by(model.run_id, model.id)
+    with engine.connect().execution_options(stream_results=True) as conn:
+        yield from read_sql(stmt, conn, arrow, chunk_size)
+
+
+def iter_run_chunks(
+    engine: Engine, model, run_ids: list[int], chunk_size: int = DEFAULT_CHUNK_SIZE, arrow: bool = False
+) -> Iterator[tuple[int, pd.DataFrame]]:
+    """Yield (run_id, part) pairs of streamed chunks split by run, in run order: a run spanning chunks comes as consecutive parts.
+
+    Nothing is held beyond the current chunk, so the caller decides how much of a run to assemble. Runs without rows yield nothing.
+    """
+    for chunk in iter_table_chunks(engine, model, run_ids, chunk_size, arrow):
+        for run_id, part in chunk.groupby("run_id", sort=False):
+            yield run_id, part.reset_index(drop=True)
+
+
+def fetch_rows_after(engine: Engine, model, high_water: dict[int, int], arrow: bool = False) -> pd.DataFrame:
+    """Rows of `model` inserted after the high-water mark of each run (the largest `id` already loaded), ordered by run and id."""
+    condition = or_(*(and_(model.run_id == run_id, model.id > last_id) for run_id, last_id in high_water.items()))
+    stmt = select(model.__table__).where(condition).order_by(model.run_id, model.id)
+    with engine.connect() as conn:
+        return read_sql(stmt, conn, arrow)
+
+
+def fetch_run_end_times(engine: Engine, run_ids: list[int]) -> dict[int, datetime | None]:
+    """Return the end time of each run of `run_ids`: None while the run is still in progress or unknown."""
+    stmt = select(TestRun.run_id, TestRun.end_time).where(TestRun.run_id.in_(run_ids))
+    with engine.connect() as conn:
+        end_times = dict(conn.execute(stmt).all())
+    return {run_id: end_times.get(run_id) for run_id in run_ids}
+
+
+def batched(run_ids: list[int], batch_size: int = DEFAULT_RUN_BATCH_SIZE) -> Iterator[list[int]]:
+    run_ids = sorted(set(run_ids))
+    for start in range(0, len(run_ids), batch_size):
+        yield run_ids[start : start + batch_size]
+
+
+def read_frame(engine: Engine, stmt: Select) -> pd.DataFrame:
+    with engine.connect() as conn:
+        return pd.read_sql(stmt, conn)
+
+
+def fetch_parallel(engine: Engine, statements: list[Select]) -> list[pd.DataFrame]:
+    """Run independent queries concurrently, each on its own pooled connection. Frames are returned in the order of `statements`."""
+    if len(statements) <= 1:
+        return [read_frame(engine, stmt) for stmt in statements]
+    with ThreadPoolExecutor(max_workers=len(statements), thread_name_prefix="fetch") as executor:
+        return list(executor.map(bind_collector(lambda stmt: read_frame(engine, stmt)), statements))
+
+
+def fetch_run_tables(engine: Engine, models: list, run_ids: list[int]) -> list[pd.DataFrame]:
+    """Fetch the rows of `run_ids` from every table of `models` in parallel, ordered by run and id."""
+    return fetch_parallel(engine, [select(model.__table__).where(model.run_id.in_(run_ids)).order_by(model.run_id, model.id) for model in models])
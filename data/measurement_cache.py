@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Iterator
+
+import pandas as pd
+from data.compact import compact_frame, concat_frames
+from data.disk_cache import DiskCache
+from data.loader import DEFAULT_CHUNK_SIZE, arrow_dtypes, fetch_rows_after, fetch_run_end_times, iter_run_chunks
+from data.settings import get_setting
+from sqlalchemy import Engine
+from streamlit import cache_resource
+
+DEFAULT_CACHE_MB = 512
+DEFAULT_LIVE_RUN_TTL = 30
+
+
+class MeasurementCache:
+    """Thread-safe LRU cache of measurement frames keyed by (measurement table, run_id).
+
+    The cache is bounded by the deep memory size of the stored frames. Frames of finished runs
+    never expire, frames of runs still in progress expire after `live_run_ttl` seconds. Expired
+    frames are kept until evicted, so that they can be extended with only the rows inserted since.
+    """
+
+    def __init__(self, max_bytes: int, live_run_ttl: float):
+        self.max_bytes = max_bytes
+        self.live_run_ttl = live_run_ttl
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, int], tuple[pd.DataFrame, int, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, int]) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[2] is not None and entry[2] < time.monotonic()):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def live_frame(self, key: tuple[str, int]) -> pd.DataFrame | None:
+        """The frame of a run in progress, expired or not, to be extended with the rows inserted since. None for finished runs."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None and entry[2] is not None else None
+
+    def contains(self, key: tuple[str, int]) -> bool:
+        """Whether `key` is cached and not expired, without counting a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[2] is None or entry[2] >= time.monotonic())
+
+    def nbytes(self, key: tuple[str, int]) -> int | None:
+        """Deep memory size of the cached frame of `key`, as counted against `max_bytes`, or None when not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    def put(self, key: tuple[str, int], frame: pd.DataFrame, live: bool = False) -> None:
+        size = int(frame.memory_usage(deep=True).sum())
+        expires_at = time.monotonic() + self.live_run_ttl if live else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (frame, size, expires_at)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "size_bytes": self.size_bytes, "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, key: tuple[str, int]) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
+
+
+@cache_resource
+def get_measurement_cache() -> MeasurementCache:
+    """Process-wide cache shared by all sessions. Sized by the `measurement_cache_mb` and `live_run_ttl` settings."""
+    return MeasurementCache(
+        max_bytes=int(get_setting("measurement_cache_mb", DEFAULT_CACHE_MB, float) * 1024 * 1024),
+        live_run_ttl=get_setting("live_run_ttl", DEFAULT_LIVE_RUN_TTL, float),
+    )
+
+
+@cache_resource
+def get_disk_cache() -> DiskCache | None:
+    """Process-wide Parquet cache of finished runs in the `disk_cache_dir` directory, or None when the setting is unset."""
+    directory = get_setting("disk_cache_dir", None, str)
+    return DiskCache(directory) if directory else None
+
+
+def iter_measurements(
+    engine: Engine,
+    model,
+    run_ids: list[int],
+    prepare: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+    chunk_size: int | None = None,
+    cache: MeasurementCache | None = None,
+    disk_cache: DiskCache | None = None,
+    tail_live: bool = False,
+) -> Iterator[tuple[int, pd.DataFrame]]:
+    """Yield (run_id, frame) for every selected run: cached runs first, then the missing runs as they stream in.
+
+    Missing runs are read in `chunk_size` row batches (the `chunk_size` setting by default) and cached one by one,
+    so an interrupted load keeps the runs fetched so far. Each batch is prepared and compacted as it arrives, so loading
+    holds one raw batch next to the compacted parts of the current run, never a whole run of raw rows. `prepare` is applied once to freshly fetched rows
+    before they are cached (e.g. to decode series data). `cache` and `disk_cache` default to the process-wide caches.
+    Finished runs are read from the disk cache before the database, and written to it once fetched.
+    Frames have Arrow-backed dtypes when the `arrow_dtypes` setting is on, and are compacted (see `compact_frame`) before they are cached.
+
+    Cached frames of runs in progress are extended with the rows inserted since (high-water mark on `id`)
+    once expired, or on every call with `tail_live`, instead of being fetched again.
+    """
+    cache = cache if cache is not None else get_measurement_cache()
+    disk_cache = disk_cache if disk_cache is not None else get_disk_cache()
+    table = model.__tablename__
+
+    missing = []
+    partial = {}
+    for run_id in sorted(set(run_ids)):
+        live_frame = cache.live_frame((table, run_id))
+        if live_frame is not None and (tail_live or not cache.contains((table, run_id))):
+            partial[run_id] = live_frame
+            continue
+        frame = cache.get((table, run_id))
+        if frame is None:
+            missing.append(run_id)
+        else:
+            yield run_id, frame
+    if not missing and not partial:
+        return
+
+    arrow = arrow_dtypes()
+    # End times are read before the rows: a run seen as finished has all of its rows inserted
+    end_times = fetch_run_end_times(engine, missing + list(partial))
+    if partial:
+        high_water = {run_id: int(frame["id"].max()) if not frame.empty else 0 for run_id, frame in partial.items()}
+        new_rows = fetch_rows_after(engine, model, high_water, arrow)
+        new_frames = dict(iter(new_rows.groupby("run_id"))) if not new_rows.empty else {}
+        for run_id, frame in partial.items():
+            if run_id in new_frames:
+                rows = new_frames[run_id].reset_index(drop=True)
+                rows = prepare(rows) if prepare is not None else rows
+                frame = pd.concat([frame, rows], ignore_index=True) if not frame.empty else rows
+            yield run_id, store_run_frame(cache, disk_cache, table, run_id, end_times[run_id], frame)
+        if not missing:
+            return
+
+    if disk_cache is not None:
+        for run_id in list(missing):
+            if end_times[run_id] is None:
+                continue
+            frame = disk_cache.get(table, run_id, end_times[run_id], arrow)
+            if frame is not None:
+                frame = compact_frame(frame)
+                cache.put((table, run_id), frame)
+                missing.remove(run_id)
+                yield run_id, frame
+        if not missing:
+            return
+
+    chunk_size = chunk_size or get_setting("chunk_size", DEFAULT_CHUNK_SIZE, int)
+    remaining = set(missing)
+    current, parts = None, []
+    for run_id, part in iter_run_chunks(engine, model, missing, chunk_size, arrow):
+        if run_id != current and parts:
+            yield current, store_run_frame(cache, disk_cache, table, current, end_times[current], concat_frames(parts))
+            parts = []
+        current = run_id
+        remaining.discard(run_id)
+        parts.append(compact_frame(prepare(part) if prepare is not None else part))
+    if parts:
+        yield current, store_run_frame(cache, disk_cache, table, current, end_times[current], concat_frames(parts))
+    for run_id in sorted(remaining):
+        yield run_id, store_run_frame(cache, disk_cache, table, run_id, end_times[run_id], pd.DataFrame())
+
+
+def store_run_frame(
+    cache: MeasurementCache, disk_cache: DiskCache | None, table: str, run_id: int, end_time: datetime | None, frame: pd.DataFrame
+) -> pd.DataFrame:
+    """Compact and cache a freshly fetched run frame. Runs in progress expire from memory and are never written to disk."""
+    frame = compact_frame(frame)
+    cache.put((table, run_id), frame, live=end_time is None)
+    if disk_cache is not None and end_time is not None:
+        disk_cache.put(table, run_id, end_time, frame)
+    return frame
+
+
+def load_measurements(
+    engine: Engine,
+    model,
+    run_ids: list[int],
+    prepare: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+) -> pd.DataFrame:
+    """Load the measurements of `model` for `run_ids`, only querying runs missing from the shared cache."""
+    return concat_run_frames(dict(iter_measurements(engine, model, run_ids, prepare)))
+
+
+def concat_run_frames(frames: dict[int, pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate per-run frames in run order, keeping their categorical columns categorical."""
+    return concat_frames([frames[run_id] for run_id in sorted(frames) if not frames[run_id].empty])
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from data.compact import loads_json
+
+
+class MetaIndex:
+    """Measurement names and flattened `meta` values of a frame, stored once as categorical codes.
+
+    Option lists are the sorted categories, and a selection is evaluated by looking up each row's
+    code in a boolean table per column and intersecting the resulting bitmaps.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.size = len(df)
+        self.names = pd.Categorical(df["name"]).remove_unused_categories() if "name" in df.columns else None
+        self.columns: dict[str, pd.Categorical] = {}
+        if "meta" in df.columns and isinstance(df["meta"].dtype, pd.CategoricalDtype):
+            self.columns = self._flatten_categorical(df["meta"])
+        elif "meta" in df.columns:
+            meta_df = pd.json_normalize([meta if isinstance(meta, dict) else {} for meta in df["meta"]])
+            self.columns = {column: pd.Categorical(meta_df[column]) for column in meta_df.columns}
+
+    @staticmethod
+    def _flatten_categorical(meta: pd.Series) -> dict[str, pd.Categorical]:
+        # Compacted frames hold each distinct meta once as JSON text: flatten the distinct values, then expand them by row code
+        values = [loads_json(text) for text in meta.cat.categories]
+        meta_df = pd.json_normalize([value if isinstance(value, dict) else {} for value in values] + [{}])
+        codes = meta.cat.codes.to_numpy().copy()
+        codes[codes < 0] = len(values)  # rows without meta map to the trailing empty row
+        columns = {}
+        for column in meta_df.columns:
+            flat = pd.Categorical(meta_df[column])
+            columns[column] = pd.Categorical.from_codes(flat.codes[codes], categories=flat.categories).remove_unused_categories()
+        return columns
+
+    @property
+    def nbytes(self) -> int:
+        categoricals = ([self.names] if self.names is not None else []) + list(self.columns.values())
+        return sum(categorical.memory_usage(deep=True) for categorical in categoricals)
+
+    @property
+    def name_options(self) -> list:
+        return list(self.names.categories) if self.names is not None else []
+
+    def options(self, column: str) -> list:
+        return list(self.columns[column].categories)
+
+    @staticmethod
+    def _bitmap(categorical: pd.Categorical, selected: list) -> np.ndarray:
+        codes = categorical.categories.get_indexer(selected)
+        # One extra slot so that missing values (code -1) never match
+        lookup = np.zeros(len(categorical.categories) + 1, dtype=bool)
+        lookup[codes[codes >= 0]] = True
+        return lookup[categorical.codes]
+
+    def mask(self, names: list, meta_selections: dict[str, list]) -> np.ndarray | None:
+        """Row mask matching all non-empty selections, or None when nothing is selected."""
+        bitmaps = []
+        if names and self.names is not None:
+            bitmaps.append(self._bitmap(self.names, names))
+        for column, selected in meta_selections.items():
+            if selected:
+                bitmaps.append(self._bitmap(self.columns[column], selected))
+        return np.logical_and.reduce(bitmaps) if bitmaps else None
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Test case status -> code in the status matrix. Code 0 marks a test case that did not run in a run.
+STATUS_CODES = {"PASS": 1, "FAIL": 2, "SKIP": 3}
+UNKNOWN_CODE = 4
+CELL_LABELS = np.array(["", "✅", "❌", "⏭️", "❔"], dtype=object)
+
+
+class StatusMatrix:
+    """Test case statuses of a run selection as an int8 (test case x run) matrix.
+
+    Rows are the sorted (suite, test case) pairs and columns the sorted run ids, both factorized once,
+    so the matrix is filled with a single vectorized assignment. Labels and failure details are only
+    rendered for the slice of rows being displayed.
+    """
+
+    def __init__(self, test_df: pd.DataFrame, suite_df: pd.DataFrame, run_ids: list[int]):
+        tests = test_df[test_df["run_id"].isin(run_ids)].merge(
+            suite_df[["run_id", "suite_id", "name"]].rename(columns={"name": "suite"}),
+            on=["run_id", "suite_id"],
+            how="left",
+        )
+        suites, names = tests["suite"].astype(object).fillna(""), tests["name"].astype(object).fillna("")
+        row_codes, self.rows = pd.MultiIndex.from_arrays([suites, names]).factorize(sort=True)
+        column_codes, self.run_ids = pd.factorize(tests["run_id"], sort=True)
+
+        codes = pd.Categorical(tests["status"], categories=list(STATUS_CODES)).codes.astype(np.int8) + 1
+        codes[codes == 0] = UNKNOWN_CODE
+        self.codes = np.zeros((len(self.rows), len(self.run_ids)), dtype=np.int8)
+        # The first test case of a duplicated name wins: numpy does not define which of repeated indices an assignment keeps
+        first = ~pd.DataFrame({"row": row_codes, "column": column_codes}).duplicated().to_numpy()
+        self.codes[row_codes[first], column_codes[first]] = codes[first]
+
+        self.cells = pd.DataFrame({"row": row_codes, "column": column_codes, "run_id": tests["run_id"].to_numpy(), "test_id": tests["test_id"].to_numpy()})
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def run_labels(self) -> list[str]:
+        return [f"Run {run_id}" for run_id in self.run_ids]
+
+    def labels(self, start: int, stop: int, failure_df: pd.DataFrame | None = None) -> pd.DataFrame:
+        """Render rows `start:stop` as a (Test Suite, Test Case, Run ...) table, optionally with failure details."""
+        cells = CELL_LABELS[self.codes[start:stop]]
+        if failure_df is not None and not failure_df.empty:
+            page_cells = self.cells[(self.cells["row"] >= start) & (self.cells["row"] < stop)].drop_duplicates(["row", "column"])
+            page_failures = failure_df[failure_df["run_id"].isin(page_cells["run_id"]) & failure_df["test_id"].isin(page_cells["test_id"])]
+            details = page_failures.groupby(["run_id", "test_id"])["details"].agg(lambda values: "\n".join(map(str, values))).rename("details")
+            failed = page_cells.merge(details, left_on=["run_id", "test_id"], right_index=True)
+            if not failed.empty:
+                rows, columns = failed["row"].to_numpy() - start, failed["column"].to_numpy()
+                cells[rows, columns] = cells[rows, columns] + "\n" + failed["details"].to_numpy()
+
+        table = pd.DataFrame(cells, columns=self.run_labels)
+        table.insert(0, "Test Case", self.rows.get_level_values(1)[start:stop])
+        table.insert(0, "Test Suite", self.rows.get_level_values(0)[start:stop])
+        table.loc[table.duplicated(subset=["Test Suite"]), "Test Suite"] = ""
+        return table
@@ -0,0 +1,49 @@
+import time
+
+from data.settings import get_setting, parse_bool
+from sqlalchemy import Engine, make_url, text
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 1800
+
+
+def engine_options(db_url: str) -> dict:
+    """`create_engine` keyword arguments from the pool settings (`pool_size`, `max_overflow`, `pool_pre_ping`, `pool_recycle`, `statement_timeout`)."""
+    backend = make_url(db_url).get_backend_name()
+    options = {
+        "pool_pre_ping": get_setting("pool_pre_ping", True, parse_bool),
+        "pool_recycle": get_setting("pool_recycle", DEFAULT_POOL_RECYCLE, int),
+    }
+    if backend != "sqlite":
+        options["pool_size"] = get_setting("pool_size", DEFAULT_POOL_SIZE, int)
+        options["max_overflow"] = get_setting("max_overflow", DEFAULT_MAX_OVERFLOW, int)
+
+    statement_timeout = get_setting("statement_timeout", None, int)
+    if statement_timeout and backend == "postgresql":
+        # Applied by the server to every statement of the connection, in milliseconds
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
+
+def pool_status(engine: Engine) -> dict[str, int | str]:
+    """Utilization of the engine's connection pool."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+def check_health(engine: Engine) -> float:
+    """Round trip time of a trivial query, in seconds. Raises if the database is unreachable."""
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return time.perf_counter() - start
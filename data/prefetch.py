@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from data.disk_cache import DiskCache
+from data.measurement_cache import MeasurementCache, iter_measurements
+from data.series import decode_series
+from sqlalchemy import Engine
+from streamlit import cache_resource
+
+from roboscope.models import BooleanMeasurement, NumericMeasurement, SeriesMeasurement, StringMeasurement
+
+PREFETCH_WORKERS = 2
+# Measurement tables prefetched for the dashboard's run selection, with the preparation their page applies
+PREFETCH_MODELS = [
+    (NumericMeasurement, None),
+    (StringMeasurement, None),
+    (BooleanMeasurement, None),
+    (SeriesMeasurement, decode_series),
+]
+
+
+class Prefetcher:
+    """Background loader filling the measurement cache, at most one job per (table, run selection) at a time."""
+
+    def __init__(self, workers: int = PREFETCH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._jobs: dict[tuple[str, tuple[int, ...]], Future] = {}
+
+    def submit(self, engine: Engine, cache: MeasurementCache, disk_cache: DiskCache | None, run_ids: list[int], chunk_size: int) -> None:
+        run_ids = tuple(sorted(set(run_ids)))
+        with self._lock:
+            for model, prepare in PREFETCH_MODELS:
+                key = (model.__tablename__, run_ids)
+                if key in self._jobs and not self._jobs[key].done():
+                    continue
+                if all(cache.contains((model.__tablename__, run_id)) for run_id in run_ids):
+                    continue
+                self._jobs[key] = self._executor.submit(self._load, engine, cache, disk_cache, model, list(run_ids), prepare, chunk_size)
+            # Forget finished jobs
+            self._jobs = {key: job for key, job in self._jobs.items() if not job.done()}
+
+    def running(self, table: str, run_ids: list[int]) -> Future | None:
+        """The prefetch of this table and selection still running, if any."""
+        with self._lock:
+            job = self._jobs.get((table, tuple(sorted(set(run_ids)))))
+        return job if job is not None and not job.done() else None
+
+    @staticmethod
+    def _load(engine: Engine, cache: MeasurementCache, disk_cache: DiskCache | None, model, run_ids: list[int], prepare, chunk_size: int) -> None:
+        for _ in iter_measurements(engine, model, run_ids, prepare, chunk_size, cache=cache, disk_cache=disk_cache):
+            pass
+
+
+@cache_resource
+def get_prefetcher() -> Prefetcher:
+    return Prefetcher()
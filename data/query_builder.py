@@ -0,0 +1,70 @@
+import pandas as pd
+from data.loader import read_sql
+from sqlalchemy import Connection, Engine, cast, column, func, or_, select, true
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+def meta_items(model, dialect: str):
+    """Table-valued function yielding the (key, value) pairs of `model.meta`, or None if unsupported."""
+    if dialect == "sqlite":
+        return func.json_each(model.meta).table_valued("key", "value", "type")
+    if dialect == "postgresql":
+        # jsonb_each keeps the JSON type of values, so they can be matched back with `@>`
+        return func.jsonb_each(cast(model.meta, JSONB)).table_valued("key", column("value", JSONB))
+    return None
+
+
+def distinct_meta_values(conn: Connection, model, condition=None) -> dict[str, list]:
+    """Return the sorted distinct scalar values of every `meta` key of `model`, computed in the database."""
+    options: dict[str, set] = {}
+    items = meta_items(model, conn.dialect.name)
+    if items is not None:
+        stmt = select(items.c.key, items.c.value).select_from(model).join(items, true()).distinct()
+        if conn.dialect.name == "sqlite":
+            stmt = stmt.where(items.c.type.not_in(["object", "array"]))
+        rows = conn.execute(stmt.where(condition) if condition is not None else stmt)
+    else:
+        # Generic fallback for dialects without a JSON table function.
+        stmt = select(model.meta)
+        metas = conn.execute(stmt.where(condition) if condition is not None else stmt)
+        rows = ((key, value) for (meta,) in metas for key, value in (meta or {}).items())
+    for key, value in rows:
+        if value is not None and not isinstance(value, (dict, list)):
+            options.setdefault(key, set()).add(value)
+    return {key: sorted(values) for key, values in options.items()}
+
+
+def meta_condition(model, key: str, values: list, dialect: str):
+    """Predicate matching rows whose `meta[key]` is one of `values`.
+
+    PostgreSQL uses JSONB containment (`@>`), which a GIN index on `meta::jsonb` can serve;
+    other databases compare the extracted value (`json_extract` on SQLite).
+    """
+    if dialect == "postgresql":
+        return or_(*(cast(model.meta, JSONB).contains({key: value}) for value in values))
+    return model.meta[key].as_string().in_(values)
+
+
+def measurement_options(engine: Engine, model, run_ids: list[int]) -> tuple[list[str], dict[str, list]]:
+    """Fetch the distinct measurement names and meta values of the selected runs, without loading rows."""
+    condition = model.run_id.in_(run_ids)
+    with engine.connect() as conn:
+        names = [name for (name,) in conn.execute(select(model.name).where(condition).distinct().order_by(model.name)) if name is not None]
+        meta_options = distinct_meta_values(conn, model, condition)
+    return names, meta_options
+
+
+def fetch_filtered_measurements(
+    engine: Engine, model, run_ids: list[int], names: list[str], meta_selections: dict[str, list], arrow: bool = False
+) -> pd.DataFrame:
+    """Fetch only the measurement rows of the selected runs matching the name and meta selections."""
+    conditions = [model.run_id.in_(run_ids)]
+    if names:
+        conditions.append(model.name.in_(names))
+    for key, selected in meta_selections.items():
+        if selected:
+            conditions.append(meta_condition(model, key, selected, engine.dialect.name))
+
+    stmt = select(model.__table__).where(*conditions).order_by(model.run_id, model.id)
+    with engine.connect() as conn:
+        return read_sql(stmt, conn, arrow)
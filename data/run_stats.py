@@ -0,0 +1,202 @@
+import argparse
+from datetime import datetime, timedelta
+
+import pandas as pd
+from data.catalog import build_run_filter
+from sqlalchemy import Column, Connection, DateTime, Engine, Float, Integer, MetaData, String, Table, case, create_engine, delete, func, insert, inspect, select
+
+from roboscope.models import Failure, TestCase, TestRun, TestSuite
+
+RUN_STATS_BATCH_SIZE = 500
+# Runs without an end time that started this long before the newest run are treated as abandoned, not in progress
+DEFAULT_STALE_RUN_HOURS = 24.0
+# Test case status -> count column
+STATUS_COLUMNS = {"PASS": "passed", "FAIL": "failed", "SKIP": "skipped"}
+COUNT_COLUMNS = [*STATUS_COLUMNS.values(), "total", "failures"]
+
+# Rollup tables owned by RoboScope UI, created next to the RoboScope tables
+metadata = MetaData()
+
+run_stats = Table(
+    "run_stats",
+    metadata,
+    Column("run_id", Integer, primary_key=True),
+    Column("name", String),
+    Column("start_time", DateTime, index=True),
+    Column("elapsed_time", Float),
+    Column("status", String),
+    Column("passed", Integer),
+    Column("failed", Integer),
+    Column("skipped", Integer),
+    Column("total", Integer),
+    Column("failures", Integer),
+    Column("test_elapsed_time", Float),
+)
+
+run_suite_stats = Table(
+    "run_suite_stats",
+    metadata,
+    Column("run_id", Integer, primary_key=True),
+    Column("suite_id", Integer, primary_key=True),
+    Column("name", String),
+    Column("passed", Integer),
+    Column("failed", Integer),
+    Column("skipped", Integer),
+    Column("total", Integer),
+    Column("failures", Integer),
+    Column("test_elapsed_time", Float),
+)
+
+# Start time up to which all finished runs are rolled up
+run_stats_watermark = Table(
+    "run_stats_watermark",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("start_time", DateTime),
+)
+
+
+def aggregate_suites(conn: Connection, run_ids: list[int]) -> pd.DataFrame:
+    """Status counts, test durations and failure counts per (run, suite), aggregated in the database."""
+    status_counts = [func.sum(case((TestCase.status == status, 1), else_=0)).label(column) for status, column in STATUS_COLUMNS.items()]
+    tests = pd.read_sql(
+        select(
+            TestCase.run_id,
+            TestCase.suite_id,
+            *status_counts,
+            func.count().label("total"),
+            func.sum(TestCase.elapsed_time).label("test_elapsed_time"),
+        )
+        .where(TestCase.run_id.in_(run_ids))
+        .group_by(TestCase.run_id, TestCase.suite_id),
+        conn,
+    )
+    failures = pd.read_sql(
+        select(Failure.run_id, Failure.suite_id, func.count().label("failures"))
+        .where(Failure.run_id.in_(run_ids))
+        .group_by(Failure.run_id, Failure.suite_id),
+        conn,
+    )
+    suites = pd.read_sql(select(TestSuite.run_id, TestSuite.suite_id, TestSuite.name).where(TestSuite.run_id.in_(run_ids)), conn)
+
+    suite_df = tests.merge(failures, on=["run_id", "suite_id"], how="outer").merge(suites, on=["run_id", "suite_id"], how="left")
+    suite_df[COUNT_COLUMNS] = suite_df[COUNT_COLUMNS].fillna(0).astype(int)
+    suite_df["test_elapsed_time"] = suite_df["test_elapsed_time"].fillna(0.0)
+    return suite_df
+
+
+def aggregate_runs(run_df: pd.DataFrame, suite_df: pd.DataFrame) -> pd.DataFrame:
+    """One row per run of `run_df`, with the suite statistics summed up. Runs without tests get zero counts."""
+    totals = suite_df.groupby("run_id")[[*COUNT_COLUMNS, "test_elapsed_time"]].sum()
+    stats_df = run_df[["run_id", "name", "start_time", "elapsed_time", "status"]].merge(totals, left_on="run_id", right_index=True, how="left")
+    stats_df[COUNT_COLUMNS] = stats_df[COUNT_COLUMNS].fillna(0).astype(int)
+    stats_df["test_elapsed_time"] = stats_df["test_elapsed_time"].fillna(0.0)
+    return stats_df
+
+
+def to_records(df: pd.DataFrame, table: Table) -> list[dict]:
+    columns = [column.name for column in table.columns]
+    return df[columns].astype(object).where(df[columns].notna(), None).to_dict("records")
+
+
+def missing_run_stats_tables(engine: Engine) -> list[str]:
+    """The rollup tables not created yet by `python -m data.run_stats`."""
+    existing = set(inspect(engine).get_table_names())
+    return [table for table in metadata.tables if table not in existing]
+
+
+def refresh_run_stats(
+    engine: Engine, batch_size: int = RUN_STATS_BATCH_SIZE, stale_hours: float = DEFAULT_STALE_RUN_HOURS, create: bool = True
+) -> int:
+    """Roll up the finished runs started since the watermark, `batch_size` runs per transaction. Returns the number of runs added.
+
+    The watermark never passes a run still in progress, so runs are rolled up once they finish,
+    and runs already rolled up are skipped, which makes the refresh safe to re-run. A run without an end time
+    that started more than `stale_hours` before the newest run no longer holds the watermark back: if it ever
+    finishes, it is left out of the rollup (the dashboard still counts it from its test cases).
+    The tables are created first unless `create` is off, in which case nothing is done while they are missing.
+    """
+    if create:
+        metadata.create_all(engine)
+    elif missing_run_stats_tables(engine):
+        return 0
+    with engine.connect() as conn:
+        watermark = conn.execute(select(run_stats_watermark.c.start_time)).scalar()
+        stmt = select(TestRun.run_id, TestRun.start_time, TestRun.end_time).where(TestRun.start_time.is_not(None))
+        if watermark is not None:
+            stmt = stmt.where(TestRun.start_time >= watermark)
+        runs = pd.read_sql(stmt.where(TestRun.run_id.not_in(select(run_stats.c.run_id))).order_by(TestRun.start_time), conn)
+        newest = conn.execute(select(func.max(TestRun.start_time))).scalar()
+
+    if runs.empty:
+        return 0
+    unfinished = runs["end_time"].isna()
+    live = unfinished & (runs["start_time"] >= pd.Timestamp(newest) - timedelta(hours=stale_hours))
+    run_ids = runs.loc[~unfinished, "run_id"].tolist()
+    for start in range(0, len(run_ids), batch_size):
+        batch = run_ids[start : start + batch_size]
+        with engine.begin() as conn:
+            run_df = pd.read_sql(select(TestRun).where(TestRun.run_id.in_(batch)), conn)
+            suite_df = aggregate_suites(conn, batch)
+            conn.execute(delete(run_suite_stats).where(run_suite_stats.c.run_id.in_(batch)))
+            if not suite_df.empty:
+                conn.execute(insert(run_suite_stats), to_records(suite_df, run_suite_stats))
+            conn.execute(insert(run_stats), to_records(aggregate_runs(run_df, suite_df), run_stats))
+
+    new_watermark = runs.loc[live, "start_time"].min() if live.any() else runs["start_time"].max()
+    with engine.begin() as conn:
+        conn.execute(delete(run_stats_watermark))
+        conn.execute(insert(run_stats_watermark), [{"id": 1, "start_time": new_watermark.to_pydatetime()}])
+    return len(run_ids)
+
+
+def fetch_run_stats(engine: Engine, run_ids: list[int]) -> pd.DataFrame:
+    with engine.connect() as conn:
+        return pd.read_sql(select(run_stats).where(run_stats.c.run_id.in_(run_ids)).order_by(run_stats.c.start_time), conn)
+
+
+def fetch_run_trend(engine: Engine, start_dt: datetime, end_dt: datetime, meta_filters: dict) -> pd.DataFrame:
+    """Rolled-up statistics of all runs matching the sidebar filters, oldest first, in a single query."""
+    stmt = (
+        select(run_stats)
+        .join(TestRun, TestRun.run_id == run_stats.c.run_id)
+        .where(build_run_filter(start_dt, end_dt, meta_filters, engine.dialect.name))
+        .order_by(run_stats.c.start_time)
+    )
+    with engine.connect() as conn:
+        return pd.read_sql(stmt, conn)
+
+
+def summarize_test_cases(test_df: pd.DataFrame, failure_df: pd.DataFrame, run_df: pd.DataFrame) -> pd.DataFrame:
+    """Compute the `run_stats` rows from loaded test cases, for runs that are not rolled up yet."""
+    if test_df.empty or run_df.empty:
+        return pd.DataFrame(columns=[column.name for column in run_stats.columns])
+    statuses = test_df.assign(**{column: test_df["status"] == status for status, column in STATUS_COLUMNS.items()})
+    suite_df = statuses.groupby(["run_id", "suite_id"]).agg(
+        **{column: (column, "sum") for column in STATUS_COLUMNS.values()},
+        total=("status", "size"),
+        test_elapsed_time=("elapsed_time", "sum"),
+    )
+    suite_df["failures"] = failure_df.groupby(["run_id", "suite_id"]).size() if not failure_df.empty else 0
+    suite_df["failures"] = suite_df["failures"].fillna(0)
+    return aggregate_runs(run_df[run_df["run_id"].isin(test_df["run_id"])], suite_df.reset_index())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incrementally refresh the run_stats rollup tables.")
+    parser.add_argument("--db_url", type=str, required=True, help="Database URL")
+    parser.add_argument("--batch_size", type=int, default=RUN_STATS_BATCH_SIZE, help="Number of runs rolled up per transaction")
+    parser.add_argument(
+        "--stale_hours",
+        type=float,
+        default=DEFAULT_STALE_RUN_HOURS,
+        help="Hours before the newest run after which a run without an end time is treated as abandoned",
+    )
+    args = parser.parse_args()
+
+    added = refresh_run_stats(create_engine(args.db_url), args.batch_size, args.stale_hours)
+    print(f"Rolled up {added} runs.")
+
+
+if __name__ == "__main__":
+    main()
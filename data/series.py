@@ -0,0 +1,98 @@
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional, only speeds up decoding of raw JSON strings
+    orjson = None
+
+SERIES_COLUMNS = ["x_data", "y_data", "lower_limits", "upper_limits"]
+EMPTY = np.empty(0, dtype=float)
+
+
+def to_array(value) -> np.ndarray:
+    """Decode a JSON list (already parsed or raw text) into a float array."""
+    if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return EMPTY
+    if isinstance(value, (str, bytes)):
+        value = orjson.loads(value) if orjson is not None else json.loads(value)
+    if len(value) == 0:
+        return EMPTY
+    return np.asarray(value, dtype=float)
+
+
+def decode_series(series_df: pd.DataFrame) -> pd.DataFrame:
+    """Decode the JSON series columns once into NumPy arrays. Missing x data becomes the sample index."""
+    if series_df.empty:
+        return series_df
+    series_df = series_df.copy()
+    for column in SERIES_COLUMNS:
+        series_df[column] = [to_array(value) for value in series_df[column]]
+    series_df["x_data"] = [
+        x if x.size else np.arange(y.size, dtype=float) for x, y in zip(series_df["x_data"], series_df["y_data"])
+    ]
+    return series_df
+
+
+def x_bounds(xs) -> tuple[float, float] | None:
+    """Smallest and largest x value of all series, skipping empty series and NaNs. None when there is no x value at all."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN x data
+        bounds = np.array([(np.nanmin(x), np.nanmax(x)) for x in xs if x.size], dtype=float).reshape(-1, 2)
+    if np.isnan(bounds).all():
+        return None
+    return float(np.nanmin(bounds[:, 0])), float(np.nanmax(bounds[:, 1]))
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the min and max sample of `n_out // 2` equal buckets, in order."""
+    n_buckets = max(n_out // 2, 1)
+    bucket_size = -(-y.size // n_buckets)
+    n_buckets = -(-y.size // bucket_size)
+    padded = np.full(n_buckets * bucket_size, np.nan)
+    padded[: y.size] = y
+    buckets = padded.reshape(n_buckets, bucket_size)
+    offsets = np.arange(n_buckets) * bucket_size
+    low = np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1) + offsets
+    high = np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1) + offsets
+    return np.unique(np.concatenate([low, high, [0, y.size - 1]]))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `n_out` samples preserving the visual shape."""
+    n_out = max(n_out, 3)
+    edges = np.linspace(1, x.size - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, x.size - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start = edges[i + 1]
+        next_end = max(edges[i + 2] if i + 2 < edges.size else x.size, next_start + 1)
+        next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous]) - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(areas)) if not np.isnan(areas).all() else start
+        indices[i + 1] = previous
+    return indices
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, n_out: int, method: str = "minmax") -> np.ndarray:
+    """Indices of at most ~`n_out` samples to draw. Short series are returned in full."""
+    if y.size <= n_out:
+        return np.arange(y.size)
+    if method == "lttb":
+        return lttb_indices(x, y, n_out)
+    return minmax_indices(y, n_out)
+
+
+def viewport(x: np.ndarray, x_range: tuple[float, float] | None) -> slice:
+    """Slice of the samples inside `x_range` (x data is assumed sorted)."""
+    if x_range is None:
+        return slice(None)
+    start, end = np.searchsorted(x, x_range[0], side="left"), np.searchsorted(x, x_range[1], side="right")
+    return slice(max(start - 1, 0), end + 1)
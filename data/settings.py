@@ -0,0 +1,25 @@
+import argparse
+from typing import Any, Callable
+
+import streamlit as st
+
+
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def get_setting(name: str, default: Any = None, type: Callable[[Any], Any] = str) -> Any:
+    """Read a setting from the `--name=...` app argument, falling back to `st.secrets` and then `default`."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(f"--{name}", type=str)
+    args, _ = parser.parse_known_args()
+
+    value = getattr(args, name)
+    if value is None:
+        try:
+            value = st.secrets.get(name)
+        except FileNotFoundError:
+            value = None
+    return default if value is None else type(value)
@@ -0,0 +1,239 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from data.loader import batched, fetch_run_end_times
+from sqlalchemy import Engine, func, select
+from streamlit import cache_resource
+
+from roboscope.models import NumericMeasurement
+
+SPC_BATCH_SIZE = 200
+MOMENT_COLUMNS = ["run_id", "name", "n", "mean", "m2", "min", "max", "lower_limit", "upper_limit", "timestamp"]
+# Control chart constants (d2, d3) of the subgroup range, by subgroup size (larger subgroups use the last size)
+RANGE_CONSTANTS = {
+    2: (1.128, 0.853),
+    3: (1.693, 0.888),
+    4: (2.059, 0.880),
+    5: (2.326, 0.864),
+    6: (2.534, 0.848),
+    7: (2.704, 0.833),
+    8: (2.847, 0.820),
+    9: (2.970, 0.808),
+    10: (3.078, 0.797),
+    11: (3.173, 0.787),
+    12: (3.258, 0.778),
+    13: (3.336, 0.770),
+    14: (3.407, 0.763),
+    15: (3.472, 0.756),
+    16: (3.532, 0.750),
+    17: (3.588, 0.744),
+    18: (3.640, 0.739),
+    19: (3.689, 0.733),
+    20: (3.735, 0.729),
+    21: (3.778, 0.724),
+    22: (3.819, 0.720),
+    23: (3.858, 0.716),
+    24: (3.895, 0.712),
+    25: (3.931, 0.708),
+}
+D2 = np.array([np.nan, np.nan, *(d2 for d2, _ in RANGE_CONSTANTS.values())])
+D3 = np.array([np.nan, np.nan, *(d3 for _, d3 in RANGE_CONSTANTS.values())])
+WESTERN_ELECTRIC_RULES = {
+    "rule_1": "1 point beyond 3σ",
+    "rule_2": "2 of 3 points beyond 2σ on one side",
+    "rule_3": "4 of 5 points beyond 1σ on one side",
+    "rule_4": "8 points in a row on one side",
+}
+
+
+def fetch_run_moments(engine: Engine, run_ids: list[int]) -> pd.DataFrame:
+    """Count, mean, sum of squared deviations (M2), range and limits of the numeric values of every (run, name), computed in the database.
+
+    M2 is taken around each run's own mean (two passes via a window function), so it does not lose precision on values far from zero.
+    """
+    model = NumericMeasurement
+    values = (
+        select(
+            model.run_id,
+            model.name,
+            model.value,
+            model.lower_limit,
+            model.upper_limit,
+            model.timestamp,
+            func.avg(model.value).over(partition_by=[model.run_id, model.name]).label("run_mean"),
+        )
+        .where(model.run_id.in_(run_ids), model.value.is_not(None))
+        .subquery()
+    )
+    deviation = values.c.value - values.c.run_mean
+    stmt = select(
+        values.c.run_id,
+        values.c.name,
+        func.count().label("n"),
+        func.avg(values.c.value).label("mean"),
+        func.sum(deviation * deviation).label("m2"),
+        func.min(values.c.value).label("min"),
+        func.max(values.c.value).label("max"),
+        func.max(values.c.lower_limit).label("lower_limit"),
+        func.max(values.c.upper_limit).label("upper_limit"),
+        func.min(values.c.timestamp).label("timestamp"),
+    ).group_by(values.c.run_id, values.c.name)
+    with engine.connect() as conn:
+        return pd.read_sql(stmt, conn)
+
+
+class MomentStore:
+    """Thread-safe store of the per-(run, name) moments of finished runs.
+
+    Moments of a finished run never change, so only runs not seen before are aggregated; runs in progress are re-aggregated on every call.
+    """
+
+    def __init__(self):
+        self._runs: dict[int, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def moments(self, engine: Engine, run_ids: list[int], batch_size: int = SPC_BATCH_SIZE) -> pd.DataFrame:
+        run_ids = sorted(set(run_ids))
+        with self._lock:
+            frames = [self._runs[run_id] for run_id in run_ids if run_id in self._runs]
+            missing = [run_id for run_id in run_ids if run_id not in self._runs]
+        if missing:
+            end_times = fetch_run_end_times(engine, missing)
+            for batch in batched(missing, batch_size):
+                moments = fetch_run_moments(engine, batch)
+                by_run = dict(iter(moments.groupby("run_id")))
+                with self._lock:
+                    for run_id in batch:
+                        run_moments = by_run.get(run_id, moments.iloc[:0])
+                        if end_times[run_id] is not None:
+                            self._runs[run_id] = run_moments
+                        frames.append(run_moments)
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=MOMENT_COLUMNS)
+        return pd.concat(frames, ignore_index=True).sort_values(["name", "timestamp", "run_id"], ignore_index=True)
+
+
+@cache_resource
+def get_moment_store() -> MomentStore:
+    return MomentStore()
+
+
+def combine_moments(moments: pd.DataFrame) -> pd.DataFrame:
+    """Merge per-run moments into per-name totals (parallel variance formula), without revisiting the values.
+
+    `m2_within` only sums the squared deviations from each run's mean, `m2` adds the spread between run means.
+    """
+    grouped = moments.assign(weighted=moments["n"] * moments["mean"]).groupby("name", sort=True)
+    totals = grouped.agg(
+        n=("n", "sum"),
+        runs=("run_id", "size"),
+        weighted=("weighted", "sum"),
+        m2_within=("m2", "sum"),
+        min=("min", "min"),
+        max=("max", "max"),
+        lower_limit=("lower_limit", "last"),
+        upper_limit=("upper_limit", "last"),
+    )
+    totals["mean"] = totals["weighted"] / totals["n"]
+    between = moments["n"] * (moments["mean"] - moments["name"].map(totals["mean"])) ** 2
+    totals["m2"] = totals["m2_within"] + between.groupby(moments["name"]).sum()
+    return totals.drop(columns="weighted")
+
+
+def capability_indices(mean, sigma, lower_limit, upper_limit) -> tuple:
+    """Cp and Cpk for `sigma`; one-sided limits give Cpk from the defined side only and no Cp."""
+    cp = (upper_limit - lower_limit) / (6 * sigma)
+    cpk = np.fmin((upper_limit - mean) / (3 * sigma), (mean - lower_limit) / (3 * sigma))
+    return cp, cpk
+
+
+def capability(moments: pd.DataFrame) -> pd.DataFrame:
+    """Per-name process capability: Cp/Cpk from the within-run sigma, Pp/Ppk from the overall sigma."""
+    totals = combine_moments(moments)
+    totals["sigma_within"] = np.sqrt(totals["m2_within"] / (totals["n"] - totals["runs"]).where(lambda dof: dof > 0))
+    totals["sigma_overall"] = np.sqrt(totals["m2"] / (totals["n"] - 1).where(lambda dof: dof > 0))
+    totals["cp"], totals["cpk"] = capability_indices(totals["mean"], totals["sigma_within"], totals["lower_limit"], totals["upper_limit"])
+    totals["pp"], totals["ppk"] = capability_indices(totals["mean"], totals["sigma_overall"], totals["lower_limit"], totals["upper_limit"])
+    return totals.drop(columns=["m2", "m2_within"]).reset_index()
+
+
+def rolling_capability(run_moments: pd.DataFrame, window: int) -> pd.DataFrame:
+    """Cpk of one name over a sliding window of `window` runs, from rolling sums of the run moments."""
+    n = run_moments["n"].rolling(window, min_periods=1).sum()
+    mean = (run_moments["n"] * run_moments["mean"]).rolling(window, min_periods=1).sum() / n
+    dof = (run_moments["n"] - 1).rolling(window, min_periods=1).sum()
+    sigma = np.sqrt(run_moments["m2"].rolling(window, min_periods=1).sum() / dof.where(dof > 0))
+    _, cpk = capability_indices(mean, sigma, run_moments["lower_limit"], run_moments["upper_limit"])
+    return pd.DataFrame({"run_id": run_moments["run_id"], "timestamp": run_moments["timestamp"], "mean": mean, "sigma": sigma, "cpk": cpk})
+
+
+def western_electric(z: np.ndarray) -> pd.DataFrame:
+    """Western Electric rule violations of a sequence of z-scores, flagged on the last point of each violating window."""
+    z = pd.Series(z, dtype=float)
+
+    def count(condition: pd.Series, window: int) -> pd.Series:
+        return condition.astype(int).rolling(window, min_periods=window).sum()
+
+    def one_side(threshold: float, window: int, needed: int) -> pd.Series:
+        return (count(z > threshold, window) >= needed) | (count(z < -threshold, window) >= needed)
+
+    return pd.DataFrame(
+        {
+            "rule_1": (z.abs() > 3).to_numpy(),
+            "rule_2": one_side(2, 3, 2).to_numpy(),
+            "rule_3": one_side(1, 5, 4).to_numpy(),
+            "rule_4": one_side(0, 8, 8).to_numpy(),
+        }
+    )
+
+
+def xbar_r_chart(run_moments: pd.DataFrame) -> pd.DataFrame:
+    """X̄-R chart of one name, one subgroup per run, with limits for the size of each subgroup and rule violations on X̄."""
+    totals = combine_moments(run_moments).iloc[0]
+    sigma = np.sqrt(totals["m2_within"] / (totals["n"] - totals["runs"])) if totals["n"] > totals["runs"] else np.nan
+    size = run_moments["n"].clip(upper=D2.size - 1).to_numpy()
+    spread = 3 * sigma / np.sqrt(run_moments["n"].to_numpy())
+    chart = pd.DataFrame(
+        {
+            "run_id": run_moments["run_id"].to_numpy(),
+            "timestamp": run_moments["timestamp"].to_numpy(),
+            "n": run_moments["n"].to_numpy(),
+            "xbar": run_moments["mean"].to_numpy(),
+            "xbar_center": totals["mean"],
+            "xbar_ucl": totals["mean"] + spread,
+            "xbar_lcl": totals["mean"] - spread,
+            "range": (run_moments["max"] - run_moments["min"]).to_numpy(),
+            "range_center": D2[size] * sigma,
+            "range_ucl": (D2[size] + 3 * D3[size]) * sigma,
+            "range_lcl": np.clip(D2[size] - 3 * D3[size], 0, None) * sigma,
+        }
+    )
+    return pd.concat([chart, western_electric((chart["xbar"] - chart["xbar_center"]) / (spread / 3))], axis=1)
+
+
+def individuals_chart(values: pd.Series) -> pd.DataFrame:
+    """I-MR chart of individual values in measurement order, sigma estimated from the average moving range."""
+    values = pd.Series(values, dtype=float).reset_index(drop=True)
+    moving_range = values.diff().abs()
+    sigma = moving_range.mean() / D2[2]
+    center = values.mean()
+    chart = pd.DataFrame(
+        {
+            "value": values,
+            "center": center,
+            "ucl": center + 3 * sigma,
+            "lcl": center - 3 * sigma,
+            "moving_range": moving_range,
+            "mr_center": moving_range.mean(),
+            "mr_ucl": (D2[2] + 3 * D3[2]) * sigma,
+        }
+    )
+    return pd.concat([chart, western_electric((values - center) / sigma)], axis=1)
+
+
+def count_violations(moments: pd.DataFrame) -> pd.DataFrame:
+    """Number of X̄ chart points violating each Western Electric rule, per name."""
+    counts = {name: xbar_r_chart(run_moments)[list(WESTERN_ELECTRIC_RULES)].sum() for name, run_moments in moments.groupby("name", sort=True)}
+    return pd.DataFrame.from_dict(counts, orient="index").rename_axis("name").reset_index()
@@ -0,0 +1,162 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from data.loader import batched, fetch_run_end_times
+from data.overview import STATUS_CODES, UNKNOWN_CODE
+from sqlalchemy import Engine, and_, select
+from streamlit import cache_resource
+
+from roboscope.models import TestCase, TestSuite
+
+HISTORY_BATCH_SIZE = 200
+PASS, FAIL = STATUS_CODES["PASS"], STATUS_CODES["FAIL"]
+OUTCOMES = np.array(["PASS", "FAIL"], dtype=object)
+
+
+def fetch_run_statuses(engine: Engine, run_ids: list[int]) -> pd.DataFrame:
+    """(suite, test case) name and status of every test case of `run_ids`, without the other test case columns."""
+    stmt = (
+        select(TestCase.run_id, TestSuite.name.label("suite"), TestCase.name, TestCase.status)
+        .outerjoin(TestSuite, and_(TestSuite.run_id == TestCase.run_id, TestSuite.suite_id == TestCase.suite_id))
+        .where(TestCase.run_id.in_(run_ids))
+        .order_by(TestCase.run_id, TestCase.id)
+    )
+    with engine.connect() as conn:
+        return pd.read_sql(stmt, conn)
+
+
+class StatusHistory:
+    """Statuses of (suite, test case) keys across runs as an int8 (test case x run) matrix of `STATUS_CODES`, 0 where a test did not run.
+
+    Columns are in the order of the runs given, so that flips and streaks follow the run history.
+    Rows and `run_labels` match `StatusMatrix`, so `build_status_heatmap` renders any subset.
+    """
+
+    def __init__(self, rows: list[tuple[str, str]], run_ids: list[int], codes: np.ndarray):
+        self.rows = rows
+        self.run_ids = run_ids
+        self.codes = codes
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def run_labels(self) -> list[str]:
+        return [f"Run {run_id}" for run_id in self.run_ids]
+
+    def subset(self, rows: np.ndarray) -> "StatusHistory":
+        return StatusHistory([self.rows[row] for row in rows], self.run_ids, self.codes[rows])
+
+    def summary(self) -> pd.DataFrame:
+        """Per test case: executions, failures, flips between PASS and FAIL, the longest and current failure streak and the first failing run.
+
+        Only PASS and FAIL count as executions, so skipped or missing runs neither break a streak nor count as a flip.
+        Computed over the executed cells in one pass, without a loop over tests or runs.
+        """
+        n = len(self.rows)
+        rows, columns = np.nonzero((self.codes == PASS) | (self.codes == FAIL))  # grouped by test case, in run order
+        failed = self.codes[rows, columns] == FAIL
+        same_test = rows[1:] == rows[:-1]
+        changed = failed[1:] != failed[:-1]
+
+        executions = np.bincount(rows, minlength=n)
+        failures = np.bincount(rows[failed], minlength=n)
+        flips = np.bincount(rows[1:][same_test & changed], minlength=n)
+
+        # Streaks: segments of consecutive equal outcomes of one test case
+        starts = np.ones(len(rows), dtype=bool)
+        starts[1:] = ~same_test | changed
+        segments = np.cumsum(starts) - 1
+        lengths = np.bincount(segments)
+        longest = np.zeros(n, dtype=int)
+        np.maximum.at(longest, rows[starts & failed], lengths[segments[starts & failed]])
+        ends = np.ones(len(rows), dtype=bool)
+        ends[:-1] = ~same_test
+        current = np.zeros(n, dtype=int)
+        current[rows[ends]] = np.where(failed[ends], lengths[segments[ends]], 0)
+        last_status = np.full(n, None, dtype=object)
+        last_status[rows[ends]] = OUTCOMES[failed[ends].astype(int)]
+
+        fail_cells = self.codes == FAIL
+        has_failed = fail_cells.any(axis=1)
+        first_fail = pd.array([pd.NA] * n, dtype="Int64")
+        if has_failed.any():
+            first_fail[has_failed] = np.asarray(self.run_ids)[fail_cells.argmax(axis=1)[has_failed]]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame(
+                {
+                    "suite": [suite for suite, _ in self.rows],
+                    "test": [test for _, test in self.rows],
+                    "executions": executions,
+                    "failures": failures,
+                    "failure_rate": np.where(executions > 0, failures / executions, np.nan),
+                    "flips": flips,
+                    "flip_rate": np.where(executions > 1, flips / (executions - 1), np.nan),
+                    "longest_fail_streak": longest,
+                    "current_fail_streak": current,
+                    "first_failing_run": first_fail,
+                    "last_status": last_status,
+                }
+            )
+
+
+class StatusHistoryStore:
+    """Thread-safe store of the test case statuses of finished runs, updated incrementally as runs finish.
+
+    Each run is kept as two arrays, the int32 indexes of its (suite, test case) keys in a shared key index and
+    their int8 status codes, so a history of thousands of runs takes about five bytes per test case execution.
+    Statuses of a finished run never change, so each run is fetched once; runs in progress are left out.
+    """
+
+    def __init__(self):
+        self._keys: dict[tuple[str, str], int] = {}
+        self._runs: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, statuses: pd.DataFrame, run_ids: list[int]) -> None:
+        # The first test case of a duplicated name wins, as in `StatusMatrix`
+        statuses = statuses.drop_duplicates(["run_id", "suite", "name"])
+        key_codes, keys = pd.MultiIndex.from_arrays([statuses["suite"].fillna(""), statuses["name"].fillna("")]).factorize()
+        key_index = np.array([self._keys.setdefault(key, len(self._keys)) for key in keys], dtype=np.int32)
+        codes = pd.Categorical(statuses["status"], categories=list(STATUS_CODES)).codes.astype(np.int8) + 1
+        codes[codes == 0] = UNKNOWN_CODE
+        positions = statuses.groupby("run_id").indices
+        for run_id in run_ids:
+            rows = positions.get(run_id, np.empty(0, dtype=int))
+            self._runs[run_id] = (key_index[key_codes[rows]], codes[rows])
+
+    def history(self, engine: Engine, run_ids: list[int], batch_size: int = HISTORY_BATCH_SIZE) -> StatusHistory:
+        """The status history of the finished runs among `run_ids`, in the order given, fetching only runs not seen before."""
+        with self._lock:
+            missing = [run_id for run_id in run_ids if run_id not in self._runs]
+        if missing:
+            end_times = fetch_run_end_times(engine, missing)
+            for batch in batched([run_id for run_id in missing if end_times[run_id] is not None], batch_size):
+                statuses = fetch_run_statuses(engine, batch)
+                with self._lock:
+                    self._add(statuses, batch)
+
+        with self._lock:
+            runs = [(run_id, *self._runs[run_id]) for run_id in run_ids if run_id in self._runs]
+            keys = list(self._keys)
+        if not runs:
+            return StatusHistory([], [], np.zeros((0, 0), dtype=np.int8))
+
+        tests = np.concatenate([run_tests for _, run_tests, _ in runs])
+        statuses = np.concatenate([run_statuses for _, _, run_statuses in runs])
+        columns = np.repeat(np.arange(len(runs)), [len(run_tests) for _, run_tests, _ in runs])
+        used = np.unique(tests)
+        # Rows sorted by (suite, test case)
+        order = sorted(range(len(used)), key=lambda row: keys[used[row]])
+        row_of = np.empty(len(used), dtype=np.int64)
+        row_of[order] = np.arange(len(used))
+        codes = np.zeros((len(used), len(runs)), dtype=np.int8)
+        codes[row_of[np.searchsorted(used, tests)], columns] = statuses
+        return StatusHistory([keys[used[row]] for row in order], [run_id for run_id, _, _ in runs], codes)
+
+
+@cache_resource
+def get_status_history_store() -> StatusHistoryStore:
+    return StatusHistoryStore()
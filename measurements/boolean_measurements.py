@@ -1,51 +1,51 @@
 import pandas as pd
 import streamlit as st
-from components.filters import apply_measurement_filters
+from components.filters import apply_database_filters, apply_measurement_filters, database_filter_toggle
+from components.live import show_live_toggle
+from components.progress import load_measurements_progressively
+from components.tables import show_data_table
+from data.evaluation import bool_labels, evaluate_boolean_results, result_labels
 
 from roboscope.models import BooleanMeasurement
 
 st.title("Boolean Measurements")
 
-db = st.session_state.db
+engine = st.session_state.engine
 selected_run_ids = st.session_state.selected_run_ids
 
 if not selected_run_ids:
     st.warning("Please select at least one Test Run to display measurements.")
     st.stop()
 
-boolean_df = db.query(BooleanMeasurement).where_in("run_id", selected_run_ids).as_dataframe()
-
-if boolean_df.empty:
-    st.info("No boolean data available for the selected runs.")
-    st.stop()
+live = show_live_toggle(engine, selected_run_ids, [BooleanMeasurement], "boolean_live")
 
 st.subheader("Measurement Filters")
-boolean_df = apply_measurement_filters(boolean_df)
+
+if database_filter_toggle():
+    boolean_df = apply_database_filters(engine, BooleanMeasurement, selected_run_ids)
+else:
+    boolean_df = load_measurements_progressively(engine, BooleanMeasurement, selected_run_ids, tail_live=live)
+    if boolean_df.empty:
+        st.info("No boolean data available for the selected runs.")
+        st.stop()
+    boolean_df = apply_measurement_filters(boolean_df, cache_key=("boolean_measurement", tuple(selected_run_ids)))
 
 if boolean_df.empty:
     st.info("No data after filtering. Adjust your filters to see results.")
     st.stop()
 
-with st.expander("Data Table", expanded=False):
-    st.dataframe(boolean_df)
-
-
-def determine_boolean_result(row):
-    # If expected_value is None → no check, just ✅
-    if pd.isna(row["expected_value"]):
-        return "✅"
-    return "✅" if row["value"] == row["expected_value"] else "❌"
+show_data_table(boolean_df)
 
 
-boolean_df["Result"] = boolean_df.apply(determine_boolean_result, axis=1)
+boolean_df["Result"] = result_labels(evaluate_boolean_results(boolean_df))
 
 # Build display table
 display_df = pd.DataFrame(
     {
         "Run ID": boolean_df["run_id"],
         "Measurement Name": boolean_df["name"],
-        "Value": boolean_df["value"].apply(lambda x: "True" if x else "False"),
-        "Expected": boolean_df["expected_value"].apply(lambda x: "True" if x else "False"),
+        "Value": bool_labels(boolean_df["value"]),
+        "Expected": bool_labels(boolean_df["expected_value"]),
         "Result": boolean_df["Result"],
     }
 )
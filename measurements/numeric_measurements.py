@@ -1,36 +1,82 @@
 import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
-from components.filters import apply_measurement_filters
+from components.filters import apply_database_filters, apply_measurement_filters, database_filter_selections, database_filter_toggle
+from components.live import show_live_toggle
+from components.plots import build_aggregate_figure, build_numeric_figure
+from components.progress import load_measurements_progressively
+from components.tables import show_data_table
+from data.aggregates import BUCKET_UNITS
+from data.db import load_numeric_aggregates
+from data.instrumentation import timed
 
 from roboscope.models import NumericMeasurement
 
 st.title("Numeric Measurements")
 
-db = st.session_state.db
+engine = st.session_state.engine
 selected_run_ids = st.session_state.selected_run_ids
 
 if not selected_run_ids:
     st.warning("Please select at least one Test Run to display measurements.")
     st.stop()
 
-numeric_df = db.query(NumericMeasurement).where_in("run_id", selected_run_ids).as_dataframe()
+live = show_live_toggle(engine, selected_run_ids, [NumericMeasurement], "numeric_live")
 
-if numeric_df.empty:
-    st.info("No numeric data available for the selected runs.")
+view = st.segmented_control(
+    "View",
+    options=["Raw", "Aggregate"],
+    default="Raw",
+    key="numeric_view",
+    help="Aggregate computes per-bucket statistics in the database instead of loading every value.",
+)
+
+if view == "Aggregate":
+    st.subheader("Measurement Filters")
+    selected_names, meta_selections = database_filter_selections(engine, NumericMeasurement, selected_run_ids)
+
+    unit_col, size_col, bands_col = st.columns([2, 1, 1])
+    with unit_col:
+        bucket_unit = st.segmented_control("Bucket", options=list(BUCKET_UNITS), default="Run") or "Run"
+    with size_col:
+        bucket_size = st.number_input("Bucket Size", min_value=1, value=1, step=1, help=f"Number of {bucket_unit.lower()}s per bucket")
+    with bands_col:
+        show_bands = st.toggle("Distribution Bands", value=True, help="Shade the min/max, p5/p95 and p25/p75 range of every bucket")
+
+    agg_df = load_numeric_aggregates(engine, selected_run_ids, bucket_unit, bucket_size, selected_names, meta_selections)
+    if agg_df.empty:
+        st.info("No numeric data available for the selected runs and filters.")
+        st.stop()
+
+    with st.expander("Aggregate Table", expanded=False):
+        st.dataframe(agg_df, hide_index=True)
+
+    fig = build_aggregate_figure(agg_df, show_bands)
+    fig.update_layout(
+        title="Numeric Measurements (Median per Bucket)",
+        xaxis_title="Run ID" if bucket_unit == "Run" else "Time",
+        yaxis_title="Value",
+        legend_title="Measurement",
+    )
+    with timed("plotly_chart.numeric_aggregate"):
+        st.plotly_chart(fig, use_container_width=True)
     st.stop()
 
 st.subheader("Measurement Filters")
 
-
-numeric_df = apply_measurement_filters(numeric_df)
+if database_filter_toggle():
+    numeric_df = apply_database_filters(engine, NumericMeasurement, selected_run_ids)
+else:
+    numeric_df = load_measurements_progressively(engine, NumericMeasurement, selected_run_ids, tail_live=live)
+    if numeric_df.empty:
+        st.info("No numeric data available for the selected runs.")
+        st.stop()
+    numeric_df = apply_measurement_filters(numeric_df, cache_key=("numeric_measurement", tuple(selected_run_ids)))
 
 if numeric_df.empty:
     st.info("No data after filtering. Adjust your filters to see results.")
     st.stop()
 
-with st.expander("Data Table", expanded=False):
-    st.dataframe(numeric_df)
+show_data_table(numeric_df)
 
 col1, col2 = st.columns([1, 1])
 
@@ -50,50 +96,21 @@ line_shape_map = {
 
 line_shape = line_shape_map[line_style_option]
 
-fig = go.Figure()
-
 # Prepare grouping label (Name + optional DUT)
-meta_df = pd.json_normalize(numeric_df["meta"])
 if "dut" in numeric_df.columns:
-    numeric_df["label"] = numeric_df["name"] + " / " + numeric_df["dut"].fillna("Unknown")
+    numeric_df["label"] = numeric_df["name"].astype(str) + " / " + numeric_df["dut"].astype(object).fillna("Unknown").astype(str)
 else:
     numeric_df["label"] = numeric_df["name"]
 
 # Prepare X-axis
 if x_axis_option == "Run ID":
-    x_data = numeric_df["run_id"]
+    x_column = "run_id"
 else:
     numeric_df["timestamp"] = pd.to_datetime(numeric_df["timestamp"])
-    x_data = numeric_df["timestamp"]
-
-# Plot measurement traces
-for label, group in numeric_df.groupby("label"):
-    mode = "markers" if line_style_option == "Markers Only" else "lines+markers"
-
-    fig.add_trace(
-        go.Scatter(
-            x=group[x_data.name],
-            y=group["value"],
-            mode=mode,
-            name=label,
-            line=dict(shape=line_shape) if line_shape else None,
-        )
-    )
+    x_column = "timestamp"
 
-# Plot limit lines
-for limit_name, color, column in [("Lower Limit", "red", "lower_limit"), ("Upper Limit", "red", "upper_limit")]:
-    limits = numeric_df[column].dropna().unique()
-    if limits.size:
-        limit_value = limits.flat[0]
-        fig.add_trace(
-            go.Scatter(
-                x=numeric_df[x_data.name],
-                y=[limit_value] * len(numeric_df),
-                mode="lines",
-                name=limit_name,
-                line=dict(dash="dash", color=color),
-            )
-        )
+mode = "markers" if line_style_option == "Markers Only" else "lines+markers"
+fig = build_numeric_figure(numeric_df, x_column, mode, line_shape)
 
 # Update layout
 fig.update_layout(
@@ -103,4 +120,6 @@ fig.update_layout(
     legend_title="Measurement",
 )
 
-st.plotly_chart(fig, use_container_width=True)
+# Plotly serialization of large figures is timed separately from building them
+with timed("plotly_chart.numeric"):
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,88 @@
+import streamlit as st
+from components.plots import build_control_chart, build_rolling_capability_figure
+from data.db import load_filtered_measurements
+from data.instrumentation import timed
+from data.spc import WESTERN_ELECTRIC_RULES, capability, count_violations, get_moment_store, individuals_chart, rolling_capability, xbar_r_chart
+
+from roboscope.models import NumericMeasurement
+
+st.title("Process Capability")
+
+engine = st.session_state.engine
+selected_run_ids = st.session_state.selected_run_ids
+
+if not selected_run_ids:
+    st.warning("Please select at least one Test Run to display process capability.")
+    st.stop()
+
+# Per-run moments are aggregated in the database once per finished run, then merged for any selection
+with timed("spc.moments"):
+    moments = get_moment_store().moments(engine, selected_run_ids)
+
+if moments.empty:
+    st.info("No numeric data available for the selected runs.")
+    st.stop()
+
+st.subheader("Capability Summary")
+summary_df = capability(moments).merge(count_violations(moments), on="name")
+st.dataframe(
+    summary_df,
+    column_config={
+        "name": st.column_config.TextColumn("Measurement Name"),
+        "n": st.column_config.NumberColumn("Values"),
+        "runs": st.column_config.NumberColumn("Runs"),
+        "lower_limit": st.column_config.NumberColumn("LSL"),
+        "upper_limit": st.column_config.NumberColumn("USL"),
+        "sigma_within": st.column_config.NumberColumn("σ Within", format="%.4g"),
+        "sigma_overall": st.column_config.NumberColumn("σ Overall", format="%.4g"),
+        "cp": st.column_config.NumberColumn("Cp", format="%.2f"),
+        "cpk": st.column_config.NumberColumn("Cpk", format="%.2f"),
+        "pp": st.column_config.NumberColumn("Pp", format="%.2f"),
+        "ppk": st.column_config.NumberColumn("Ppk", format="%.2f"),
+        **{
+            rule: st.column_config.NumberColumn(rule.replace("_", " ").title(), help=description)
+            for rule, description in WESTERN_ELECTRIC_RULES.items()
+        },
+    },
+    use_container_width=True,
+    hide_index=True,
+)
+st.caption("Cp/Cpk use the within-run sigma, Pp/Ppk the overall sigma. Rule columns count the X̄ chart points violating each Western Electric rule.")
+
+st.subheader("Control Chart")
+name_col, chart_col, x_col = st.columns([2, 1, 1])
+with name_col:
+    name = st.selectbox("Measurement Name", options=summary_df["name"])
+with chart_col:
+    chart_type = st.segmented_control("Chart", options=["X̄-R", "I-MR"], default="X̄-R") or "X̄-R"
+with x_col:
+    x_axis_option = st.segmented_control("X-axis", options=["Run ID", "Timestamp"], default="Run ID") or "Run ID"
+
+run_moments = moments[moments["name"] == name].reset_index(drop=True)
+rules = list(WESTERN_ELECTRIC_RULES)
+if chart_type == "X̄-R":
+    chart_df = xbar_r_chart(run_moments)
+    x_column = "run_id" if x_axis_option == "Run ID" else "timestamp"
+    panels = [("X̄", "xbar", "xbar_center", "xbar_ucl", "xbar_lcl"), ("Range", "range", "range_center", "range_ucl", "range_lcl")]
+else:
+    # Individual values of a single name, in measurement order
+    values_df = load_filtered_measurements(engine, NumericMeasurement, selected_run_ids, [name], {}).dropna(subset=["value"])
+    chart_df = individuals_chart(values_df["value"]).assign(run_id=values_df["run_id"].to_numpy(), timestamp=values_df["timestamp"].to_numpy())
+    x_column = "run_id" if x_axis_option == "Run ID" else "timestamp"
+    panels = [("Value", "value", "center", "ucl", "lcl"), ("Moving Range", "moving_range", "mr_center", "mr_ucl", None)]
+
+fig = build_control_chart(chart_df, x_column, panels, rules)
+fig.update_layout(title=f"{chart_type} Chart: {name}", xaxis2_title=x_axis_option, height=600)
+with timed("plotly_chart.control_chart"):
+    st.plotly_chart(fig, use_container_width=True)
+
+violations = chart_df[rules].sum()
+if violations.any():
+    st.warning(", ".join(f"{WESTERN_ELECTRIC_RULES[rule]}: {count}" for rule, count in violations.items() if count))
+
+st.subheader("Rolling Capability")
+window = st.number_input("Window (Runs)", min_value=2, value=min(20, max(len(run_moments), 2)), step=1)
+rolling_df = rolling_capability(run_moments, window)
+fig = build_rolling_capability_figure(rolling_df, "run_id" if x_axis_option == "Run ID" else "timestamp", window)
+fig.update_layout(title=f"Rolling Cpk: {name}", xaxis_title=x_axis_option, yaxis_title="Cpk")
+st.plotly_chart(fig, use_container_width=True)
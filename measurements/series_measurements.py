@@ -1,107 +1,134 @@
 import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
-from components.filters import apply_measurement_filters
+from components.filters import apply_database_filters, apply_measurement_filters, database_filter_toggle
+from components.live import show_live_toggle
+from components.plots import build_envelope_figure, build_series_figure
+from components.progress import load_measurements_progressively
+from components.tables import show_data_table
+from data.envelope import DEFAULT_GRID_SIZE, DEFAULT_OUTLIERS, SeriesEnvelope
+from data.instrumentation import timed
+from data.series import decode_series, x_bounds
 
 from roboscope.models import SeriesMeasurement
 
 st.title("Series Measurements")
 
-db = st.session_state.db
+engine = st.session_state.engine
 selected_run_ids = st.session_state.selected_run_ids
 
 if not selected_run_ids:
     st.warning("Please select at least one Test Run to display measurements.")
     st.stop()
 
-series_df = db.query(SeriesMeasurement).where_in("run_id", selected_run_ids).as_dataframe()
-
-if series_df.empty:
-    st.info("No series data available for the selected runs.")
-    st.stop()
+live = show_live_toggle(engine, selected_run_ids, [SeriesMeasurement], "series_live")
 
 st.subheader("Measurement Filters")
 
-series_df = apply_measurement_filters(series_df)
+if database_filter_toggle():
+    series_df = apply_database_filters(engine, SeriesMeasurement, selected_run_ids, prepare=decode_series)
+else:
+    series_df = load_measurements_progressively(engine, SeriesMeasurement, selected_run_ids, prepare=decode_series, tail_live=live)
+    if series_df.empty:
+        st.info("No series data available for the selected runs.")
+        st.stop()
+    series_df = apply_measurement_filters(series_df, cache_key=("series_measurement", tuple(selected_run_ids)))
 
 if series_df.empty:
     st.info("No data after filtering. Adjust your filters to see results.")
     st.stop()
 
-with st.expander("Data Table", expanded=False):
-    st.dataframe(series_df)
+show_data_table(series_df)
 
-
-line_style_option = st.segmented_control(
-    "Line Style", options=["Smooth (Spline)", "Straight (Linear)", "Markers Only"], default="Smooth (Spline)"
+view = st.segmented_control(
+    "View",
+    options=["Overlay", "Envelope"],
+    default="Overlay",
+    key="series_view",
+    help="Envelope resamples the series of a measurement onto a common x grid and draws their percentile bands and only the largest outliers.",
 )
 
-line_shape_map = {
-    "Smooth (Spline)": "spline",
-    "Straight (Linear)": "linear",
-    "Markers Only": None,
-}
-line_shape = line_shape_map[line_style_option]
-
-fig = go.Figure()
+# Zooming into an x range re-reads the full resolution samples inside it. There is nothing to zoom when no series has x data.
+bounds = x_bounds(series_df["x_data"])
+x_range = None
+if bounds is not None and bounds[0] < bounds[1]:
+    x_min, x_max = bounds
+    x_range = st.slider("X Range", min_value=x_min, max_value=x_max, value=(x_min, x_max), format="%g")
 
 # Grouping label (Name + optional DUT)
-meta_df = pd.json_normalize(series_df["meta"])
 if "dut" in series_df.columns:
-    series_df["label"] = series_df["name"] + " / " + series_df["dut"].fillna("Unknown")
+    series_df["label"] = series_df["name"].astype(str) + " / " + series_df["dut"].astype(object).fillna("Unknown").astype(str)
 else:
     series_df["label"] = series_df["name"]
 
-# Plot each measurement
-for label, group in series_df.groupby("label"):
-    for _, row in group.iterrows():
-        # Prepare X-axis
-        x_data = row["x_data"] if row["x_data"] else list(range(len(row["y_data"])))
-        mode = "markers" if line_style_option == "Markers Only" else "lines+markers"
-
-        # Measurement trace
-        fig.add_trace(
-            go.Scatter(
-                x=x_data,
-                y=row["y_data"],
-                mode=mode,
-                name=f"{label} - {row['run_id']}",
-                line=dict(shape=line_shape) if line_shape else None,
-            )
-        )
-
-        # Lower limit (optional)
-        if row["lower_limits"]:
-            fig.add_trace(
-                go.Scatter(
-                    x=x_data,
-                    y=row["lower_limits"],
-                    mode="lines",
-                    name=f"Lower Limit - {label} - {row['run_id']}",
-                    line=dict(dash="dash", color="red"),
-                    showlegend=False,
-                )
-            )
-
-        # Upper limit (optional)
-        if row["upper_limits"]:
-            fig.add_trace(
-                go.Scatter(
-                    x=x_data,
-                    y=row["upper_limits"],
-                    mode="lines",
-                    name=f"Upper Limit - {label} - {row['run_id']}",
-                    line=dict(dash="dash", color="red"),
-                    showlegend=False,
-                )
-            )
-
-# Update layout
+# Axis titles
 x_label = series_df.get("x_label", pd.Series(["Index"])).iloc[0]
 x_unit = series_df.get("x_unit", pd.Series([""])).iloc[0]
 y_label = series_df.get("y_label", pd.Series(["Value"])).iloc[0]
 y_unit = series_df.get("y_unit", pd.Series([""])).iloc[0]
+# Missing values are pd.NA rather than None with Arrow-backed dtypes
+x_label, x_unit, y_label, y_unit = (None if pd.isna(value) else value for value in (x_label, x_unit, y_label, y_unit))
+
+if view == "Envelope":
+    label_col, reference_col, grid_col, outliers_col = st.columns([2, 1, 1, 1])
+    with label_col:
+        envelope_label = st.selectbox("Measurement", options=sorted(series_df["label"].unique()))
+    group = series_df[series_df["label"] == envelope_label]
+    with reference_col:
+        reference = st.selectbox("Reference", options=["Median", *(f"Run {run_id}" for run_id in sorted(group["run_id"].unique()))])
+    with grid_col:
+        grid_size = st.number_input("Grid Points", min_value=10, value=DEFAULT_GRID_SIZE, step=100)
+    with outliers_col:
+        outlier_count = st.number_input(
+            "Outliers", min_value=0, value=DEFAULT_OUTLIERS, help="Number of series deviating most from the reference to draw"
+        )
+
+    with timed("series_envelope"):
+        envelope = SeriesEnvelope(group, grid_size, x_range, None if reference == "Median" else int(reference.removeprefix("Run ")))
+    outliers = envelope.outliers(outlier_count)
+
+    fig = build_envelope_figure(envelope, outliers, envelope_label)
+    fig.update_layout(
+        title=f"{envelope_label}: {len(group)} Series",
+        xaxis_title=f"{x_label} ({x_unit})" if x_unit else x_label,
+        yaxis_title=f"{y_label} ({y_unit})" if y_unit else y_label,
+    )
+    with timed("plotly_chart.series_envelope"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("Deviation Scores", expanded=False):
+        st.caption("RMS and maximum deviation from the reference over the grid, in robust sigmas of the p25-p75 spread at each point")
+        st.dataframe(envelope.scores.drop(columns="row"), hide_index=True)
+    st.stop()
 
+col1, col2, col3 = st.columns([2, 1, 1])
+
+with col1:
+    line_style_option = st.segmented_control(
+        "Line Style", options=["Smooth (Spline)", "Straight (Linear)", "Markers Only"], default="Smooth (Spline)"
+    )
+with col2:
+    max_points = st.number_input("Max Points per Series", min_value=100, value=2000, step=500)
+with col3:
+    downsampling_option = st.segmented_control("Downsampling", options=["Min/Max", "LTTB"], default="Min/Max")
+
+line_shape_map = {
+    "Smooth (Spline)": "spline",
+    "Straight (Linear)": "linear",
+    "Markers Only": None,
+}
+line_shape = line_shape_map[line_style_option]
+mode = "markers" if line_style_option == "Markers Only" else "lines+markers"
+
+fig = build_series_figure(
+    series_df,
+    mode,
+    line_shape,
+    max_points,
+    x_range=x_range,
+    method="lttb" if downsampling_option == "LTTB" else "minmax",
+)
+
+# Update layout
 fig.update_layout(
     title="Series Measurements",
     xaxis_title=f"{x_label} ({x_unit})" if x_unit else x_label,
@@ -109,4 +136,6 @@ fig.update_layout(
     legend_title="Measurement",
 )
 
-st.plotly_chart(fig, use_container_width=True)
+# Plotly serialization of large figures is timed separately from building them
+with timed("plotly_chart.series"):
+    st.plotly_chart(fig, use_container_width=True)
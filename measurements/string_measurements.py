@@ -1,67 +1,44 @@
-import re
-
 import pandas as pd
 import streamlit as st
-from components.filters import apply_measurement_filters
+from components.filters import apply_database_filters, apply_measurement_filters, database_filter_toggle
+from components.live import show_live_toggle
+from components.progress import load_measurements_progressively
+from components.tables import show_data_table
+from data.evaluation import bool_labels, evaluate_string_results, result_labels
 
 from roboscope.models import StringMeasurement
 
 st.title("String Measurements")
 
-db = st.session_state.db
+engine = st.session_state.engine
 selected_run_ids = st.session_state.selected_run_ids
 
 if not selected_run_ids:
     st.warning("Please select at least one Test Run to display measurements.")
     st.stop()
 
-string_df = db.query(StringMeasurement).where_in("run_id", selected_run_ids).as_dataframe()
-
-if string_df.empty:
-    st.info("No string measurements available for the selected runs.")
-    st.stop()
+live = show_live_toggle(engine, selected_run_ids, [StringMeasurement], "string_live")
 
 st.subheader("Measurement Filters")
-string_df = apply_measurement_filters(string_df)
+
+if database_filter_toggle():
+    string_df = apply_database_filters(engine, StringMeasurement, selected_run_ids)
+else:
+    string_df = load_measurements_progressively(engine, StringMeasurement, selected_run_ids, tail_live=live)
+    if string_df.empty:
+        st.info("No string measurements available for the selected runs.")
+        st.stop()
+    string_df = apply_measurement_filters(string_df, cache_key=("string_measurement", tuple(selected_run_ids)))
 
 if string_df.empty:
     st.info("No data after filtering. Adjust your filters to see results.")
     st.stop()
 
-with st.expander("Data Table", expanded=False):
-    st.dataframe(string_df)
+show_data_table(string_df)
 
 
 # Add result column
-def determine_string_result(row):
-    if not row["expected_value"]:
-        return "✅"
-    value = row["value"] or ""
-    expected = row["expected_value"] or ""
-    mode = row["mode"]
-    ignore_case = row["ignore_case"]
-
-    if ignore_case:
-        value = value.lower()
-        expected = expected.lower()
-
-    if mode == "equal":
-        return "✅" if value == expected else "❌"
-    elif mode == "not_equal":
-        return "✅" if value != expected else "❌"
-    elif mode == "regex":
-        flags = re.IGNORECASE if ignore_case else 0
-        try:
-            return "✅" if re.match(expected, value, flags=flags) else "❌"
-        except re.error:
-            return "❌"
-    elif mode == "log":
-        return "✅"
-    else:
-        return "❌"
-
-
-string_df["Result"] = string_df.apply(determine_string_result, axis=1)
+string_df["Result"] = result_labels(evaluate_string_results(string_df))
 
 # Build display table
 display_df = pd.DataFrame(
@@ -71,7 +48,7 @@ display_df = pd.DataFrame(
         "Value": string_df["value"],
         "Expected": string_df["expected_value"],
         "Mode": string_df["mode"],
-        "Ignore Case": string_df["ignore_case"].apply(lambda x: "True" if x else "False"),
+        "Ignore Case": bool_labels(string_df["ignore_case"]),
         "Result": string_df["Result"],
     }
 )
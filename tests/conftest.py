@@ -0,0 +1,21 @@
+import pytest
+from benchmarks.generate import generate_database
+from sqlalchemy import Engine, create_engine
+
+from roboscope.models import TestRun
+
+
+@pytest.fixture(scope="session")
+def engine(tmp_path_factory) -> Engine:
+    """Small synthetic database shared by the read-only tests: 6 runs of 2 suites with 3 test cases each."""
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('db') / 'synthetic.db'}")
+    generate_database(engine, runs=6, suites=2, tests=3, measurements={"series": 1}, series_length=50, meta_cardinality=3)
+    return engine
+
+
+@pytest.fixture
+def empty_engine(tmp_path) -> Engine:
+    """Empty RoboScope schema, for tests that insert their own rows."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    TestRun.metadata.create_all(engine)
+    return engine
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from data.aggregates import PERCENTILES, aggregate_numeric
+from sqlalchemy import insert
+
+from roboscope.models import NumericMeasurement
+
+# Run id -> values of measurement "voltage"; every run is its own bucket
+BUCKETS = {1: [30.19], 2: [65.94, 30.19], 3: [4.0, 1.0, 2.5], 4: list(np.random.default_rng(0).normal(1e6, 1.0, 20))}
+
+
+@pytest.fixture
+def measurement_engine(empty_engine):
+    rows = [
+        dict(
+            run_id=run_id,
+            suite_id=1,
+            test_id=i,
+            name="voltage",
+            value=float(value),
+            lower_limit=2.0,
+            upper_limit=50.0,
+            timestamp=datetime(2025, 1, 1),
+        )
+        for run_id, values in BUCKETS.items()
+        for i, value in enumerate(values)
+    ]
+    with empty_engine.begin() as conn:
+        conn.execute(insert(NumericMeasurement.__table__), rows)
+    return empty_engine
+
+
+def test_percentiles_are_nearest_rank(measurement_engine):
+    df = aggregate_numeric(measurement_engine, list(BUCKETS), "Run", 1).set_index("bucket")
+
+    for run_id, values in BUCKETS.items():
+        for name, fraction in PERCENTILES.items():
+            assert df.loc[run_id, name] == np.percentile(values, fraction * 100, method="inverted_cdf"), (run_id, name)
+
+
+def test_moments_and_yield(measurement_engine):
+    df = aggregate_numeric(measurement_engine, list(BUCKETS), "Run", 1).set_index("bucket")
+
+    for run_id, values in BUCKETS.items():
+        values = np.array(values)
+        assert df.loc[run_id, "count"] == len(values)
+        assert df.loc[run_id, "mean"] == pytest.approx(values.mean(), rel=1e-12)
+        # Values far from zero (bucket 4) lose all precision with sqrt(E[x^2] - E[x]^2)
+        assert df.loc[run_id, "std"] == pytest.approx(values.std(), rel=1e-6, abs=1e-12)
+        assert (df.loc[run_id, "min"], df.loc[run_id, "max"]) == (values.min(), values.max())
+        assert df.loc[run_id, "yield"] == pytest.approx(100 * ((values >= 2.0) & (values <= 50.0)).mean())
+
+
+def test_buckets_of_consecutive_runs(measurement_engine):
+    df = aggregate_numeric(measurement_engine, list(BUCKETS), "Run", 2)
+
+    assert list(df["bucket"]) == [0, 2, 4]
+    assert list(df["count"]) == [1, 5, 20]
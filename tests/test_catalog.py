@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from data.catalog import fetch_latest_run_ids, fetch_run_page
+from sqlalchemy import insert
+
+from roboscope.models import TestRun
+
+START = datetime(2025, 1, 1)
+END = datetime(2026, 1, 1)
+
+
+def insert_runs(engine, runs: list[tuple[int, datetime, dict]]) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            insert(TestRun.__table__),
+            [dict(run_id=run_id, start_time=start_time, name="Run", status="PASS", meta=meta) for run_id, start_time, meta in runs],
+        )
+
+
+def all_pages(engine, meta_filters: dict, page_size: int) -> list[list[tuple[int, datetime]]]:
+    pages, after = [], None
+    while page := fetch_run_page(engine, START, END, meta_filters, after, page_size):
+        pages.append(page)
+        after = page[-1]
+    return pages
+
+
+def test_keyset_pages_cover_every_run_once_newest_first(empty_engine):
+    # Runs 3 to 6 share a start time, so the pages must break the tie on run id
+    tied = START + timedelta(hours=5)
+    runs = [(1, START, {}), (2, START + timedelta(hours=1), {}), *[(run_id, tied, {}) for run_id in range(3, 7)], (7, START + timedelta(hours=9), {})]
+    insert_runs(empty_engine, runs)
+
+    pages = all_pages(empty_engine, {}, page_size=2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [run_id for page in pages for run_id, _ in page] == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_keyset_pages_apply_date_and_meta_filters(empty_engine):
+    insert_runs(empty_engine, [(run_id, START + timedelta(days=run_id), {"dut": f"DUT-{run_id % 2}"}) for run_id in range(1, 9)])
+
+    pages = all_pages(empty_engine, {"dut": ["DUT-1"]}, page_size=3)
+    assert [run_id for page in pages for run_id, _ in page] == [7, 5, 3, 1]
+
+    assert fetch_run_page(empty_engine, START + timedelta(days=3), START + timedelta(days=5), {}) == [
+        (5, START + timedelta(days=5)),
+        (4, START + timedelta(days=4)),
+        (3, START + timedelta(days=3)),
+    ]
+
+
+def test_latest_run_ids_are_the_newest_matching_runs_oldest_first(empty_engine):
+    insert_runs(empty_engine, [(run_id, START + timedelta(days=run_id), {"dut": f"DUT-{run_id % 2}"}) for run_id in range(1, 9)])
+
+    assert fetch_latest_run_ids(empty_engine, START, END, {"dut": ["DUT-0"]}, limit=3) == [4, 6, 8]
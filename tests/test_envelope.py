@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from data.envelope import SeriesEnvelope, resample
+
+
+def reference_resample(x: np.ndarray, y: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    finite = np.isfinite(x)
+    order = np.argsort(x[finite])
+    return np.interp(grid, x[finite][order], y[finite][order], left=np.nan, right=np.nan)
+
+
+def test_resample_matches_interp_per_series():
+    rng = np.random.default_rng(0)
+    xs = [np.linspace(start, start + 10, 30) for start in [0.0, 2.5, -3.0]]
+    ys = [rng.normal(size=x.size) for x in xs]
+    grid = np.linspace(-5, 15, 101)
+
+    values = resample(xs, ys, grid)
+
+    np.testing.assert_allclose(values, [reference_resample(x, y, grid) for x, y in zip(xs, ys)])
+
+
+def test_resample_sorts_shuffled_x_and_drops_nan_x():
+    rng = np.random.default_rng(1)
+    xs, ys = [], []
+    for start in [0.0, 1.0, 4.0]:
+        x, y = np.linspace(start, start + 6, 25), rng.normal(size=25)
+        order = rng.permutation(x.size)
+        x, y = x[order], y[order]
+        x[rng.choice(x.size, 4, replace=False)] = np.nan
+        xs.append(x)
+        ys.append(y)
+    xs += [np.array([np.nan, np.nan]), np.empty(0)]
+    ys += [np.array([1.0, 2.0]), np.empty(0)]
+    grid = np.linspace(-1, 11, 97)
+
+    values = resample(xs, ys, grid)
+
+    np.testing.assert_allclose(values[:3], [reference_resample(x, y, grid) for x, y in zip(xs[:3], ys[:3])])
+    assert np.isnan(values[3:]).all()
+
+
+def test_envelope_of_identical_series_has_no_spread():
+    x = np.linspace(0, 1, 20)
+    df = pd.DataFrame({"run_id": [1, 2, 3], "x_data": [x, x[::-1], x], "y_data": [x**2, (x**2)[::-1], x**2]})
+
+    envelope = SeriesEnvelope(df, grid_size=11).envelope
+
+    np.testing.assert_allclose(envelope["min"], envelope["max"])
+    np.testing.assert_allclose(envelope["p50"], np.linspace(0, 1, 11) ** 2, atol=0.01)
@@ -0,0 +1,86 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+from data.evaluation import bool_labels, evaluate_boolean_results, evaluate_string_results, summarize_results
+
+VALUES = [None, "", "OK", "ok", "Ok ", "STATE_1", "state_1", "abc123"]
+EXPECTED = [None, "", "OK", "ok", "STATE_1", "state_\\d", "^ok$", "ABC", "(", "[a-z]+\\d+"]
+MODES = ["equal", "not_equal", "regex", "log", "contains", None]
+IGNORE_CASE = [True, False, None, np.nan]
+
+
+def baseline_string_result(row) -> bool:
+    """The row-by-row check the String Measurements page applied before the vectorized evaluation."""
+    if not row["expected_value"]:
+        return True
+    value = row["value"] or ""
+    expected = row["expected_value"] or ""
+    mode = row["mode"]
+    ignore_case = row["ignore_case"]
+
+    if ignore_case:
+        value = value.lower()
+        expected = expected.lower()
+
+    if mode == "equal":
+        return value == expected
+    elif mode == "not_equal":
+        return value != expected
+    elif mode == "regex":
+        flags = re.IGNORECASE if ignore_case else 0
+        try:
+            return bool(re.match(expected, value, flags=flags))
+        except re.error:
+            return False
+    elif mode == "log":
+        return True
+    else:
+        return False
+
+
+def random_frame(rng: np.random.Generator, size: int, columns: dict[str, list]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {column: pd.Series([choices[i] for i in rng.integers(len(choices), size=size)], dtype=object) for column, choices in columns.items()}
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_string_results_match_the_row_by_row_checks(seed):
+    df = random_frame(np.random.default_rng(seed), 2000, {"value": VALUES, "expected_value": EXPECTED, "mode": MODES, "ignore_case": IGNORE_CASE})
+
+    expected = df.apply(baseline_string_result, axis=1).astype(bool)
+
+    pd.testing.assert_series_equal(evaluate_string_results(df), expected, check_names=False)
+
+
+def test_missing_ignore_case_in_a_float_column_ignores_case():
+    # NaN is truthy, so the row-by-row check lowered both sides
+    df = pd.DataFrame({"value": ["OK", "OK"], "expected_value": ["ok", "ok"], "mode": ["equal", "equal"], "ignore_case": [np.nan, 0.0]})
+
+    assert list(evaluate_string_results(df)) == [True, False]
+
+
+def test_boolean_results_match_the_row_by_row_checks():
+    df = random_frame(np.random.default_rng(0), 500, {"value": [True, False, None], "expected_value": [True, False, None, np.nan]})
+
+    expected = df.apply(lambda row: pd.isna(row["expected_value"]) or row["value"] == row["expected_value"], axis=1).astype(bool)
+
+    pd.testing.assert_series_equal(evaluate_boolean_results(df), expected, check_names=False)
+
+
+def test_bool_labels_render_truthiness():
+    values = pd.Series([True, False, None, np.nan, 1.0, 0.0], dtype=object)
+
+    assert list(bool_labels(values)) == ["True" if value else "False" for value in values]
+
+
+def test_summary_counts_passed_and_failed_per_run_and_name(engine):
+    summary = summarize_results(engine, "boolean", [1, 2, 3], batch_size=2)
+
+    assert list(summary.columns) == ["type", "run_id", "name", "passed", "failed", "total"]
+    assert set(summary["run_id"]) == {1, 2, 3}
+    assert (summary["passed"] + summary["failed"] == summary["total"]).all()
+    # 2 suites of 3 test cases, one boolean measurement per test case
+    assert summary.groupby("run_id")["total"].sum().tolist() == [6, 6, 6]
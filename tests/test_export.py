@@ -0,0 +1,35 @@
+from benchmarks.generate import generate_database
+from data.disk_cache import read_run_set
+from data.export import export_runs
+from sqlalchemy import create_engine, update
+
+from roboscope.models import NumericMeasurement, TestRun
+
+
+def test_unfinished_runs_are_skipped_and_not_counted(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'runs.db'}"
+    engine = create_engine(db_url)
+    generate_database(engine, runs=3, suites=1, tests=2)
+    with engine.begin() as conn:
+        conn.execute(update(TestRun).where(TestRun.run_id == 2).values(end_time=None))
+    table = NumericMeasurement.__tablename__
+
+    exported, skipped = export_runs(db_url, str(tmp_path / "export"), [1, 2, 99], [table])
+
+    # 2 numeric measurements per test case
+    assert exported == {table: 4}
+    assert skipped == [2, 99]
+    assert set(read_run_set(str(tmp_path / "export"), table)["run_id"]) == {1}
+
+
+def test_all_finished_runs_by_default(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'runs.db'}"
+    engine = create_engine(db_url)
+    generate_database(engine, runs=3, suites=1, tests=2)
+    with engine.begin() as conn:
+        conn.execute(update(TestRun).where(TestRun.run_id == 3).values(end_time=None))
+
+    exported, skipped = export_runs(db_url, str(tmp_path / "export"), tables=[NumericMeasurement.__tablename__])
+
+    assert exported == {NumericMeasurement.__tablename__: 8}
+    assert skipped == []
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+from data.failure_search import fts5_query, refresh_failure_index, search_failures
+from sqlalchemy import insert
+
+from roboscope.models import Failure, TestRun
+
+START = datetime(2025, 1, 1)
+END = datetime(2026, 1, 1)
+# Run id -> DUT meta of the run; runs 1 to 3 are in range, run 4 starts after END
+RUNS = {1: "DUT-A", 2: "DUT-B", 3: "DUT-A", 4: "DUT-A"}
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("CAN timeout", '"CAN" "timeout"'),
+        ('"CAN timeout" retry', '"CAN timeout" "retry"'),
+        ("timeout OR overcurrent", '"timeout" OR "overcurrent"'),
+        ("OR timeout OR OR", '"timeout"'),
+        ("volt*", '"volt"*'),
+        ("timeout -retry -CAN", '"timeout" NOT ("retry" OR "CAN")'),
+        ('say "he said ""hi"""', '"say" "he said" "hi"'),
+        ('a"b', '"a""b"'),
+        ("NOT AND NEAR(", '"NOT" "AND" "NEAR("'),
+        ("-retry", ""),
+        ('"" * - OR', '"*" "-"'),
+        ("", ""),
+    ],
+)
+def test_fts5_query_quotes_every_term(query, expected):
+    assert fts5_query(query) == expected
+
+
+@pytest.fixture
+def failure_engine(empty_engine):
+    runs = [
+        dict(run_id=run_id, name=f"Run {run_id}", status="FAIL", start_time=START + timedelta(days=400 if run_id == 4 else run_id), meta={"dut": dut})
+        for run_id, dut in RUNS.items()
+    ]
+    # 7 timeouts per run, the first of each also mentioning a retry, and one unrelated failure
+    failures = [
+        dict(run_id=run_id, suite_id=1, test_id=i, source="test", details=f"CAN timeout {i}" + (" after retry" if i == 0 else ""), timestamp=START)
+        for run_id in RUNS
+        for i in range(7)
+    ] + [dict(run_id=1, suite_id=1, test_id=99, source="test", details="Overcurrent on rail", timestamp=START)]
+    with empty_engine.begin() as conn:
+        conn.execute(insert(TestRun.__table__), runs)
+        conn.execute(insert(Failure.__table__), failures)
+    refresh_failure_index(empty_engine)
+    return empty_engine
+
+
+def all_hits(engine, query: str, meta_filters: dict, run_ids: list[int] | None, page_size: int) -> list:
+    pages, page, total = [], 1, None
+    while True:
+        hits, total = search_failures(engine, query, START, END, meta_filters, run_ids, page, page_size)
+        if hits.empty:
+            return pages, total
+        pages.append(hits)
+        page += 1
+
+
+@pytest.mark.parametrize(
+    "meta_filters, run_ids, expected_runs",
+    [({}, None, [1, 2, 3]), ({"dut": ["DUT-A"]}, None, [1, 3]), ({}, [2, 3], [2, 3]), ({"dut": ["DUT-A"]}, [2, 3], [3])],
+)
+def test_pages_cover_every_filtered_hit_once_best_first(failure_engine, meta_filters, run_ids, expected_runs):
+    pages, total = all_hits(failure_engine, "timeout", meta_filters, run_ids, page_size=4)
+
+    hits = [row for page in pages for row in page.itertuples()]
+    assert total == len(hits) == 7 * len(expected_runs)
+    assert all(len(page) == 4 for page in pages[:-1])
+    assert sorted({hit.run_id for hit in hits}) == expected_runs
+    assert len({(hit.run_id, hit.details) for hit in hits}) == len(hits)
+    scores = [hit.score for hit in hits]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_excluded_terms_and_or(failure_engine):
+    _, total = search_failures(failure_engine, "timeout -retry", START, END, {}, None, 1, 100)
+    hits, either = search_failures(failure_engine, "retry OR overcurrent", START, END, {}, None, 1, 100)
+
+    assert total == 3 * 6
+    assert either == 3 + 1
+    assert "Overcurrent on rail" in set(hits["details"])
+
+
+def test_query_without_terms_matches_nothing(failure_engine):
+    hits, total = search_failures(failure_engine, "-timeout", START, END, {}, None)
+
+    assert hits.empty and total == 0
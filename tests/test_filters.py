@@ -0,0 +1,20 @@
+from benchmarks.generate import generate_database
+from data.catalog import RUN_PAGE_SIZE
+from sqlalchemy import create_engine
+from streamlit.testing.v1 import AppTest
+
+RUNS = RUN_PAGE_SIZE + 5
+
+
+def test_all_runs_selects_every_matching_run_beyond_the_loaded_page(tmp_path):
+    db_path = tmp_path / "runs.db"
+    generate_database(create_engine(f"sqlite:///{db_path}"), runs=RUNS, suites=1, tests=1, measurements={"numeric": 0, "string": 0, "boolean": 0})
+    at = AppTest.from_file("app.py", default_timeout=60)
+    at.secrets["db_url"] = f"sqlite:///{db_path}"
+    at.run()
+    assert len(at.session_state["run_catalog"]["runs"]) == RUN_PAGE_SIZE
+
+    next(button for button in at.button if button.label == "All Runs").click().run()
+
+    assert not at.exception
+    assert sorted(at.session_state["selected_run_ids"]) == list(range(1, RUNS + 1))
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+from data.loader import iter_run_chunks
+from data.measurement_cache import MeasurementCache, iter_measurements
+from data.series import decode_series
+
+from roboscope.models import NumericMeasurement, SeriesMeasurement, StringMeasurement
+
+
+def test_run_chunks_are_bounded_by_the_chunk_size_and_in_run_order(engine):
+    parts = list(iter_run_chunks(engine, NumericMeasurement, [4, 2, 3], chunk_size=5))
+
+    assert all(len(part) <= 5 for _, part in parts)
+    assert [run_id for run_id, _ in parts] == sorted(run_id for run_id, _ in parts)
+    assert all((part["run_id"] == run_id).all() for run_id, part in parts)
+    with engine.connect() as conn:
+        expected = pd.read_sql(NumericMeasurement.__table__.select().where(NumericMeasurement.run_id.in_([2, 3, 4])).order_by("run_id", "id"), conn)
+    pd.testing.assert_frame_equal(pd.concat([part for _, part in parts], ignore_index=True), expected)
+
+
+@pytest.mark.parametrize("model", [NumericMeasurement, StringMeasurement])
+def test_runs_assembled_from_small_chunks_equal_whole_runs(engine, model):
+    def load(chunk_size: int) -> dict[int, pd.DataFrame]:
+        cache = MeasurementCache(max_bytes=1 << 30, live_run_ttl=30)
+        return dict(iter_measurements(engine, model, [1, 2, 3, 99], chunk_size=chunk_size, cache=cache, disk_cache=None))
+
+    chunked, whole = load(chunk_size=4), load(chunk_size=1_000_000)
+
+    assert sorted(chunked) == [1, 2, 3, 99]
+    assert chunked[99].empty
+    for run_id in [1, 2, 3]:
+        # Categories of the compacted columns are unified in order of appearance, the values are the same
+        pd.testing.assert_frame_equal(chunked[run_id], whole[run_id], check_categorical=False)
+
+
+def test_prepare_is_applied_to_every_part(engine):
+    cache = MeasurementCache(max_bytes=1 << 30, live_run_ttl=30)
+
+    frames = dict(iter_measurements(engine, SeriesMeasurement, [1, 2], decode_series, chunk_size=4, cache=cache, disk_cache=None))
+
+    for frame in frames.values():
+        assert len(frame) == 6
+        assert all(len(x) == 50 for x in frame["x_data"])
+    assert cache.contains((SeriesMeasurement.__tablename__, 1))
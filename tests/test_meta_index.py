@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.compact import compact_frame
+from data.meta_index import MetaIndex
+
+FRAME = pd.DataFrame(
+    {
+        "name": ["voltage", "current", "voltage", "current", "voltage", "power"],
+        "meta": [
+            {"dut": "A", "station": "1"},
+            {"dut": "B", "station": "1"},
+            {"dut": "A", "station": "2"},
+            None,
+            {"dut": "B"},
+            {"dut": "A", "station": "1"},
+        ],
+    }
+)
+
+
+def reference_mask(df: pd.DataFrame, names: list, meta_selections: dict[str, list]) -> np.ndarray:
+    mask = df["name"].isin(names).to_numpy() if names else np.ones(len(df), dtype=bool)
+    for key, selected in meta_selections.items():
+        if selected:
+            mask &= np.array([isinstance(meta, dict) and meta.get(key) in selected for meta in df["meta"]])
+    return mask
+
+
+@pytest.fixture(params=["plain", "compacted"])
+def frame(request) -> pd.DataFrame:
+    return compact_frame(FRAME) if request.param == "compacted" else FRAME
+
+
+def test_options_are_sorted_distinct_values(frame):
+    index = MetaIndex(frame)
+
+    assert index.name_options == ["current", "power", "voltage"]
+    assert index.options("dut") == ["A", "B"]
+    assert index.options("station") == ["1", "2"]
+
+
+@pytest.mark.parametrize(
+    "names, meta_selections",
+    [
+        (["voltage"], {}),
+        ([], {"dut": ["A"]}),
+        (["voltage", "power"], {"dut": ["A"], "station": ["1"]}),
+        ([], {"station": ["2", "1"]}),
+        (["current"], {"dut": ["C"]}),
+    ],
+)
+def test_mask_matches_every_selection(frame, names, meta_selections):
+    mask = MetaIndex(frame).mask(names, meta_selections)
+
+    np.testing.assert_array_equal(mask, reference_mask(FRAME, names, meta_selections))
+
+
+def test_rows_without_the_key_never_match(frame):
+    mask = MetaIndex(frame).mask([], {"station": ["1", "2"]})
+
+    assert not mask[3] and not mask[4]
+
+
+def test_empty_selection_gives_no_mask(frame):
+    assert MetaIndex(frame).mask([], {"dut": []}) is None
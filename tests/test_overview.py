@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from data.overview import STATUS_CODES, UNKNOWN_CODE, StatusMatrix
+
+SUITES = pd.DataFrame({"run_id": [1, 2, 2], "suite_id": [1, 1, 2], "name": ["Suite A", "Suite A", "Suite B"]})
+
+
+def case_frame(rows: list[tuple[int, int, int, str, str]]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["run_id", "suite_id", "test_id", "name", "status"])
+
+
+def test_rows_and_columns_are_sorted_and_missing_cells_are_zero():
+    tests = case_frame([(2, 2, 3, "Test z", "PASS"), (2, 1, 2, "Test b", "SKIP"), (1, 1, 1, "Test b", "FAIL"), (2, 1, 1, "Test a", "PASS")])
+
+    matrix = StatusMatrix(tests, SUITES, [1, 2])
+
+    assert list(matrix.rows) == [("Suite A", "Test a"), ("Suite A", "Test b"), ("Suite B", "Test z")]
+    assert list(matrix.run_ids) == [1, 2]
+    np.testing.assert_array_equal(
+        matrix.codes,
+        [[0, STATUS_CODES["PASS"]], [STATUS_CODES["FAIL"], STATUS_CODES["SKIP"]], [0, STATUS_CODES["PASS"]]],
+    )
+    assert matrix.codes.dtype == np.int8
+
+
+def test_first_test_case_of_a_duplicated_name_wins():
+    tests = case_frame([(1, 1, 1, "Test a", "FAIL"), (1, 1, 2, "Test a", "PASS"), (1, 1, 3, "Test a", "SKIP")])
+
+    matrix = StatusMatrix(tests, SUITES, [1])
+
+    assert len(matrix) == 1
+    assert matrix.codes[0, 0] == STATUS_CODES["FAIL"]
+
+
+def test_unknown_statuses_and_unselected_runs():
+    tests = case_frame([(1, 1, 1, "Test a", "NOT RUN"), (2, 1, 1, "Test a", "PASS")])
+
+    matrix = StatusMatrix(tests, SUITES, [1])
+
+    assert list(matrix.run_ids) == [1]
+    assert matrix.codes[0, 0] == UNKNOWN_CODE
+
+
+def test_labels_render_a_page_with_failure_details():
+    tests = case_frame([(1, 1, 1, "Test a", "FAIL"), (1, 1, 2, "Test b", "PASS"), (2, 1, 1, "Test a", "PASS")])
+    failures = pd.DataFrame({"run_id": [1, 1], "test_id": [1, 1], "details": ["first", "second"]})
+
+    table = StatusMatrix(tests, SUITES, [1, 2]).labels(0, 2, failures)
+
+    assert list(table.columns) == ["Test Suite", "Test Case", "Run 1", "Run 2"]
+    assert list(table["Test Suite"]) == ["Suite A", ""]
+    assert table.loc[0, "Run 1"] == "❌\nfirst\nsecond"
+    assert table.loc[1, "Run 2"] == ""
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.spc import combine_moments, fetch_run_moments
+
+from roboscope.models import NumericMeasurement
+
+
+def run_moments(values: pd.DataFrame) -> pd.DataFrame:
+    grouped = values.groupby(["run_id", "name"])["value"]
+    moments = grouped.agg(n="size", mean="mean", min="min", max="max").reset_index()
+    moments["m2"] = grouped.apply(lambda run: ((run - run.mean()) ** 2).sum()).to_numpy()
+    return moments.assign(lower_limit=0.0, upper_limit=10.0)
+
+
+def test_combined_moments_equal_the_moments_of_all_values():
+    rng = np.random.default_rng(1)
+    values = pd.DataFrame(
+        {
+            "run_id": np.repeat([1, 2, 3, 1, 2], [5, 1, 12, 3, 7]),
+            "name": np.repeat(["a", "a", "a", "b", "b"], [5, 1, 12, 3, 7]),
+        }
+    )
+    # Far from zero, where sum-of-squares formulas lose their precision
+    values["value"] = 1e6 + rng.normal(size=len(values)) + values["run_id"]
+
+    totals = combine_moments(run_moments(values))
+
+    for name, group in values.groupby("name"):
+        assert totals.loc[name, "n"] == len(group)
+        assert totals.loc[name, "runs"] == group["run_id"].nunique()
+        assert totals.loc[name, "mean"] == pytest.approx(group["value"].mean(), rel=1e-12)
+        assert totals.loc[name, "m2"] == pytest.approx(((group["value"] - group["value"].mean()) ** 2).sum(), rel=1e-9)
+        within = group.groupby("run_id")["value"].apply(lambda run: ((run - run.mean()) ** 2).sum()).sum()
+        assert totals.loc[name, "m2_within"] == pytest.approx(within, rel=1e-9)
+        assert (totals.loc[name, "min"], totals.loc[name, "max"]) == (group["value"].min(), group["value"].max())
+
+
+def test_database_moments_match_the_values(engine):
+    with engine.connect() as conn:
+        values = pd.read_sql(
+            NumericMeasurement.__table__.select().where(NumericMeasurement.run_id.in_([1, 2]), NumericMeasurement.value.is_not(None)), conn
+        )
+
+    moments = fetch_run_moments(engine, [1, 2]).set_index(["run_id", "name"]).sort_index()
+    expected = run_moments(values).set_index(["run_id", "name"]).sort_index()
+
+    np.testing.assert_array_equal(moments["n"], expected["n"])
+    np.testing.assert_allclose(moments["mean"], expected["mean"])
+    np.testing.assert_allclose(moments["m2"], expected["m2"], atol=1e-9)